@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pocwc.codec import zstd_available  # noqa: E402
+from pocwc.orchestrator import SimulationConfig, SimulationEngine  # noqa: E402
+from pocwc.store import WorldStore  # noqa: E402
+
+
+def _variants() -> list[tuple[str, str, bool]]:
+    variants = [("none", "none", False), ("zlib", "zlib", False), ("zlib+dict", "zlib", True)]
+    if zstd_available():
+        variants += [("zstd", "zstd", False), ("zstd+dict", "zstd", True)]
+    return variants
+
+
+def _read_ms(store: WorldStore, repeat: int) -> dict[str, float]:
+    def best(fn) -> float:  # noqa: ANN001
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return round(min(timings) * 1000.0, 3)
+
+    return {
+        "list_candidates_full_ms": best(lambda: [dict(row) for row in store.list_candidates()]),
+        "list_states_full_ms": best(lambda: [dict(row) for row in store.list_states()]),
+        "recent_states_ms": best(lambda: [row["meta_m"] for row in store.list_states(branch_id="branch-main", last_n=6)]),
+    }
+
+
+def measure(source: Path, workdir: Path, repeat: int) -> dict:
+    report: dict[str, dict] = {}
+    for label, codec, train in _variants():
+        db_path = workdir / f"{label}.db"
+        shutil.copyfile(source, db_path)
+        store = WorldStore(db_path)
+        try:
+            started = time.perf_counter()
+            compacted = store.compact(codec, train=train, vacuum=True)
+            report[label] = {
+                "compact_seconds": round(time.perf_counter() - started, 3),
+                "column_bytes": compacted["bytes_after"],
+                "db_bytes": db_path.stat().st_size,
+                **_read_ms(store, repeat),
+            }
+        finally:
+            store.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare artifact/meta column encodings: size and read latency")
+    parser.add_argument("--db", type=Path, default=None, help="Existing database to copy (default: generate one)")
+    parser.add_argument("--steps", type=int, default=1000, help="Steps to simulate when generating a database")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        source = args.db
+        if source is None:
+            source = workdir / "source.db"
+            engine = SimulationEngine(SimulationConfig(db_path=source, steps=args.steps, seed=args.seed, llm_provider="none"))
+            try:
+                engine.run(args.steps)
+            finally:
+                engine.close()
+        print(json.dumps(measure(source, workdir, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
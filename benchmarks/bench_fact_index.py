@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pocwc.embedding_cache import CachedEmbeddingAdapter  # noqa: E402
+from pocwc.fact_index import FactIndex, _combined  # noqa: E402
+from pocwc.semantic import jaccard, numpy, numpy_available, scan_tokens, token_set  # noqa: E402
+
+
+class BagOfWordsEmbedder:
+    """Sum of a fixed random vector per word, so facts sharing words land close together."""
+
+    def __init__(self, dim: int, seed: int) -> None:
+        self.dim = dim
+        self.seed = seed
+        self.words: dict[str, list[float]] = {}
+
+    def _word(self, word: str) -> list[float]:
+        if word not in self.words:
+            rng = random.Random(f"{self.seed}:{word}")
+            self.words[word] = [rng.gauss(0.0, 1.0) for _ in range(self.dim)]
+        return self.words[word]
+
+    def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        return [[sum(values) for values in zip(*(self._word(word) for word in text.split()))] for text in texts]
+
+
+def _facts(rng: random.Random, count: int, vocabulary: int) -> list[str]:
+    words = [f"w{index}" for index in range(vocabulary)]
+    return [f"public_artifact: {' '.join(rng.sample(words, 10))}" for _ in range(count)]
+
+
+def _exact(index: FactIndex, query: str) -> float:
+    # Every row scored with the combined blend: what max_similarity approximates.
+    vector = numpy.asarray(index._embed([query])[0], dtype=numpy.float32)
+    sims = (index._array[: len(index)] @ vector).tolist()
+    tokens = token_set(query)
+    return max(_combined(sim, jaccard(tokens, scan_tokens(text))) for sim, text in zip(sims, index.texts))
+
+
+def measure(count: int, dim: int, queries: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    facts = _facts(rng, count, 2000)
+    repeats = [" ".join(fact.split()[:-1] + ["zz"]) for fact in rng.sample(facts, queries)]
+    fresh = _facts(random.Random(seed + 1), queries, 2000)
+    report: dict[str, dict] = {}
+    for name, train_rows in (("flat", count + 1), ("ivf", 4096)):
+        adapter = CachedEmbeddingAdapter(BagOfWordsEmbedder(dim, seed), model="bench")
+        adapter.embed_texts(texts=[*repeats, *fresh])
+        index = FactIndex(adapter, ivf_train_rows=train_rows)
+        started = time.perf_counter()
+        index.add_many(facts)
+        index.embed_pending()
+        build_ms = (time.perf_counter() - started) * 1000.0
+        case: dict[str, float] = {"build_ms": round(build_ms, 1)}
+        for kind, probes in (("repeat", repeats), ("fresh", fresh)):
+            started = time.perf_counter()
+            scores = [index.max_similarity(query) for query in probes]
+            case[f"{kind}_query_ms"] = round((time.perf_counter() - started) * 1000.0 / len(probes), 3)
+            exact = [_exact(index, query) for query in probes]
+            case[f"{kind}_exact_share"] = round(sum(abs(a - b) < 1e-6 for a, b in zip(scores, exact)) / len(probes), 3)
+            case[f"{kind}_max_shortfall"] = round(max(b - a for a, b in zip(scores, exact)), 4)
+        report[name] = case
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="FactIndex.max_similarity: flat embedding scan vs IVF lists")
+    parser.add_argument("--facts", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    if not numpy_available():
+        raise SystemExit("numpy is not installed; the embedding side of FactIndex needs it")
+    report = {
+        "python": sys.version.split()[0],
+        "numpy": numpy.__version__,
+        f"facts={args.facts},dim={args.dim},queries={args.queries}": measure(args.facts, args.dim, args.queries, args.seed),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pocwc.orchestrator import SimulationConfig, SimulationEngine  # noqa: E402
+from pocwc.store import WorldStore  # noqa: E402
+
+# (listing, scalar column read by the hot-path caller)
+CASES: tuple[tuple[str, str], ...] = (
+    ("list_states", "artifact_x"),
+    ("list_challenges", "directive_type"),
+    ("list_candidates", "prover_id"),
+    ("list_verification_results", "verdict"),
+)
+
+
+def _best_of(repeat: int, fn: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000.0, 3)
+
+
+def measure(store: WorldStore, repeat: int) -> dict:
+    report: dict[str, dict] = {}
+    for method, column in CASES:
+        listing = getattr(store, method)
+        report[method] = {
+            "rows": len(listing()),
+            # dict() forces every JSON column, which is what the eager decoder used to do per row.
+            "eager_ms": _best_of(repeat, lambda: [dict(row) for row in listing()]),
+            "lazy_ms": _best_of(repeat, lambda: [row[column] for row in listing()]),
+            "projected_ms": _best_of(repeat, lambda: [row[column] for row in listing(columns=(column,))]),
+        }
+    return report
+
+
+def _populate(db_path: Path, steps: int, seed: int) -> None:
+    engine = SimulationEngine(SimulationConfig(db_path=db_path, steps=steps, seed=seed, llm_provider="none"))
+    try:
+        engine.run(steps)
+    finally:
+        engine.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare eager, lazy and projected WorldStore row decoding")
+    parser.add_argument("--db", type=Path, default=None, help="Existing database to read (default: generate one)")
+    parser.add_argument("--steps", type=int, default=1000, help="Steps to simulate when generating a database")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.db is not None:
+        store = WorldStore(args.db)
+        try:
+            print(json.dumps(measure(store, args.repeat), indent=2))
+        finally:
+            store.close()
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench_rows.db"
+        _populate(db_path, args.steps, args.seed)
+        store = WorldStore(db_path)
+        try:
+            print(json.dumps(measure(store, args.repeat), indent=2))
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pocwc.embedding_cache import CachedEmbeddingAdapter  # noqa: E402
+from pocwc.semantic import EmbeddingMatrix, cosine_similarity, numpy, numpy_available, semantic_similarity, semantic_similarity_many  # noqa: E402
+
+
+def _best_of(repeat: int, fn: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000.0, 3)
+
+
+def _vectors(rng: random.Random, count: int, dim: int) -> list[list[float]]:
+    return [[rng.uniform(-1.0, 1.0) for _ in range(dim)] for _ in range(count)]
+
+
+class RandomEmbedder:
+    """Fixed random vector per text, standing in for a provider."""
+
+    def __init__(self, dim: int, seed: int) -> None:
+        self.dim = dim
+        self.seed = seed
+
+    def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        return [_vectors(random.Random(f"{self.seed}:{text}"), 1, self.dim)[0] for text in texts]
+
+
+def measure_cached(dims: list[int], corpus_sizes: list[int], seed: int, repeat: int, queries: int = 8) -> dict:
+    # The hot-path shape: several candidate texts scored against the same recent texts, all embedded already.
+    backends = ["python"] + (["numpy"] if numpy_available() else [])
+    report: dict[str, dict] = {}
+    for dim in dims:
+        for size in corpus_sizes:
+            corpus = [f"recent fact {index} of the branch" for index in range(size)]
+            probes = [f"candidate fact {index}" for index in range(queries)]
+            cache = CachedEmbeddingAdapter(RandomEmbedder(dim, seed), model="bench")
+            cache.embed_texts(texts=[*corpus, *probes])
+            case: dict[str, float] = {
+                "pairwise_ms": _best_of(repeat, lambda: [[semantic_similarity(q, item, cache) for item in corpus] for q in probes]),
+            }
+            for backend in backends:
+                case[f"{backend}_many_ms"] = _best_of(
+                    repeat, lambda: [semantic_similarity_many(q, corpus, cache, backend=backend) for q in probes]
+                )
+            if case.get("numpy_many_ms"):
+                case["numpy_many_speedup"] = round(case["pairwise_ms"] / case["numpy_many_ms"], 1)
+            report[f"dim={dim},n={size},queries={queries}"] = case
+    return report
+
+
+def measure(dims: list[int], corpus_sizes: list[int], seed: int, repeat: int) -> dict:
+    backends = ["python"] + (["numpy"] if numpy_available() else [])
+    rng = random.Random(seed)
+    report: dict[str, dict] = {}
+    for dim in dims:
+        query = _vectors(rng, 1, dim)[0]
+        for size in corpus_sizes:
+            corpus = _vectors(rng, size, dim)
+            case: dict[str, float] = {
+                # What the hot path did before: one cosine_similarity call per pair.
+                "pairwise_ms": _best_of(repeat, lambda: [cosine_similarity(query, vector) for vector in corpus]),
+            }
+            for backend in backends:
+                matrix = EmbeddingMatrix(corpus, backend=backend)
+                case[f"{backend}_build_and_query_ms"] = _best_of(
+                    repeat, lambda: EmbeddingMatrix(corpus, backend=backend).similarities(query)
+                )
+                case[f"{backend}_query_ms"] = _best_of(repeat, lambda: matrix.similarities(query))
+            for kind in ("build_and_query", "query"):
+                if case.get(f"numpy_{kind}_ms"):
+                    case[f"numpy_{kind}_speedup"] = round(case["pairwise_ms"] / case[f"numpy_{kind}_ms"], 1)
+            report[f"dim={dim},n={size}"] = case
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare pairwise, pure-Python and numpy cosine similarity kernels")
+    parser.add_argument("--dims", default="1536,3072", help="Comma-separated embedding dimensions")
+    parser.add_argument("--sizes", default="8,64,512", help="Comma-separated corpus sizes")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    dims = [int(item) for item in args.dims.split(",") if item.strip()]
+    sizes = [int(item) for item in args.sizes.split(",") if item.strip()]
+    if not numpy_available():
+        print("numpy is not installed; reporting the pure-Python kernels only", file=sys.stderr)
+    report = {
+        "python": sys.version.split()[0],
+        "numpy": numpy.__version__ if numpy_available() else None,
+        "kernels": measure(dims, sizes, args.seed, args.repeat),
+        # semantic_similarity_many through CachedEmbeddingAdapter against per-pair semantic_similarity calls.
+        "cached_corpus": measure_cached(dims, sizes, args.seed, args.repeat),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pocwc.orchestrator import SimulationConfig, SimulationEngine  # noqa: E402
+
+
+def run(steps: int, seed: int, db_path: Path) -> dict:
+    engine = SimulationEngine(SimulationConfig(db_path=db_path, steps=steps, seed=seed, llm_provider="none"))
+    engine._seed_genesis()  # noqa: SLF001
+    started = time.perf_counter()
+    summary = engine.run(steps)
+    elapsed = time.perf_counter() - started
+    return {
+        "steps": steps,
+        "seed": seed,
+        "seconds": round(elapsed, 3),
+        "steps_per_sec": round(steps / elapsed, 2) if elapsed > 0 else None,
+        "accepted_candidates": summary["accepted_candidates"],
+        "db_bytes": db_path.stat().st_size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure offline simulation throughput (steps/sec)")
+    parser.add_argument("--steps", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--db", type=Path, default=None, help="Database path (default: temporary file)")
+    args = parser.parse_args()
+
+    if args.db is not None:
+        if args.db.exists():
+            args.db.unlink()
+        print(json.dumps(run(args.steps, args.seed, args.db), indent=2))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        print(json.dumps(run(args.steps, args.seed, Path(tmp) / "bench.db"), indent=2))
+
+
+if __name__ == "__main__":
+    main()
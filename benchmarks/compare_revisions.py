@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Runs inside the exported tree, so it may only use APIs every revision has: SimulationConfig(db_path, seed,
+# llm_provider) and run(steps, progress_callback). The callback records elapsed time at each checkpoint and
+# stops the run once the time limit is spent, so a slow revision still reports its early checkpoints.
+RUNNER = """
+import json, sys, time
+from pathlib import Path
+from pocwc.orchestrator import SimulationConfig, SimulationEngine
+
+steps, seed, limit, db_path = int(sys.argv[1]), int(sys.argv[2]), float(sys.argv[3]), Path(sys.argv[4])
+checkpoints = sorted({int(item) for item in sys.argv[5].split(",") if item} | {steps})
+report = {"steps_requested": steps, "checkpoints": {}}
+
+
+class TimeLimit(Exception):
+    pass
+
+
+engine = SimulationEngine(SimulationConfig(db_path=db_path, seed=seed, llm_provider="none"))
+engine._seed_genesis()
+done = 0
+started = time.perf_counter()
+
+
+def on_step(_event):
+    global done
+    done += 1
+    elapsed = time.perf_counter() - started
+    if done in checkpoints:
+        report["checkpoints"][str(done)] = {"seconds": round(elapsed, 3), "steps_per_sec": round(done / elapsed, 2)}
+    if elapsed > limit:
+        raise TimeLimit()
+
+
+try:
+    engine.run(steps, on_step)
+except TimeLimit:
+    pass
+report["steps_completed"] = done
+report["seconds"] = round(time.perf_counter() - started, 3)
+report["steps_per_sec"] = round(done / report["seconds"], 2) if report["seconds"] > 0 else None
+print(json.dumps(report))
+"""
+
+
+def _export(rev: str, dest: Path) -> Path:
+    archive = subprocess.run(["git", "archive", "--format=tar", rev, "src", "config"], cwd=ROOT, check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        tar.extractall(dest)
+    return dest
+
+
+def measure(tree: Path, steps: int, seed: int, time_limit: float, checkpoints: str, workdir: Path) -> dict:
+    env = {**os.environ, "PYTHONPATH": str(tree / "src")}
+    db_path = workdir / "bench.db"
+    for path in workdir.glob("bench.db*"):
+        path.unlink()
+    # cwd=tree: older revisions resolve the default world config relative to the working directory.
+    result = subprocess.run(
+        [sys.executable, "-c", RUNNER, str(steps), str(seed), str(time_limit), str(db_path), checkpoints],
+        cwd=tree,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline steps/sec of two revisions on the same seed and step count")
+    parser.add_argument("--base", required=True, help="Git revision to compare against, e.g. the commit before a change series")
+    parser.add_argument("--head", default=None, help="Git revision to measure (default: the working tree)")
+    parser.add_argument("--steps", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--checkpoints", default="500,1000,2000,5000", help="Step counts at which elapsed time is recorded")
+    parser.add_argument("--time-limit", type=float, default=3600.0, help="Seconds per revision before its run is cut short")
+    args = parser.parse_args()
+
+    report: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for label, rev in (("base", args.base), ("head", args.head)):
+            tree = ROOT if rev is None else _export(rev, workdir / label)
+            result = measure(tree, args.steps, args.seed, args.time_limit, args.checkpoints, workdir)
+            report[label] = {"revision": rev or "working tree", **result}
+    base, head = report["base"]["checkpoints"], report["head"]["checkpoints"]
+    report["speedup"] = {
+        step: round(base[step]["seconds"] / head[step]["seconds"], 2) for step in base if step in head and head[step]["seconds"] > 0
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pocwc.fact_schema import validate_and_normalize_fact_object  # noqa: E402
+from pocwc.orchestrator import SimulationConfig, SimulationEngine  # noqa: E402
+from pocwc.semantic import semantic_similarity  # noqa: E402
+from pocwc.verifiers import NoveltyGateVerifier  # noqa: E402
+
+try:  # not available on Windows
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+DEFAULT_SIZES = (100, 1000, 10000)
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# Phases reported per engine run; "step" is the whole transaction.
+PHASES = (
+    "step",
+    "build_challenge",
+    "prover_generate",
+    "candidate_screen",
+    "repetition_check",
+    "evaluate_candidate",
+    "accept_candidate",
+    "ontological_stagnation",
+    "metrics",
+    "store_flush",
+)
+
+
+def _peak_rss_bytes() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB elsewhere.
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _engine_run(steps: int, seed: int) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        engine = SimulationEngine(SimulationConfig(db_path=db_path, steps=steps, seed=seed, llm_provider="none", profile=True))
+        try:
+            engine._seed_genesis()  # noqa: SLF001
+            started = time.perf_counter()
+            summary = engine.run(steps)
+            elapsed = time.perf_counter() - started
+        finally:
+            engine.close()
+        db_bytes = sum(path.stat().st_size for path in Path(tmp).iterdir() if path.name.startswith("bench.db"))
+    spans = summary["profile"]["spans"]
+    return {
+        "steps": steps,
+        "seconds": round(elapsed, 3),
+        "steps_per_sec": round(steps / elapsed, 2) if elapsed > 0 else None,
+        "accepted_candidates": summary["accepted_candidates"],
+        "db_bytes": db_bytes,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "db_statements_per_step": round(summary["profile"]["counters"].get("db.statements", 0) / steps, 2),
+        "phases": {
+            name: {key: spans[name][key] for key in ("mean_ms", "p50_ms", "p95_ms", "p99_ms")}
+            for name in PHASES
+            if name in spans
+        },
+    }
+
+
+def run_engine(steps: int, seed: int) -> dict[str, Any]:
+    # A fresh process per size keeps peak RSS attributable to that size alone.
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(_engine_run, (steps, seed))
+
+
+def _us_per_op(fn: Callable[[], object], *, number: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best / number * 1e6, 2)
+
+
+def run_micro(seed: int, *, history_steps: int = 200, repeat: int = 7) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = SimulationEngine(SimulationConfig(db_path=Path(tmp) / "micro.db", seed=seed, llm_provider="none"))
+        try:
+            engine.run(history_steps)
+            store = engine.store
+            challenge_id = store.list_challenges(last_n=1)[0]["challenge_id"]
+            candidate_id = store.list_candidates(challenge_id)[0]["candidate_id"]
+            branch = engine.branches.get(engine.main_branch_id)
+            challenge = engine._build_challenge(history_steps + 1, branch)  # noqa: SLF001
+            candidate = engine.provers[0].generate(challenge, 1)
+            novelty = next(v for v in engine.verifiers if isinstance(v, NoveltyGateVerifier))
+            policy = challenge.verifier_policy
+            fact_object = candidate.meta_m.get("fact_object", {})
+            states = store.list_states(branch_id=engine.main_branch_id, last_n=8)
+            texts = [str(state["artifact_x"]) for state in states]
+            pairs = [(a, b) for a in texts for b in texts if a is not b]
+            branch_id = engine.main_branch_id
+
+            return {
+                "semantic_similarity_us": round(
+                    _us_per_op(lambda: [semantic_similarity(a, b) for a, b in pairs], number=50, repeat=repeat)
+                    / max(1, len(pairs)),
+                    2,
+                ),
+                "validate_and_normalize_fact_object_us": _us_per_op(
+                    lambda: validate_and_normalize_fact_object(
+                        fact_object,
+                        policy,
+                        expected_fact_type=str(policy.get("expected_fact_type", "")),
+                        allow_coercion=bool(policy.get("allow_fact_object_coercion", False)),
+                    ),
+                    number=500,
+                    repeat=repeat,
+                ),
+                "novelty_gate_evaluate_us": _us_per_op(
+                    lambda: novelty.evaluate(challenge, candidate, allow_l3=True), number=200, repeat=repeat
+                ),
+                "list_states_tail_us": _us_per_op(
+                    lambda: store.list_states(branch_id=branch_id, last_n=8), number=200, repeat=repeat
+                ),
+                "list_challenges_tail_us": _us_per_op(
+                    lambda: store.list_challenges(branch_id=branch_id, last_n=12, columns=("directive_type",)),
+                    number=200,
+                    repeat=repeat,
+                ),
+                "list_candidates_us": _us_per_op(lambda: store.list_candidates(challenge_id), number=200, repeat=repeat),
+                "list_verification_results_us": _us_per_op(
+                    lambda: store.list_verification_results(candidate_id), number=200, repeat=repeat
+                ),
+                "list_branch_facts_us": _us_per_op(
+                    lambda: store.list_branch_facts(branch_id, limit=160), number=100, repeat=repeat
+                ),
+            }
+        finally:
+            engine.close()
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Regressions of ``report`` against ``baseline``: engine throughput must not drop, micro latencies must not grow."""
+    problems: list[str] = []
+    for size, current in report.get("engine", {}).items():
+        reference = baseline.get("engine", {}).get(size)
+        if not reference:
+            continue
+        # Per-phase latencies are too jittery on short runs to gate on; they are reported for diagnosis.
+        if current["steps_per_sec"] < reference["steps_per_sec"] * (1.0 - tolerance):
+            problems.append(f"engine[{size}].steps_per_sec {current['steps_per_sec']} < baseline {reference['steps_per_sec']}")
+    for name, value in report.get("micro", {}).items():
+        ref = baseline.get("micro", {}).get(name)
+        if ref and value > ref * (1.0 + tolerance):
+            problems.append(f"micro.{name} {value} > baseline {ref}")
+    return problems
+
+
+def machine() -> dict[str, Any]:
+    """Where a report was measured, so a baseline is only trusted on comparable hardware."""
+    cpu = platform.processor()
+    try:
+        for line in Path("/proc/cpuinfo").read_text(encoding="utf-8").splitlines():
+            if line.startswith("model name"):
+                cpu = line.split(":", 1)[1].strip()
+                break
+    except OSError:
+        pass
+    revision = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).resolve().parents[1], capture_output=True, text=True
+    ).stdout.strip()
+    return {"arch": platform.machine(), "cpu": cpu or None, "cpu_count": os.cpu_count(), "revision": revision or None}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline SimulationEngine benchmark suite (fallback provers, no LLM)")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES), help="Comma-separated step counts")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.35, help="Allowed relative slowdown before flagging")
+    parser.add_argument("--output", type=Path, default=None, help="Also write the report to this file")
+    args = parser.parse_args()
+
+    sizes = [int(item) for item in args.sizes.split(",") if item.strip()]
+    report: dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": machine(),
+        "seed": args.seed,
+        "engine": {str(size): run_engine(size, args.seed) for size in sizes},
+    }
+    if not args.skip_micro:
+        report["micro"] = run_micro(args.seed)
+    print(json.dumps(report, indent=2))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+    problems = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    if problems:
+        raise SystemExit(1)
+    print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
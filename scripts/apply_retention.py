@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from pocwc.store import RetentionPolicy, WorldStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize and archive non-accepted candidates of older steps (safe while the engine runs)")
+    parser.add_argument("--db", type=Path, default=Path("data/world.db"))
+    parser.add_argument("--keep-steps", type=int, default=200, help="Newest steps kept in full")
+    parser.add_argument("--archive", type=Path, default=None, help="Archive database for retired rows (default: drop them after summarizing)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Challenges retired per write transaction")
+    args = parser.parse_args()
+    if args.keep_steps < 1:
+        parser.error("--keep-steps must be >= 1")
+
+    store = WorldStore(args.db)
+    try:
+        report = store.apply_retention(
+            RetentionPolicy(keep_last_steps=args.keep_steps, archive_path=args.archive, batch_size=args.batch_size)
+        )
+    finally:
+        store.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from pocwc.store import WorldStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompress stored artifacts and meta with a dictionary trained on this world")
+    parser.add_argument("--db", type=Path, default=Path("data/world.db"))
+    parser.add_argument("--compression", default="auto", help="Target encoding (none|zlib|zstd|auto)")
+    parser.add_argument("--no-train", action="store_true", help="Reuse the latest dictionary instead of training a new one")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards to return freed pages to the filesystem")
+    args = parser.parse_args()
+
+    store = WorldStore(args.db)
+    try:
+        report = store.compact(args.compression, train=not args.no_train, vacuum=args.vacuum)
+    finally:
+        store.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
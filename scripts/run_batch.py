@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from pocwc.batch import run_batch
+from pocwc.orchestrator import SimulationConfig
+
+
+def _parse_seeds(raw: str) -> list[int]:
+    # "1,2,5" or ranges such as "1-8", or a mix: "1-4,10".
+    seeds: list[int] = []
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if "-" in item:
+            start, end = item.split("-", 1)
+            seeds.extend(range(int(start), int(end) + 1))
+        else:
+            seeds.append(int(item))
+    if not seeds:
+        raise argparse.ArgumentTypeError("at least one seed is required")
+    return seeds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a (world config x seed) matrix of simulations across worker processes")
+    parser.add_argument(
+        "--world-config",
+        type=Path,
+        action="append",
+        default=None,
+        help="World configuration JSON (repeat for several; default: config/world.default.json)",
+    )
+    parser.add_argument("--seeds", type=_parse_seeds, default=[7], help="Seeds, e.g. 1-8 or 3,5,11")
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--out-dir", type=Path, default=Path("data/batch"), help="One database per job is written here")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--trajectory-stride", type=int, default=1, help="Keep every Nth controller epoch in the report")
+    parser.add_argument("--report", type=Path, default=None, help="Merged report path (default: <out-dir>/report.json)")
+    parser.add_argument("--overwrite", action="store_true", help="Replace job databases left by an earlier batch")
+    parser.add_argument("--llm-provider", default=None, help="LLM provider (none|openrouter)")
+    parser.add_argument("--llm-model", default=None, help="LLM model id for provider")
+    parser.add_argument("--llm-base-url", default=None, help="Override provider base URL")
+    parser.add_argument("--story-language", default="english", help="Requested story generation language")
+    parser.add_argument("--storage-compression", default="none", help="Compress state/candidate artifacts and meta (none|zlib|zstd|auto)")
+    parser.add_argument("--branch-concurrency", type=int, default=0, help="Branches stepped per round inside each job (0 = one)")
+    args = parser.parse_args()
+
+    worlds = args.world_config or [Path("config/world.default.json")]
+    config = SimulationConfig(
+        steps=args.steps,
+        llm_provider=args.llm_provider,
+        llm_model=args.llm_model,
+        llm_base_url=args.llm_base_url,
+        story_language=args.story_language,
+        storage_compression=args.storage_compression,
+        branch_concurrency=args.branch_concurrency,
+    )
+    workers = args.workers or os.cpu_count() or 1
+    print(f"{len(worlds) * len(args.seeds)} jobs on {workers} worker processes -> {args.out_dir}")
+
+    def _job_done(result: dict) -> None:
+        label = f"{Path(result['world_config']).stem} seed={result['seed']}"
+        if "error" in result:
+            print(f"  FAILED {label}: {result['error']}")
+            return
+        metrics = result["metrics"]
+        print(
+            f"  done   {label}: accept_rate={metrics['accept_rate']:.3f} branches={metrics['branches']} "
+            f"debt={metrics['semantic_debt_est']:.3f} {metrics['steps_per_sec']} steps/s"
+        )
+
+    report = run_batch(
+        config,
+        worlds,
+        args.seeds,
+        args.out_dir,
+        workers=workers,
+        trajectory_stride=args.trajectory_stride,
+        overwrite=args.overwrite,
+        on_result=_job_done,
+    )
+    report_path = args.report or args.out_dir / "report.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(json.dumps(report["aggregate"], indent=2, ensure_ascii=False))
+    print(f"Report written to {report_path} ({report['wall_seconds']}s wall)")
+    if report["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 ﻿from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 from pathlib import Path
 
+from pocwc.async_engine import AsyncSimulationEngine
 from pocwc.orchestrator import SimulationConfig, SimulationEngine
+from pocwc.progress import PROGRESS_VERBOSITY, CallbackSink, FanoutSink, JsonlSink, ProgressSink
 
 
 def _style(label: str, value: str, *, color: str = "36") -> str:
@@ -66,6 +69,8 @@ def _render_progress(update: dict) -> None:
     artifact = str(update.get("artifact") or "")
     candidate_artifact = str(update.get("candidate_artifact") or "")
     candidate_score = update.get("candidate_score")
+    # Absent below "normal" verbosity.
+    narrated = "artifact" in update
     step_similarity = float(update.get("step_similarity") or 0.0)
     new_fact_count = int(update.get("new_fact_count") or 0)
     novel_fact_ratio = float(update.get("novel_fact_ratio") or 0.0)
@@ -100,19 +105,20 @@ def _render_progress(update: dict) -> None:
     )
     print(
         f"{_style('world:', f'debt={debt:.3f}  variance={variance:.4f}  forks={forks}', color='32')} "
-        f"{_style('ledger:', f'accepted={accepted} rejected={rejected}', color='32')} "
-        f"{_style('step_similarity:', f'{step_similarity:.3f}', color='34')}"
+        f"{_style('ledger:', f'accepted={accepted} rejected={rejected}', color='32')}"
+        + (f" {_style('step_similarity:', f'{step_similarity:.3f}', color='34')}" if narrated else "")
     )
     print(
         f"{_style('novelty:', f'new_fact_count={new_fact_count}  novel_fact_ratio={novel_fact_ratio:.3f}  semantic_delta={semantic_delta_score:.3f}', color='92')} "
         f"{_style('stagnation:', str(stagnation_streak), color='91')} "
         f"{_style('scene_streak:', str(scene_stagnation_streak), color='91')} "
-        f"{_style('ontological:', f'{ontological_stagnation:.3f}', color='95')} "
-        f"{_style('anchors:', str(active_anchor_count), color='96')}"
+        f"{_style('ontological:', f'{ontological_stagnation:.3f}', color='95')}"
+        + (f" {_style('anchors:', str(active_anchor_count), color='96')}" if narrated else "")
     )
     if projection_fact_ids:
         print(_style("projection_fact_ids:", ", ".join(str(x) for x in projection_fact_ids[-8:]), color="94"))
-    print(_style("narrative:", narrative if narrative else "(no narrative available)", color="36"))
+    if narrated:
+        print(_style("narrative:", narrative if narrative else "(no narrative available)", color="36"))
     if candidate_preview:
         extra = f"score={candidate_score}" if candidate_score is not None else "score=n/a"
         print(_style("candidate:", f"{candidate_preview} ({extra})", color="37"))
@@ -156,6 +162,31 @@ def _render_progress(update: dict) -> None:
         print(_style("adaptive:", f"reject streak={reject_streak}", color="31"))
     if escape_mode:
         print(_style("mode:", "escape mode active (forced concrete progression)", color="93"))
+    profile = update.get("profile") or {}
+    if profile:
+        spans = profile.get("spans_ms", {})
+        phases = "  ".join(f"{name}={ms:.1f}ms" for name, ms in sorted(spans.items(), key=lambda item: -item[1]) if name != "step")
+        db_statements = int(profile.get("counters", {}).get("db.statements", 0))
+        print(_style("profile:", f"step={float(spans.get('step', 0.0)):.1f}ms  db={db_statements}  {phases}", color="90"))
+
+
+def _render_profile(summary: dict) -> None:
+    print("\n\033[1;35m=== Profile ===\033[0m")
+    print(f"{'span':<24} {'count':>7} {'total_ms':>11} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, stats in sorted(summary.get("spans", {}).items(), key=lambda item: -item[1]["total_ms"]):
+        print(
+            f"{name:<24} {stats['count']:>7} {stats['total_ms']:>11.1f} "
+            f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+        )
+    for name, value in summary.get("counters", {}).items():
+        print(_style(f"{name}:", str(value), color="90"))
+
+
+async def _run_async(engine: AsyncSimulationEngine, steps: int, sink: ProgressSink) -> dict:
+    try:
+        return await engine.run(steps, progress_sink=sink)
+    finally:
+        await engine.aclose()
 
 
 def main() -> None:
@@ -170,22 +201,102 @@ def main() -> None:
     parser.add_argument("--llm-top-p", type=float, default=0.92, help="LLM nucleus sampling top-p")
     parser.add_argument("--world-config", type=Path, default=Path("config/world.default.json"), help="Path to world configuration JSON")
     parser.add_argument("--story-language", default="english", help="Requested story generation language")
+    parser.add_argument(
+        "--storage-compression",
+        default="none",
+        help="Compress state/candidate artifacts and meta (none|zlib|zstd|auto)",
+    )
+    parser.add_argument("--retention-keep-steps", type=int, default=0, help="Summarize rejected candidates older than N steps (0 = keep all)")
+    parser.add_argument("--retention-archive", type=Path, default=None, help="Archive database for retired candidate rows")
+    parser.add_argument(
+        "--prover-concurrency",
+        type=int,
+        default=0,
+        help="Run provers on N worker threads with per-prover RNG streams (0 = sequential)",
+    )
+    parser.add_argument("--prover-timeout", type=float, default=None, help="Per-call prover timeout in seconds (fan-out only)")
+    parser.add_argument(
+        "--verifier-concurrency",
+        type=int,
+        default=0,
+        help="Evaluate the verifier panel on N worker threads with per-verifier RNG streams (0 = sequential)",
+    )
+    parser.add_argument("--verifier-deadline", type=float, default=None, help="Verifier panel deadline in seconds (fan-out only)")
+    parser.add_argument(
+        "--branch-concurrency",
+        type=int,
+        default=0,
+        help="Step up to N active branches per round on N worker threads (0 = one branch per step)",
+    )
+    parser.add_argument(
+        "--pipeline-depth",
+        type=int,
+        default=0,
+        help="Commit steps on a background writer with up to N steps queued (0 = commit each step in place)",
+    )
+    parser.add_argument(
+        "--async-branches",
+        type=int,
+        default=0,
+        help="Step up to N branches per round on an asyncio event loop (0 = one step at a time)",
+    )
+    parser.add_argument(
+        "--embedding-cache-size",
+        type=int,
+        default=4096,
+        help="Embedding vectors kept in memory; they are also stored in the world DB (0 disables the cache)",
+    )
+    parser.add_argument(
+        "--fact-index",
+        action="store_true",
+        help="Check candidate facts for repeats against the whole branch history, not only the last 120 facts",
+    )
+    parser.add_argument(
+        "--progress-verbosity",
+        choices=PROGRESS_VERBOSITY,
+        default="normal",
+        help="Fields built for each progress event: minimal, normal, or full (adds per-candidate traces)",
+    )
+    parser.add_argument("--progress-jsonl", type=Path, default=None, help="Also append every progress event to this JSONL file")
+    parser.add_argument("--profile", action="store_true", help="Time each step phase and count DB statements and LLM calls")
+    parser.add_argument(
+        "--profile-trace",
+        type=Path,
+        default=None,
+        help="JSONL file for per-step profile records (default with --profile: <db>.profile.jsonl)",
+    )
     args = parser.parse_args()
+    profile_trace = args.profile_trace
+    if args.profile and profile_trace is None:
+        profile_trace = args.db.with_suffix(".profile.jsonl")
 
-    engine = SimulationEngine(
-        SimulationConfig(
-            db_path=args.db,
-            steps=args.steps,
-            seed=args.seed,
-            llm_provider=args.llm_provider,
-            llm_model=args.llm_model,
-            llm_base_url=args.llm_base_url,
-            llm_temperature=args.llm_temperature,
-            llm_top_p=args.llm_top_p,
-            story_language=args.story_language,
-            world_config_path=args.world_config,
-        )
+    config = SimulationConfig(
+        db_path=args.db,
+        steps=args.steps,
+        seed=args.seed,
+        llm_provider=args.llm_provider,
+        llm_model=args.llm_model,
+        llm_base_url=args.llm_base_url,
+        llm_temperature=args.llm_temperature,
+        llm_top_p=args.llm_top_p,
+        story_language=args.story_language,
+        world_config_path=args.world_config,
+        storage_compression=args.storage_compression,
+        retention_keep_steps=args.retention_keep_steps,
+        retention_archive_path=args.retention_archive,
+        prover_concurrency=args.prover_concurrency,
+        prover_timeout_s=args.prover_timeout,
+        verifier_concurrency=args.verifier_concurrency,
+        verifier_deadline_s=args.verifier_deadline,
+        branch_concurrency=args.branch_concurrency,
+        pipeline_depth=args.pipeline_depth,
+        embedding_cache_size=args.embedding_cache_size,
+        fact_index=args.fact_index,
+        profile=args.profile or args.profile_trace is not None,
+        profile_trace_path=profile_trace,
     )
+    async_engine = AsyncSimulationEngine(config, branch_concurrency=args.async_branches) if args.async_branches > 0 else None
+    engine = async_engine.engine if async_engine is not None else SimulationEngine(config)
     llm = engine.llm_status
     llm_mode = "enabled" if llm["enabled"] else "disabled"
     print(
@@ -198,9 +309,28 @@ def main() -> None:
     )
     genesis = engine.get_genesis_snapshot()
     _render_genesis(genesis)
-    summary = engine.run(args.steps, progress_callback=_render_progress)
+    sink: ProgressSink = CallbackSink(_render_progress, args.progress_verbosity)
+    jsonl = JsonlSink(args.progress_jsonl, args.progress_verbosity) if args.progress_jsonl is not None else None
+    if jsonl is not None:
+        sink = FanoutSink(sink, jsonl)
+    try:
+        if async_engine is not None:
+            summary = asyncio.run(_run_async(async_engine, args.steps, sink))
+        else:
+            try:
+                summary = engine.run(args.steps, progress_sink=sink)
+            finally:
+                engine.close()
+    finally:
+        if jsonl is not None:
+            jsonl.close()
+    profile = summary.pop("profile", None)
     print("\n\033[1;32m=== Final Summary ===\033[0m")
     print(json.dumps(summary, indent=2))
+    if profile:
+        _render_profile(profile)
+        if profile_trace is not None:
+            print(_style("profile trace:", str(profile_trace), color="35"))
 
 
 if __name__ == "__main__":
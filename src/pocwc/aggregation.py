@@ -19,6 +19,9 @@ class Aggregator:
         self.reject_quorum = reject_quorum
         self.accept_threshold = accept_threshold
 
+    def reject_quorum_reached(self, results: list[VerificationResult]) -> bool:
+        return sum(1 for r in results if r.verdict == Verdict.REJECT) >= self.reject_quorum
+
     def decide(
         self,
         results: list[VerificationResult],
@@ -45,7 +48,6 @@ class Aggregator:
         )
         composite_score = max(0.0, min(1.0, composite_score))
 
-        rejects = [r for r in results if r.verdict == Verdict.REJECT]
         accepts = [r for r in results if r.verdict == Verdict.ACCEPT]
 
         level_counts: dict[str, int] = {}
@@ -62,7 +64,7 @@ class Aggregator:
         elif not progress_gate:
             reasons.append("Hard fail: progress gate")
             verdict = Verdict.REJECT
-        elif len(rejects) >= self.reject_quorum:
+        elif self.reject_quorum_reached(results):
             reasons.append("Reject quorum reached")
             verdict = Verdict.REJECT
         elif composite_score >= self.accept_threshold and len(accepts) >= 2:
@@ -1,13 +1,21 @@
 ﻿from __future__ import annotations
 
 import json
+from collections.abc import Mapping
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
-from .metrics import RuntimeStats, compute_metrics
+from .metrics import RuntimeStats, compute_metrics_from_rollup
 from .orchestrator import SimulationConfig, SimulationEngine
+from .store import WorldStore
+
+
+def _json_default(value: object) -> object:
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
 
 class WorldAPIHandler(BaseHTTPRequestHandler):
@@ -15,7 +23,7 @@ class WorldAPIHandler(BaseHTTPRequestHandler):
     static_root = Path(__file__).parent / "web" / "ui"
 
     def _json(self, payload: dict | list, status: int = 200) -> None:
-        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        data = json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
         self.send_response(status)
         self.send_header("Content-Type", "application/json; charset=utf-8")
         self.send_header("Content-Length", str(len(data)))
@@ -59,8 +67,7 @@ class WorldAPIHandler(BaseHTTPRequestHandler):
 
         if path == "/api/overview":
             branches = self.store.list_branches()
-            results = self.store.list_verification_results()
-            metrics = compute_metrics(branches, results, RuntimeStats())
+            metrics = compute_metrics_from_rollup(branches, self.store.get_metrics_rollup(), RuntimeStats())
             self._json({"branches": branches, "metrics": metrics, "controller": self.store.latest_epoch()})
             return
 
@@ -90,7 +97,8 @@ class WorldAPIHandler(BaseHTTPRequestHandler):
                 self._json({"error": "challenge not found"}, 404)
                 return
             candidates = self.store.list_candidates(challenge_id=challenge_id)
-            self._json({"challenge": challenge, "candidates": candidates})
+            retired = self.store.get_candidate_summary(challenge_id)
+            self._json({"challenge": challenge, "candidates": candidates, "retired_candidates": retired})
             return
 
         if path == "/api/challenges":
@@ -109,8 +117,7 @@ class WorldAPIHandler(BaseHTTPRequestHandler):
 
         if path == "/api/metrics":
             branches = self.store.list_branches()
-            verification = self.store.list_verification_results()
-            self._json(compute_metrics(branches, verification, RuntimeStats()))
+            self._json(compute_metrics_from_rollup(branches, self.store.get_metrics_rollup(), RuntimeStats()))
             return
 
         if path == "/api/search":
@@ -166,15 +173,10 @@ class WorldAPIHandler(BaseHTTPRequestHandler):
                 limit = int(limit_raw)
             except ValueError:
                 limit = 30
-            challenges = self.store.list_challenges(branch_id=branch_id)[-max(1, min(limit, 200)) :]
-            challenge_ids = {str(ch.get("challenge_id", "")) for ch in challenges}
-            candidates = [
-                c
-                for c in self.store.list_candidates()
-                if str(c.get("challenge_id", "")) in challenge_ids
-            ]
+            challenges = self.store.list_challenges(branch_id=branch_id, last_n=max(1, min(limit, 200)))
+            candidates = self.store.list_candidates(challenge_ids=[str(ch.get("challenge_id", "")) for ch in challenges])
             by_candidate = {str(c.get("candidate_id", "")): [] for c in candidates}
-            for row in self.store.list_verification_results():
+            for row in self.store.list_verification_results(candidate_ids=list(by_candidate)):
                 cid = str(row.get("candidate_id", ""))
                 if cid in by_candidate:
                     by_candidate[cid].append(row)
@@ -184,7 +186,7 @@ class WorldAPIHandler(BaseHTTPRequestHandler):
                 meta = cand.get("meta_m", {})
                 verification_rows = by_candidate.get(cid, [])
                 novelty_row = next((row for row in verification_rows if str(row.get("verifier_id", "")) == "verifier-novelty"), {})
-                novelty_signals = novelty_row.get("signals", {}) if isinstance(novelty_row, dict) else {}
+                novelty_signals = novelty_row.get("signals", {}) if isinstance(novelty_row, Mapping) else {}
                 payload.append(
                     {
                         "challenge_id": cand.get("challenge_id"),
@@ -208,10 +210,12 @@ def run_api_server(
     host: str = "127.0.0.1",
     port: int = 8080,
     world_config_path: Path = Path("config/world.default.json"),
+    pool_size: int = 8,
 ) -> None:
     engine = SimulationEngine(SimulationConfig(db_path=db_path, world_config_path=world_config_path))
     engine._seed_genesis()
-    WorldAPIHandler.store = engine.store
+    engine.close()
+    WorldAPIHandler.store = WorldStore(db_path, pool_size=pool_size)
     server = ThreadingHTTPServer((host, port), WorldAPIHandler)
     print(f"Serving PoCWC world browser at http://{host}:{port}")
     server.serve_forever()
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import replace
+from typing import Any, Callable, Generator
+
+from .domain import Challenge, VerificationResult
+from .llm import AsyncLLMAdapter, BlockingLLMAdapter, LLMSettings, create_async_llm_adapter
+from .orchestrator import SimulationConfig, SimulationEngine, StepOutcome, StepRequest
+from .progress import ProgressSink, verbosity_level
+
+
+class AsyncSimulationEngine:
+    """Steps several branches at once from one event loop.
+
+    Each round takes up to ``branch_concurrency`` distinct active branches. Their step
+    logic runs on a single store-writer thread, inside one transaction per round, while
+    the prover calls, verifier panels and embedding prefetches of all of them are awaited
+    together. Provers and verifiers stay synchronous: they run on a bounded thread pool
+    and reach the async LLM client through a ``BlockingLLMAdapter``. Every call draws from its own
+    seeded RNG, as in the engine's fan-out mode, so a run depends on the seed and the
+    round width, not on call timing. Streaks are tracked per branch, as with the engine's
+    ``branch_concurrency`` scheduler.
+    """
+
+    def __init__(
+        self,
+        config: SimulationConfig,
+        *,
+        branch_concurrency: int | None = None,
+        max_inflight_calls: int = 16,
+        llm_adapter: AsyncLLMAdapter | None = None,
+    ) -> None:
+        if branch_concurrency is None:
+            branch_concurrency = config.branch_concurrency or 4
+        if branch_concurrency < 1:
+            raise ValueError(f"branch_concurrency must be >= 1, got {branch_concurrency}")
+        if max_inflight_calls < 1:
+            raise ValueError(f"max_inflight_calls must be >= 1, got {max_inflight_calls}")
+        if config.pipeline_depth > 0:
+            raise ValueError("pipeline_depth is only supported by SimulationEngine.run")
+        if llm_adapter is None:
+            llm_adapter = create_async_llm_adapter(
+                LLMSettings.from_env(
+                    provider_override=config.llm_provider,
+                    model_override=config.llm_model,
+                    base_url_override=config.llm_base_url,
+                )
+            )
+        self.async_llm = llm_adapter
+        self._bridge = BlockingLLMAdapter(llm_adapter) if llm_adapter is not None else None
+        self.engine = SimulationEngine(replace(config, branch_concurrency=branch_concurrency), llm_adapter=self._bridge)
+        self.branch_concurrency = branch_concurrency
+        self.max_inflight_calls = max_inflight_calls
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="store-writer")
+        self._calls = ThreadPoolExecutor(max_workers=max_inflight_calls, thread_name_prefix="llm-call")
+        self._slots: asyncio.Semaphore | None = None
+
+    async def aclose(self) -> None:
+        if self.async_llm is not None:
+            await self.async_llm.aclose()
+        self._calls.shutdown(wait=False, cancel_futures=True)
+        self._writer.shutdown(wait=True)
+        self.engine.close()
+
+    async def _on_writer(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._writer, fn, *args)
+
+    async def _start_call(self, span: str, fn: Callable[..., Any], *args: Any) -> tuple[asyncio.Future, asyncio.Future]:
+        """Starts ``fn`` on a call worker; returns its result future and one that gets the monotonic time it started.
+
+        The call holds one of the ``max_inflight_calls`` slots until its thread returns, even
+        when the caller stops waiting for it (a timeout, a cancelled panel), so a call that
+        has a slot always has a free worker.
+        """
+        assert self._slots is not None
+        loop = asyncio.get_running_loop()
+        profiler = self.engine.profiler
+        begun: asyncio.Future = loop.create_future()
+
+        def mark_begun(started: float) -> None:
+            if not begun.done():
+                begun.set_result(started)
+
+        def call() -> Any:
+            loop.call_soon_threadsafe(mark_begun, time.monotonic())
+            with profiler.span(span):
+                return fn(*args)
+
+        def release(_: Any) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._slots.release)
+
+        await self._slots.acquire()
+        try:
+            future = self._calls.submit(call)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(release)
+        return asyncio.wrap_future(future), begun
+
+    async def _on_worker(self, span: str, fn: Callable[..., Any], *args: Any) -> Any:
+        result, _ = await self._start_call(span, fn, *args)
+        return await result
+
+    async def run(
+        self,
+        steps: int | None = None,
+        progress_callback: Callable[[dict[str, Any]], None] | None = None,
+        *,
+        progress_sink: ProgressSink | None = None,
+    ) -> dict[str, Any]:
+        engine = self.engine
+        sink = engine._progress_sink(progress_callback, progress_sink)
+        level = verbosity_level(sink.verbosity) if sink is not None else 0
+        total_steps = steps or engine.config.steps
+        self._slots = asyncio.Semaphore(self.max_inflight_calls)
+        if self._bridge is not None:
+            self._bridge.bind(asyncio.get_running_loop())
+        try:
+            existing_challenges = await self._on_writer(self._prepare)
+            done = 0
+            while done < total_steps:
+                first_step = existing_challenges + done + 1
+                outcomes = await self._run_round(first_step, min(self.branch_concurrency, total_steps - done))
+                for outcome in outcomes:
+                    if sink is not None:
+                        # Emitted on the writer too, as the sync engine defers sink.emit, so a slow sink never stalls the loop.
+                        await self._on_writer(self._emit_progress, sink, outcome, total_steps, level)
+                    await self._on_writer(engine._maybe_apply_retention, outcome.step)
+                done += len(outcomes)
+            await self._on_writer(engine._flush_embeddings)
+            return await self._on_writer(engine._final_metrics)
+        finally:
+            if self._bridge is not None:
+                self._bridge.bind(None)
+
+    def _emit_progress(self, sink: ProgressSink, outcome: StepOutcome, total_steps: int, level: int) -> None:
+        sink.emit(self.engine._progress_event(outcome, total_steps, level))
+
+    def _prepare(self) -> int:
+        engine = self.engine
+        engine._invalidate_caches()
+        engine._seed_genesis()
+        engine._metrics_rollup()
+        for progress in engine.branch_progress.values():
+            progress.reject_streak = 0
+        return engine.store.count_challenges()
+
+    async def _run_round(self, first_step: int, width: int) -> list[StepOutcome]:
+        engine = self.engine
+        transaction = ExitStack()
+        snapshot: dict[str, Any] = {}
+
+        def begin() -> list[Generator[StepRequest, Any, StepOutcome]]:
+            engine.profiler.begin_step(first_step)
+            snapshot.update(engine._snapshot_state())
+            engine._load_fact_indexes()
+            transaction.enter_context(engine.store.transaction())
+            return [engine._step_phases(first_step + offset, branch) for offset, branch in enumerate(engine._choose_branches(width))]
+
+        def commit() -> None:
+            with engine.profiler.span("store_flush"):
+                transaction.close()
+            engine.profiler.end_step()
+
+        def abort(exc_info: Any) -> None:
+            transaction.__exit__(*exc_info)
+            # The cached branch rows and contexts may hold writes that were just rolled back.
+            engine._invalidate_caches()
+            if snapshot:
+                engine._restore_state(snapshot)
+            engine.profiler.end_step()
+
+        try:
+            phases = await self._on_writer(begin)
+            outcomes: dict[int, StepOutcome] = {}
+            answers: dict[int, Any] = dict.fromkeys(range(len(phases)))
+            while answers:
+                requests = await self._on_writer(engine._advance_phases, phases, answers, outcomes)
+                indices = list(requests)
+                replies = await asyncio.gather(*(self._answer(requests[index]) for index in indices))
+                answers = dict(zip(indices, replies))
+            await self._on_writer(commit)
+        except BaseException:
+            # Waited on synchronously so that a cancelled run still rolls back before returning.
+            self._writer.submit(abort, sys.exc_info()).result()
+            raise
+        return [outcomes[index] for index in sorted(outcomes)]
+
+    async def _answer(self, request: StepRequest) -> Any:
+        if request.kind == "generate":
+            return await self._generate_candidates(request.challenge)
+        if request.kind == "verify":
+            return await self._run_verifiers(request.challenge, request.candidate)
+        if request.kind == "embed":
+            # Off the store writer: provider round-trips are awaited on the loop through the bridge.
+            return await self._on_worker("embedding_prefetch", self.engine._prefetch_embeddings, request)
+        raise ValueError(f"Unknown step request: {request.kind}")
+
+    async def _generate_candidates(self, challenge: Challenge) -> list[Any]:
+        engine = self.engine
+        timeout = engine.config.prover_timeout_s
+
+        async def call(prover: Any, index: int) -> Any:
+            seeded = replace(prover, rng=engine._prover_rng(challenge, prover))
+            result, begun = await self._start_call("prover_generate", seeded.generate, challenge, index)
+            if timeout is None:
+                return await result
+            # The per-call clock starts when the worker picks the call up, as in SimulationEngine._await_prover.
+            await asyncio.wait((begun, result), return_when=asyncio.FIRST_COMPLETED)
+            if not begun.done():
+                # Cancelled before a worker picked it up.
+                return await result
+            try:
+                return await asyncio.wait_for(result, max(0.0, begun.result() + timeout - time.monotonic()))
+            except asyncio.TimeoutError:
+                engine.profiler.count("prover.timeouts")
+            # Offline, but still CPU work: keep it off the event loop like the call it replaces.
+            offline = replace(prover, rng=engine._prover_rng(challenge, prover), llm=None)
+            fallback = await self._on_worker("prover_generate", offline.generate, challenge, index)
+            fallback.meta_m["llm_error"] = f"prover call timed out after {timeout}s"
+            return fallback
+
+        return list(await asyncio.gather(*(call(prover, index) for index, prover in enumerate(engine.provers, start=1))))
+
+    async def _run_verifiers(self, challenge: Challenge, candidate: Any) -> list[VerificationResult]:
+        engine = self.engine
+        loop = asyncio.get_running_loop()
+        deadline = engine.config.verifier_deadline_s
+        deadline_at = loop.time() + deadline if deadline is not None else None
+
+        async def call(verifier: Any) -> VerificationResult:
+            # A cancelled call whose thread is already running keeps its slot until it returns.
+            seeded = replace(verifier, rng=engine._verifier_rng(candidate, verifier))
+            return await self._on_worker("verifier_evaluate", seeded.evaluate, challenge, candidate, True)
+
+        tasks = [asyncio.ensure_future(call(verifier)) for verifier in engine.verifiers]
+        results: list[VerificationResult] = []
+        try:
+            for verifier, task in zip(engine.verifiers, tasks):
+                # Same panel-order prefix rule as SimulationEngine._run_verifiers.
+                if engine.aggregator.reject_quorum_reached(results):
+                    engine.profiler.count("verifier.short_circuits")
+                    break
+                remaining = None if deadline_at is None else max(0.0, deadline_at - loop.time())
+                try:
+                    results.append(await asyncio.wait_for(asyncio.shield(task), remaining))
+                except asyncio.TimeoutError:
+                    engine.profiler.count("verifier.timeouts")
+                    offline = replace(verifier, rng=engine._verifier_rng(candidate, verifier), llm=None)
+                    result = await self._on_worker("verifier_evaluate", offline.evaluate, challenge, candidate, True)
+                    result.notes = f"{result.notes}; panel deadline of {deadline}s exceeded, evaluated offline"
+                    results.append(result)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return results
+
+
+def run_async_simulation(
+    config: SimulationConfig,
+    *,
+    steps: int | None = None,
+    branch_concurrency: int = 4,
+    progress_callback: Callable[[dict[str, Any]], None] | None = None,
+    progress_sink: ProgressSink | None = None,
+) -> dict[str, Any]:
+    """Blocking entry point: runs an ``AsyncSimulationEngine`` on a fresh event loop and closes it."""
+
+    async def main() -> dict[str, Any]:
+        engine = AsyncSimulationEngine(config, branch_concurrency=branch_concurrency)
+        try:
+            return await engine.run(steps, progress_callback, progress_sink=progress_sink)
+        finally:
+            await engine.aclose()
+
+    return asyncio.run(main())
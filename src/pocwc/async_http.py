@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import ssl
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+# Safe to send again after a pooled connection dropped mid-request (RFC 9110, section 9.2.2).
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE"})
+
+
+@dataclass(slots=True)
+class HTTPResponse:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+
+@dataclass(slots=True)
+class _Origin:
+    limit: asyncio.Semaphore
+    idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = field(default_factory=list)
+
+
+class AsyncHTTPClient:
+    """Minimal HTTP/1.1 client on asyncio streams with keep-alive connection pools.
+
+    Each origin (scheme, host, port) keeps up to ``max_connections_per_origin`` open
+    connections; idle ones are reused by later requests. Bodies are read by
+    Content-Length or chunked encoding, or up to EOF on a ``Connection: close``
+    response; 1xx, 204, 304 and HEAD responses have none. A request that fails on a
+    pooled connection is retried once on a fresh one, unless it was already sent
+    and its method is not idempotent. One client belongs to one event loop.
+    """
+
+    def __init__(self, *, timeout: float = 30.0, max_connections_per_origin: int = 8) -> None:
+        if max_connections_per_origin < 1:
+            raise ValueError("max_connections_per_origin must be >= 1")
+        self.timeout = timeout
+        self.max_connections_per_origin = max_connections_per_origin
+        self.connections_opened = 0
+        self._origins: dict[tuple[str, str, int], _Origin] = {}
+        self._ssl: ssl.SSLContext | None = None
+
+    def _origin(self, key: tuple[str, str, int]) -> _Origin:
+        origin = self._origins.get(key)
+        if origin is None:
+            origin = self._origins[key] = _Origin(asyncio.Semaphore(self.max_connections_per_origin))
+        return origin
+
+    async def _connect(self, key: tuple[str, str, int]) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        scheme, host, port = key
+        context = None
+        if scheme == "https":
+            if self._ssl is None:
+                self._ssl = ssl.create_default_context()
+            context = self._ssl
+        reader, writer = await asyncio.open_connection(host, port, ssl=context)
+        self.connections_opened += 1
+        return reader, writer
+
+    async def request(self, method: str, url: str, *, body: bytes = b"", headers: dict[str, str] | None = None) -> HTTPResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        host_header = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host_header}", f"Content-Length: {len(body)}", "Connection: keep-alive"]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+        origin = self._origin(key)
+        async with origin.limit:
+            pooled = self._take_idle(origin)
+            if pooled is not None:
+                reader, writer = pooled
+                sent = False
+                try:
+                    await asyncio.wait_for(self._send(writer, payload), self.timeout)
+                    sent = True
+                    response, reusable = await asyncio.wait_for(self._receive(reader, method), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    # The server may have closed it while idle. Once the request is out it may also have
+                    # acted on it, so only idempotent requests go out a second time.
+                    if sent and method.upper() not in IDEMPOTENT_METHODS:
+                        raise
+                except BaseException:
+                    writer.close()
+                    raise
+                else:
+                    self._release(origin, reader, writer, reusable)
+                    return response
+            reader, writer = await asyncio.wait_for(self._connect(key), self.timeout)
+            try:
+                await asyncio.wait_for(self._send(writer, payload), self.timeout)
+                response, reusable = await asyncio.wait_for(self._receive(reader, method), self.timeout)
+            except BaseException:
+                writer.close()
+                raise
+            self._release(origin, reader, writer, reusable)
+            return response
+
+    @staticmethod
+    def _take_idle(origin: _Origin) -> tuple[asyncio.StreamReader, asyncio.StreamWriter] | None:
+        while origin.idle:
+            reader, writer = origin.idle.pop()
+            # Closed by the server while idle, and already noticed: nothing gets sent on it.
+            if reader.at_eof() or writer.is_closing():
+                writer.close()
+                continue
+            return reader, writer
+        return None
+
+    @staticmethod
+    def _release(origin: _Origin, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, reusable: bool) -> None:
+        if reusable:
+            origin.idle.append((reader, writer))
+        else:
+            writer.close()
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, payload: bytes) -> None:
+        writer.write(payload)
+        await writer.drain()
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader) -> tuple[str, int, dict[str, str]]:
+        status_line = await reader.readuntil(b"\r\n")
+        version, _, rest = status_line.decode("latin-1").strip().partition(" ")
+        try:
+            status = int(rest.split(" ", 1)[0])
+        except ValueError as exc:
+            raise ConnectionError(f"Malformed HTTP status line: {status_line!r}") from exc
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return version, status, headers
+
+    async def _receive(self, reader: asyncio.StreamReader, method: str) -> tuple[HTTPResponse, bool]:
+        version, status, headers = await self._read_head(reader)
+        # Interim responses (100 Continue, 103 Early Hints) have no body; the final response follows.
+        while 100 <= status < 200 and status != 101:
+            version, status, headers = await self._read_head(reader)
+
+        # HTTP/1.0 servers close after every response.
+        close = version != "HTTP/1.1" or headers.get("connection", "").lower() == "close"
+        reusable = not close and status != 101
+        if method.upper() == "HEAD" or status in (101, 204, 304):
+            body = b""
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks: list[bytes] = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    # Skip trailers up to the terminating blank line.
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        elif close:
+            # Unframed bodies end when the server closes the connection.
+            body = await reader.read()
+        else:
+            # Reading to EOF would hang on a connection the server keeps open.
+            raise ConnectionError(f"HTTP {status} response has no Content-Length or chunked body on a keep-alive connection")
+        return HTTPResponse(status, headers, body), reusable
+
+    async def aclose(self) -> None:
+        for origin in self._origins.values():
+            while origin.idle:
+                _, writer = origin.idle.pop()
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except (ConnectionError, ssl.SSLError):
+                    pass
+        self._origins.clear()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from pathlib import Path
+from statistics import mean
+from typing import Any, Callable, Iterable
+
+from .orchestrator import SimulationConfig, SimulationEngine
+
+# Final metrics summarized across the seeds of one world config.
+AGGREGATED_METRICS: tuple[str, ...] = (
+    "accept_rate",
+    "fork_rate",
+    "validator_variance",
+    "semantic_debt_est",
+    "branches",
+    "accepted_candidates",
+    "rejected_candidates",
+    "steps_per_sec",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class BatchJob:
+    world_config_path: Path
+    seed: int
+    db_path: Path
+
+
+def plan_jobs(world_configs: Iterable[Path], seeds: Iterable[int], out_dir: Path) -> list[BatchJob]:
+    """One job per (world config, seed), each writing to ``<out_dir>/<world stem>-seed<seed>.db``."""
+    worlds = [Path(path) for path in world_configs]
+    seed_list = list(seeds)
+    stems = [path.stem for path in worlds]
+    duplicates = sorted({stem for stem in stems if stems.count(stem) > 1})
+    if duplicates:
+        raise ValueError(f"World configs must have distinct file names, got duplicates: {', '.join(duplicates)}")
+    if len(set(seed_list)) != len(seed_list):
+        raise ValueError("Seeds must be distinct")
+    return [BatchJob(world, seed, out_dir / f"{world.stem}-seed{seed}.db") for world in worlds for seed in seed_list]
+
+
+def run_job(job: BatchJob, config: SimulationConfig, trajectory_stride: int = 1) -> dict[str, Any]:
+    """Runs one job to completion in the current process. Top-level so worker processes can unpickle it."""
+    config = replace(config, db_path=job.db_path, seed=job.seed, world_config_path=job.world_config_path)
+    if config.profile_trace_path is not None:
+        # One trace per job; workers must not append to a shared file.
+        config = replace(config, profile_trace_path=job.db_path.with_suffix(".profile.jsonl"))
+    engine = SimulationEngine(config)
+    try:
+        started = time.perf_counter()
+        metrics = engine.run(config.steps)
+        elapsed = time.perf_counter() - started
+        trajectory = [
+            {
+                "step": int(row["step"]),
+                "mode": row["mode"],
+                "theta": float(row["theta"]),
+                "difficulty": row["difficulty"],
+                "accept_rate": row["metrics"].get("accept_rate"),
+                "semantic_debt_est": row["metrics"].get("semantic_debt_est"),
+                "ontological_stagnation": row["metrics"].get("ontological_stagnation"),
+            }
+            for row in engine.store.list_controller_epochs(stride=trajectory_stride)
+        ]
+    finally:
+        engine.close()
+    metrics["steps_per_sec"] = round(config.steps / elapsed, 2) if elapsed > 0 else None
+    return {
+        **_job_fields(job),
+        "seconds": round(elapsed, 3),
+        "metrics": metrics,
+        "controller_trajectory": trajectory,
+    }
+
+
+def _job_fields(job: BatchJob) -> dict[str, Any]:
+    return {"world_config": str(job.world_config_path), "seed": job.seed, "db_path": str(job.db_path)}
+
+
+def run_batch(
+    config: SimulationConfig,
+    world_configs: Iterable[Path],
+    seeds: Iterable[int],
+    out_dir: Path,
+    *,
+    workers: int | None = None,
+    trajectory_stride: int = 1,
+    overwrite: bool = False,
+    on_result: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """Shards the (world config, seed) matrix across a process pool and merges the results.
+
+    ``config`` supplies everything but the seed, world config and database path. A job
+    that fails is reported with its error; the rest of the batch still runs.
+    """
+    if trajectory_stride < 1:
+        raise ValueError(f"trajectory_stride must be >= 1, got {trajectory_stride}")
+    jobs = plan_jobs(world_configs, seeds, out_dir)
+    existing = [job.db_path for job in jobs if job.db_path.exists()]
+    if existing and not overwrite:
+        raise FileExistsError(f"{existing[0]} already exists; pass overwrite=True to replace it")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for job in jobs:
+        # Every run starts from genesis; a stale WAL would otherwise be replayed into the fresh file.
+        for suffix in ("", "-wal", "-shm"):
+            job.db_path.with_name(job.db_path.name + suffix).unlink(missing_ok=True)
+
+    started = time.perf_counter()
+    results: list[dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, job, config, trajectory_stride): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:  # noqa: BLE001
+                result = {**_job_fields(job), "error": f"{type(exc).__name__}: {exc}"}
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    report = merge_results(results)
+    report["steps"] = config.steps
+    report["wall_seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def merge_results(results: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Per-job results in (world config, seed) order plus mean/min/max of the final metrics per world config."""
+    ordered = sorted(results, key=lambda result: (result["world_config"], result["seed"]))
+    by_world: dict[str, list[dict[str, Any]]] = {}
+    for result in ordered:
+        by_world.setdefault(result["world_config"], []).append(result)
+
+    aggregate: dict[str, Any] = {}
+    for world, world_results in by_world.items():
+        finished = [result for result in world_results if "error" not in result]
+        summary: dict[str, Any] = {
+            "seeds": [result["seed"] for result in world_results],
+            "failed_seeds": [result["seed"] for result in world_results if "error" in result],
+            "final_modes": {},
+            "metrics": {},
+        }
+        for result in finished:
+            mode = str(result["metrics"].get("controller", {}).get("mode", ""))
+            summary["final_modes"][mode] = summary["final_modes"].get(mode, 0) + 1
+        for name in AGGREGATED_METRICS:
+            values = [float(result["metrics"][name]) for result in finished if isinstance(result["metrics"].get(name), (int, float))]
+            if values:
+                summary["metrics"][name] = {"mean": round(mean(values), 4), "min": min(values), "max": max(values)}
+        aggregate[world] = summary
+
+    return {
+        "jobs": ordered,
+        "aggregate": aggregate,
+        "failed": sum(1 for result in ordered if "error" in result),
+    }
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from collections import Counter, deque
+from typing import Any, Iterable, Mapping
+
+from .store import WorldStore
+
+
+class BranchContext:
+    """Bounded tail of one branch: recent states, facts and directives, plus its story memory.
+
+    Seeded from the store once, then kept current by the engine as it accepts states,
+    records facts and issues challenges, so reads never depend on branch height.
+    """
+
+    def __init__(self, branch_id: str, *, state_window: int, fact_window: int, directive_window: int, fact_id_window: int) -> None:
+        self.branch_id = branch_id
+        self.states: deque[Mapping[str, Any]] = deque(maxlen=state_window)
+        # Newest first, like WorldStore.list_branch_facts().
+        self.facts: deque[Mapping[str, Any]] = deque(maxlen=fact_window)
+        self.directives: deque[str] = deque(maxlen=directive_window)
+        self.story_memory: Mapping[str, Any] | None = None
+        self._facts_by_state: dict[str, list[Mapping[str, Any]]] = {}
+        # Latest row per fact_id, oldest first; keeps the fact_window most recently written ids.
+        self._latest_facts: dict[str, Mapping[str, Any]] = {}
+        # Dedupe horizon for _record_branch_facts: the last fact_id_window fact ids.
+        self._fact_id_window: deque[str] = deque()
+        self._fact_id_limit = fact_id_window
+        self._fact_id_counts: Counter[str] = Counter()
+
+    @classmethod
+    def load(
+        cls,
+        store: WorldStore,
+        branch_id: str,
+        *,
+        state_window: int,
+        fact_window: int,
+        directive_window: int,
+        fact_id_window: int,
+    ) -> BranchContext:
+        context = cls(
+            branch_id,
+            state_window=state_window,
+            fact_window=fact_window,
+            directive_window=directive_window,
+            fact_id_window=fact_id_window,
+        )
+        for state in store.list_states(branch_id=branch_id, last_n=state_window, columns=("state_id", "parent_state_id", "height", "artifact_x", "meta_m")):
+            context.add_state(state)
+        tail = store.list_branch_facts(branch_id, limit=fact_id_window)
+        for fact in reversed(tail):
+            context.add_fact(fact)
+        if len(tail) == fact_id_window and len(context._latest_facts) < fact_window:
+            # The tail repeats fact ids and older rows exist; take the latest rows from the whole branch.
+            context._latest_facts.clear()
+            for fact in reversed(store.list_active_facts(branch_id, limit=fact_window)):
+                context._latest_facts[str(fact.get("fact_id", ""))] = fact
+        for challenge in store.list_challenges(branch_id=branch_id, last_n=directive_window, columns=("directive_type",)):
+            context.add_directive(str(challenge.get("directive_type", "")))
+        context.story_memory = store.get_story_memory(branch_id)
+        return context
+
+    def add_state(self, state: Mapping[str, Any]) -> None:
+        if len(self.states) == self.states.maxlen:
+            self._facts_by_state.pop(str(self.states[0].get("state_id", "")), None)
+        self.states.append(state)
+        self._facts_by_state.setdefault(str(state.get("state_id", "")), [])
+
+    def add_fact(self, fact: Mapping[str, Any]) -> None:
+        self.facts.appendleft(fact)
+        bucket = self._facts_by_state.get(str(fact.get("state_id", "")))
+        if bucket is not None:
+            bucket.append(fact)
+        latest_key = str(fact.get("fact_id", ""))
+        self._latest_facts.pop(latest_key, None)
+        self._latest_facts[latest_key] = fact
+        if len(self._latest_facts) > self.facts.maxlen:
+            del self._latest_facts[next(iter(self._latest_facts))]
+        fact_id = latest_key.strip()
+        if not fact_id:
+            return
+        self._fact_id_window.append(fact_id)
+        self._fact_id_counts[fact_id] += 1
+        if len(self._fact_id_window) > self._fact_id_limit:
+            dropped = self._fact_id_window.popleft()
+            self._fact_id_counts[dropped] -= 1
+            if not self._fact_id_counts[dropped]:
+                del self._fact_id_counts[dropped]
+
+    def add_directive(self, directive: str) -> None:
+        if directive.strip():
+            self.directives.append(directive)
+
+    def state(self, state_id: str) -> Mapping[str, Any] | None:
+        # Only the window is searched; older states have to come from the store.
+        for state in reversed(self.states):
+            if state.get("state_id") == state_id:
+                return state
+        return None
+
+    def recent_states(self, limit: int) -> list[Mapping[str, Any]]:
+        if limit > self.states.maxlen:
+            raise ValueError(f"Branch context keeps {self.states.maxlen} states, {limit} requested")
+        return list(self.states)[-limit:] if limit > 0 else []
+
+    def recent_facts(self, limit: int) -> list[Mapping[str, Any]]:
+        if limit > self.facts.maxlen:
+            raise ValueError(f"Branch context keeps {self.facts.maxlen} facts, {limit} requested")
+        return [fact for _, fact in zip(range(limit), self.facts)]
+
+    def recent_directives(self, limit: int) -> list[str]:
+        return list(self.directives)[-limit:] if limit > 0 else []
+
+    def facts_for_states(self, state_ids: Iterable[str]) -> list[Mapping[str, Any]]:
+        facts: list[Mapping[str, Any]] = []
+        for state_id in state_ids:
+            facts.extend(self._facts_by_state.get(state_id, ()))
+        return facts
+
+    def active_facts(self, limit: int) -> list[Mapping[str, Any]]:
+        # Latest row per fact_id, ordered like WorldStore.list_active_facts(). Heights only grow
+        # along a branch, so the most recently written ids are also the highest ones.
+        if limit > self.facts.maxlen:
+            raise ValueError(f"Branch context keeps {self.facts.maxlen} active facts, {limit} requested")
+        latest = [fact for _, fact in zip(range(limit), reversed(self._latest_facts.values()))]
+        latest.sort(key=lambda fact: int(fact.get("introduced_height", 0)), reverse=True)
+        return latest
+
+    def known_fact_ids(self) -> set[str]:
+        return set(self._fact_id_counts)
+
+
+class BranchContextCache:
+    """Per-branch ``BranchContext`` objects, loaded on first use.
+
+    Updates for branches that are not loaded yet are dropped: their first load reads
+    the store, which already has the write. Call ``invalidate()`` whenever the store may
+    have diverged, e.g. after a rolled-back step.
+    """
+
+    def __init__(
+        self,
+        store: WorldStore,
+        *,
+        state_window: int = 8,
+        fact_window: int = 250,
+        directive_window: int = 12,
+        fact_id_window: int = 3000,
+    ) -> None:
+        self.store = store
+        self.state_window = state_window
+        self.fact_window = fact_window
+        self.directive_window = directive_window
+        self.fact_id_window = fact_id_window
+        self._contexts: dict[str, BranchContext] = {}
+
+    def get(self, branch_id: str) -> BranchContext:
+        context = self._contexts.get(branch_id)
+        if context is None:
+            context = self._contexts[branch_id] = BranchContext.load(
+                self.store,
+                branch_id,
+                state_window=self.state_window,
+                fact_window=self.fact_window,
+                directive_window=self.directive_window,
+                fact_id_window=self.fact_id_window,
+            )
+        return context
+
+    def create(self, branch_id: str) -> BranchContext:
+        """Registers an empty context for a branch that has no rows yet, so its first use skips the store."""
+        context = self._contexts.get(branch_id)
+        if context is None:
+            context = self._contexts[branch_id] = BranchContext(
+                branch_id,
+                state_window=self.state_window,
+                fact_window=self.fact_window,
+                directive_window=self.directive_window,
+                fact_id_window=self.fact_id_window,
+            )
+        return context
+
+    def invalidate(self) -> None:
+        self._contexts.clear()
+
+    def record_state(self, state: Mapping[str, Any]) -> None:
+        context = self._contexts.get(str(state["branch_id"]))
+        if context is not None:
+            context.add_state(state)
+
+    def record_fact(self, fact: Mapping[str, Any]) -> None:
+        context = self._contexts.get(str(fact["branch_id"]))
+        if context is not None:
+            context.add_fact(fact)
+
+    def record_directive(self, branch_id: str, directive: str) -> None:
+        context = self._contexts.get(branch_id)
+        if context is not None:
+            context.add_directive(directive)
+
+    def record_story_memory(self, memory: Mapping[str, Any]) -> None:
+        context = self._contexts.get(str(memory["branch_id"]))
+        if context is not None:
+            context.story_memory = memory
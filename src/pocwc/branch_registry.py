@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import Any
+
+from .store import WorldStore
+
+BRANCH_COLUMNS: tuple[str, ...] = (
+    "branch_id",
+    "head_state_id",
+    "created_at",
+    "status",
+    "semantic_debt_est",
+    "uncertainty",
+    "closure_pressure",
+    "chaos_pressure",
+)
+
+
+class BranchRegistry:
+    """Write-through cache of the branches table for the engine's own reads and writes.
+
+    Rows are loaded once and handed out as copies, so callers can mutate what they get
+    without touching the cache. Call ``invalidate()`` whenever the store may have diverged,
+    e.g. after a rolled-back step.
+    """
+
+    def __init__(self, store: WorldStore) -> None:
+        self.store = store
+        self._rows: dict[str, dict[str, Any]] | None = None
+
+    def _loaded(self) -> dict[str, dict[str, Any]]:
+        if self._rows is None:
+            self._rows = {row["branch_id"]: row for row in self.store.list_branches()}
+        return self._rows
+
+    def invalidate(self) -> None:
+        self._rows = None
+
+    def all(self) -> list[dict[str, Any]]:
+        # Same order as WorldStore.list_branches().
+        rows = sorted(self._loaded().values(), key=lambda row: str(row["created_at"]))
+        return [dict(row) for row in rows]
+
+    def with_status(self, status: str) -> list[dict[str, Any]]:
+        return [row for row in self.all() if row["status"] == status]
+
+    def get(self, branch_id: str) -> dict[str, Any] | None:
+        row = self._loaded().get(branch_id)
+        return dict(row) if row is not None else None
+
+    def upsert(self, branch: dict[str, Any]) -> None:
+        rows = self._loaded()
+        row = {column: branch[column] for column in BRANCH_COLUMNS}
+        existing = rows.get(row["branch_id"])
+        if existing is not None:
+            # upsert_branch never rewrites created_at.
+            row["created_at"] = existing["created_at"]
+        self.store.upsert_branch(row)
+        rows[row["branch_id"]] = row
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import struct
+import threading
+import zlib
+from collections import Counter
+from typing import Any, Mapping
+
+try:  # optional: better ratios and trained dictionaries when installed
+    import zstandard
+except ImportError:  # pragma: no cover - exercised only where zstandard is missing
+    zstandard = None
+
+
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODEC_NAMES = {"zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+# 1-byte codec tag + 4-byte dictionary id (0 = no dictionary).
+_HEADER = struct.Struct(">BI")
+# zlib preset dictionaries are capped by its 32 KiB window.
+ZLIB_DICT_LIMIT = 32 * 1024
+
+
+def zstd_available() -> bool:
+    return zstandard is not None
+
+
+def resolve_codec(name: str | None) -> str | None:
+    value = (name or "none").strip().lower()
+    if value in {"", "none", "off"}:
+        return None
+    if value == "auto":
+        return "zstd" if zstd_available() else "zlib"
+    if value not in CODEC_NAMES:
+        raise ValueError(f"Unknown column codec: {name}")
+    if value == "zstd" and not zstd_available():
+        raise RuntimeError("zstd column codec requested but the zstandard package is not installed")
+    return value
+
+
+def train_dictionary(codec: str, samples: list[str], size: int = 16 * 1024) -> bytes:
+    encoded = [sample.encode("utf-8") for sample in samples if sample]
+    if not encoded:
+        return b""
+    if codec == "zstd":
+        try:
+            return zstandard.train_dictionary(size, encoded).as_bytes()
+        except zstandard.ZstdError:
+            # Too few samples to train; fall through to the substring dictionary.
+            pass
+    return _substring_dictionary(encoded, min(size, ZLIB_DICT_LIMIT))
+
+
+def _substring_dictionary(samples: list[bytes], size: int) -> bytes:
+    # zlib has no trainer: keep the most frequent lines, most frequent last (closest to the data).
+    counts: Counter[bytes] = Counter()
+    for sample in samples:
+        for line in sample.replace(b",", b",\n").splitlines():
+            line = line.strip()
+            if len(line) >= 8:
+                counts[line] += 1
+    picked: list[bytes] = []
+    used = 0
+    for line, count in counts.most_common():
+        if count < 2 or used + len(line) > size:
+            continue
+        picked.append(line)
+        used += len(line)
+    return b"".join(reversed(picked))
+
+
+class ColumnCodec:
+    """Encodes text columns as tagged compressed blobs; short or incompressible text stays as-is."""
+
+    def __init__(
+        self,
+        codec: str,
+        *,
+        dictionary: bytes = b"",
+        dict_id: int = 0,
+        level: int | None = None,
+        min_size: int = 96,
+    ) -> None:
+        self.codec = codec
+        self.tag = CODEC_NAMES[codec]
+        self.dictionary = dictionary
+        self.dict_id = dict_id if dictionary else 0
+        self.level = level if level is not None else (9 if codec == "zstd" else 6)
+        self.min_size = min_size
+        self._local = threading.local()
+
+    def _zstd_compressor(self) -> Any:
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            dict_data = zstandard.ZstdCompressionDict(self.dictionary) if self.dictionary else None
+            compressor = zstandard.ZstdCompressor(level=self.level, dict_data=dict_data)
+            self._local.compressor = compressor
+        return compressor
+
+    def encode(self, text: str) -> str | bytes:
+        raw = text.encode("utf-8")
+        if len(raw) < self.min_size:
+            return text
+        if self.tag == CODEC_ZSTD:
+            body = self._zstd_compressor().compress(raw)
+        elif self.dictionary:
+            compressor = zlib.compressobj(self.level, zdict=self.dictionary)
+            body = compressor.compress(raw) + compressor.flush()
+        else:
+            body = zlib.compress(raw, self.level)
+        if len(body) + _HEADER.size >= len(raw):
+            return text
+        return _HEADER.pack(self.tag, self.dict_id) + body
+
+
+_decompressors = threading.local()
+
+
+def _zstd_decompressor(dictionary: bytes) -> Any:
+    # Keyed by dictionary content: ids are only unique within one database.
+    cache = getattr(_decompressors, "by_dict", None)
+    if cache is None:
+        cache = _decompressors.by_dict = {}
+    decompressor = cache.get(dictionary)
+    if decompressor is None:
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        decompressor = cache[dictionary] = zstandard.ZstdDecompressor(dict_data=dict_data)
+    return decompressor
+
+
+def decode_text(value: str | bytes | None, dictionaries: Mapping[int, bytes]) -> str | None:
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        return value
+    data = bytes(value)
+    tag, dict_id = _HEADER.unpack_from(data)
+    body = data[_HEADER.size :]
+    dictionary = dictionaries[dict_id] if dict_id else b""
+    if tag == CODEC_ZLIB:
+        if dictionary:
+            decompressor = zlib.decompressobj(zdict=dictionary)
+            raw = decompressor.decompress(body) + decompressor.flush()
+        else:
+            raw = zlib.decompress(body)
+    elif tag == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Row is zstd-compressed but the zstandard package is not installed")
+        raw = _zstd_decompressor(dictionary).decompress(body)
+    else:
+        raise ValueError(f"Unknown column codec tag: {tag}")
+    return raw.decode("utf-8")
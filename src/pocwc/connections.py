@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+
+class _ThreadConnection:
+    # Held only by the thread-local, so it is collected when its thread exits.
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+
+class ConnectionManager:
+    """Long-lived SQLite connections for one database file.
+
+    ``pool_size=0`` keeps one connection per thread (engine path), closed when
+    that thread exits; a positive ``pool_size`` lends a bounded set of connections
+    to short-lived threads such as the ones spawned by ``ThreadingHTTPServer``.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        pool_size: int = 0,
+        timeout: float = 30.0,
+        cached_statements: int = 256,
+    ) -> None:
+        self.db_path = db_path
+        self.pool_size = max(0, int(pool_size))
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._opened: list[sqlite3.Connection] = []
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.pool_size) if self.pool_size else None
+        self._trace_callback: Callable[[str], None] | None = None
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.isolation_level = None
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._opened.append(conn)
+            conn.set_trace_callback(self._trace_callback)
+        return conn
+
+    def set_trace_callback(self, callback: Callable[[str], None] | None) -> None:
+        # Applies to every open connection and to the ones opened later.
+        with self._lock:
+            self._trace_callback = callback
+            for conn in self._opened:
+                conn.set_trace_callback(callback)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        if self._slots is None:
+            holder = getattr(self._local, "conn", None)
+            if holder is None:
+                holder = self._local.conn = _ThreadConnection(self._open())
+                weakref.finalize(holder, self._discard, holder.conn)
+            yield holder.conn
+            return
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No SQLite connection available within {self.timeout}s: {self.db_path}")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        # Runs when the owning thread has exited; close() may already have closed it.
+        with self._lock:
+            if conn not in self._opened:
+                return
+            self._opened.remove(conn)
+        conn.close()
+
+    def open_count(self) -> int:
+        with self._lock:
+            return len(self._opened)
+
+    def close(self) -> None:
+        with self._lock:
+            opened, self._opened = self._opened, []
+        self._local = threading.local()
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for conn in opened:
+            conn.close()
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import Any
+
+try:  # optional: float32 unit rows next to the cached vectors
+    import numpy
+except ImportError:  # pragma: no cover - exercised only where numpy is missing
+    numpy = None
+
+from .semantic import EmbeddingAdapter, EmbeddingMatrix, numpy_available, unit_rows
+from .store import WorldStore
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def text_sha(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def pack_vector(vector: list[float]) -> bytes:
+    # Full float64, so a vector read back from disk is exactly the one the adapter returned.
+    return struct.pack(f"<{len(vector)}d", *vector)
+
+
+def unpack_vector(blob: bytes) -> list[float]:
+    return list(struct.unpack(f"<{len(blob) // 8}d", blob))
+
+
+@dataclass(slots=True)
+class EmbeddingCacheStats:
+    lookups: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    adapter_calls: int = 0
+    evictions: int = 0
+
+    def hit_rate(self) -> float:
+        return (self.memory_hits + self.disk_hits) / self.lookups if self.lookups else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "hit_rate": round(self.hit_rate(), 4)}
+
+
+class CachedEmbeddingAdapter:
+    """Wraps an adapter so each distinct text is embedded once per model.
+
+    Vectors are keyed by (model, sha256 of the whitespace-normalized text). Lookups go
+    to an in-memory LRU of ``capacity`` vectors, then to the ``embedding_cache`` table of
+    ``store`` if one is given, and only then to the wrapped adapter, with all the misses
+    of one call sent as a single batch. New vectors are not written from the calling
+    thread: ``flush()`` writes them through the store, so the engine can put them in its
+    own transaction. They count as saved once that transaction commits; after a
+    rollback ``requeue()`` hands them to the next flush. With numpy, each vector is kept
+    with its float32 unit row, and ``embedding_matrix`` stacks those rows for a corpus
+    and keeps the last ``matrix_capacity`` stacks. Safe to share between threads. Other attributes (``generate_json``)
+    pass through to the wrapped adapter.
+    """
+
+    def __init__(
+        self,
+        adapter: EmbeddingAdapter,
+        *,
+        model: str,
+        store: WorldStore | None = None,
+        capacity: int = 4096,
+        matrix_capacity: int = 32,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError(f"Embedding cache capacity must be >= 1, got {capacity}")
+        if matrix_capacity < 1:
+            raise ValueError(f"Embedding matrix capacity must be >= 1, got {matrix_capacity}")
+        self.adapter = adapter
+        self.model = model
+        self.store = store
+        self.capacity = capacity
+        self.matrix_capacity = matrix_capacity
+        self.stats = EmbeddingCacheStats()
+        self._lock = threading.Lock()
+        self._vectors: OrderedDict[str, list[float]] = OrderedDict()
+        # float32 unit row per cached vector (numpy only); None when the vector is empty.
+        self._rows: dict[str, Any] = {}
+        # Stacked rows per corpus (the texts, in order), most recently used last.
+        self._matrices: OrderedDict[tuple[str, ...], EmbeddingMatrix] = OrderedDict()
+        self._unsaved: dict[str, bytes] = {}
+        # Flushed, but not yet known to be committed.
+        self._writing: dict[str, bytes] = {}
+
+    def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        keys = [text_sha(text) for text in texts]
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            self.stats.lookups += len(keys)
+            for key in keys:
+                vector = self._vectors.get(key)
+                if vector is not None:
+                    self._vectors.move_to_end(key)
+                    found[key] = vector
+                    self.stats.memory_hits += 1
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing and self.store is not None:
+            stored = {key: unpack_vector(blob) for key, blob in self.store.get_embeddings(self.model, missing).items()}
+            with self._lock:
+                self.stats.disk_hits += sum(1 for key in keys if key in stored)
+                for key, vector in stored.items():
+                    self._remember(key, vector)
+            found.update(stored)
+            missing = [key for key in missing if key not in stored]
+        if missing:
+            # The vector stored under a key is the one for its normalized text.
+            texts_by_key = {key: normalize_text(text) for key, text in zip(keys, texts)}
+            with self._lock:
+                self.stats.adapter_calls += 1
+                self.stats.misses += sum(1 for key in keys if key not in found)
+            vectors = self.adapter.embed_texts(texts=[texts_by_key[key] for key in missing])
+            if len(vectors) != len(missing):
+                raise RuntimeError(f"Embedding adapter returned {len(vectors)} vectors for {len(missing)} texts")
+            with self._lock:
+                for key, vector in zip(missing, vectors):
+                    vector = list(vector)
+                    self._remember(key, vector)
+                    found[key] = vector
+                    if self.store is not None:
+                        self._unsaved[key] = pack_vector(vector)
+        return [found[key] for key in keys]
+
+    def _remember(self, key: str, vector: list[float]) -> None:
+        self._vectors[key] = vector
+        self._vectors.move_to_end(key)
+        if numpy_available():
+            self._rows[key] = unit_rows(vector) if vector else None
+        while len(self._vectors) > self.capacity:
+            evicted, _ = self._vectors.popitem(last=False)
+            self._rows.pop(evicted, None)
+            self.stats.evictions += 1
+
+    def embedding_matrix(self, texts: list[str]) -> EmbeddingMatrix:
+        """``EmbeddingMatrix`` of the vectors of ``texts``, reused while the same corpus is queried again."""
+        corpus = tuple(texts)
+        with self._lock:
+            matrix = self._matrices.get(corpus)
+            if matrix is not None:
+                self._matrices.move_to_end(corpus)
+                return matrix
+        vectors = self.embed_texts(texts=texts)
+        with self._lock:
+            rows = [self._rows.get(text_sha(text)) for text in texts]
+        if rows and all(row is not None and row.shape == rows[0].shape for row in rows):
+            matrix = EmbeddingMatrix.from_unit_rows(numpy.stack(rows))
+        else:
+            # Evicted meanwhile, empty or mixed dimensions: stack the vectors themselves.
+            matrix = EmbeddingMatrix(vectors)
+        with self._lock:
+            self._matrices[corpus] = matrix
+            while len(self._matrices) > self.matrix_capacity:
+                self._matrices.popitem(last=False)
+        return matrix
+
+    def flush(self) -> int:
+        """Writes vectors computed since the last flush to the store; returns how many."""
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {}
+            self._writing.update(unsaved)
+        if unsaved and self.store is not None:
+            self.store.insert_embeddings(self.model, unsaved)
+            self.store.defer(partial(self._saved, list(unsaved)))
+        return len(unsaved)
+
+    def _saved(self, keys: list[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._writing.pop(key, None)
+
+    def requeue(self) -> int:
+        """Puts flushed vectors whose write has not committed back for the next flush; returns how many."""
+        with self._lock:
+            writing, self._writing = self._writing, {}
+            for key, blob in writing.items():
+                self._unsaved.setdefault(key, blob)
+        return len(writing)
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._vectors.clear()
+            self._rows.clear()
+            self._matrices.clear()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.adapter, name)
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Iterable, Sequence
+
+from .semantic import MINHASH_PERMUTATIONS, EmbeddingAdapter, jaccard, minhash_signature, scan_tokens, token_set
+
+try:  # optional: float32 IVF lists for the embedding part
+    import numpy
+except ImportError:  # pragma: no cover - exercised only where numpy is missing
+    numpy = None
+
+# Texts per embed_texts call when adding many facts; the same chunk WorldStore.get_embeddings looks up at once.
+EMBED_BATCH_SIZE = 500
+# Embedded rows before the IVF lists are trained; below it a query scans every vector. The lists are
+# retrained on the first 4x, 16x, ... rows, so they depend on the rows alone, not on when they were added.
+IVF_TRAIN_ROWS = 4096
+# Lists probed per query, out of sqrt(trained rows).
+IVF_PROBES = 8
+# Probed rows, by embedding similarity, that get an exact combined score.
+IVF_TOP_K = 32
+KMEANS_ITERATIONS = 8
+
+
+def _unit(vector: Sequence[float] | None) -> list[float] | None:
+    if not vector:
+        return None
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else None
+
+
+def _combined(emb_sim: float, lexical: float) -> float:
+    # Same blend as semantic_similarity().
+    emb_norm = max(0.0, min(1.0, (emb_sim + 1.0) / 2.0))
+    return max(0.0, min(1.0, emb_norm * 0.75 + lexical * 0.25))
+
+
+def _kmeans(data, count: int):
+    # Spherical k-means on unit rows, seeded with evenly spaced rows so the result is deterministic.
+    centroids = data[numpy.linspace(0, len(data) - 1, count).astype(numpy.int64)]
+    for _ in range(KMEANS_ITERATIONS):
+        nearest = numpy.argmax(data @ centroids.T, axis=1)
+        counts = numpy.bincount(nearest, minlength=count)
+        filled = counts > 0
+        starts = (numpy.cumsum(counts) - counts)[filled]
+        sums = numpy.add.reduceat(data[numpy.argsort(nearest, kind="stable")], starts, axis=0)
+        norms = numpy.linalg.norm(sums, axis=1, keepdims=True)
+        centroids[filled] = numpy.where(norms > 0, sums / numpy.where(norms > 0, norms, 1.0), centroids[filled])
+    return centroids
+
+
+class FactIndex:
+    """Every fact text of one branch, indexed for "most similar earlier fact" lookups.
+
+    Lexical candidates come from MinHash LSH: the signature is cut into bands of
+    ``band_rows`` slots and a fact is a candidate when one of its bands equals the
+    query's. With 4-slot bands that finds nearly every fact with Jaccard >= 0.7 and few
+    below 0.3; candidates are then scored exactly. With an embedding adapter and numpy,
+    unit vectors sit in a float32 array. Up to ``ivf_train_rows`` a query scans all of
+    them; past it they are split into sqrt(rows) k-means lists and a query scans the
+    ``ivf_probes`` lists nearest to it (IVF-flat). The ``IVF_TOP_K`` rows most similar
+    by embedding get an exact combined score, as do the LSH candidates, so the result
+    is approximate only for a fact that is neither close in embedding space nor a
+    lexical candidate. Without numpy only the LSH candidates get an embedding score.
+    Scores follow ``semantic_similarity``.
+    Token sets and signatures are computed once per fact and kept with it, so a long
+    history never goes through the shared ``token_set`` cache. ``add`` defers the
+    embedding to the next ``embed_pending`` or query, so recording a fact never waits
+    on the adapter.
+    """
+
+    def __init__(
+        self,
+        adapter: EmbeddingAdapter | None = None,
+        *,
+        band_rows: int = 4,
+        embed_batch_size: int = EMBED_BATCH_SIZE,
+        ivf_train_rows: int = IVF_TRAIN_ROWS,
+        ivf_probes: int = IVF_PROBES,
+    ) -> None:
+        if band_rows < 1 or MINHASH_PERMUTATIONS % band_rows:
+            raise ValueError(f"band_rows must divide {MINHASH_PERMUTATIONS}, got {band_rows}")
+        if embed_batch_size < 1:
+            raise ValueError(f"embed_batch_size must be >= 1, got {embed_batch_size}")
+        if ivf_train_rows < 1 or ivf_probes < 1:
+            raise ValueError(f"ivf_train_rows and ivf_probes must be >= 1, got {ivf_train_rows} and {ivf_probes}")
+        self.adapter = adapter
+        self.band_rows = band_rows
+        self.embed_batch_size = embed_batch_size
+        self.ivf_train_rows = ivf_train_rows
+        self.ivf_probes = ivf_probes
+        self.texts: list[str] = []
+        self._tokens: list[frozenset[str]] = []
+        self._buckets: dict[tuple[int, tuple[int, ...]], list[int]] = {}
+        # Without numpy: unit vectors per row, None where the adapter gave nothing usable.
+        self._vectors: list[list[float] | None] = []
+        # With numpy: unit vectors by row, and which rows hold one.
+        self._array = None
+        self._embedded = None
+        self._dim = 0
+        # IVF state once trained: centroids, the rows of each list, and how many rows they were trained on.
+        self._centroids = None
+        self._lists: list[list[int]] = []
+        self._trained_rows = 0
+        # Rows added by add() whose embedding has not been requested yet.
+        self._unembedded: list[int] = []
+        self._embed_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _band_keys(self, tokens: frozenset[str]) -> list[tuple[int, tuple[int, ...]]]:
+        signature = minhash_signature(tokens)
+        return [(start, signature[start : start + self.band_rows]) for start in range(0, len(signature), self.band_rows)]
+
+    def _embed(self, texts: list[str]) -> list[list[float] | None]:
+        if self.adapter is None or not texts:
+            return [None] * len(texts)
+        try:
+            vectors = self.adapter.embed_texts(texts=texts)
+        except Exception:  # noqa: BLE001
+            return [None] * len(texts)
+        if len(vectors) != len(texts):
+            return [None] * len(texts)
+        return [_unit(vector) for vector in vectors]
+
+    def add(self, text: str) -> None:
+        if text.strip():
+            self._unembedded.append(len(self.texts))
+            self._add_batch([text], embed=False)
+
+    def embed_pending(self) -> None:
+        """Embeds the rows ``add`` left without a vector; a no-op without an adapter."""
+        if self.adapter is None:
+            return
+        # Under the lock, so a query from another thread waits for rows being embedded.
+        with self._embed_lock:
+            rows, self._unembedded = self._unembedded, []
+            for start in range(0, len(rows), self.embed_batch_size):
+                chunk = rows[start : start + self.embed_batch_size]
+                for row, vector in zip(chunk, self._embed([self.texts[row] for row in chunk])):
+                    self._set_vector(row, vector)
+            self._maybe_train()
+
+    def add_many(self, texts: Iterable[str]) -> None:
+        # Consumed lazily and embedded embed_batch_size texts at a time, so a whole branch
+        # history is never one embed_texts call (or one list in memory).
+        batch: list[str] = []
+        for text in texts:
+            if text.strip():
+                batch.append(text)
+            if len(batch) >= self.embed_batch_size:
+                self._add_batch(batch)
+                batch = []
+        if batch:
+            self._add_batch(batch)
+
+    def _add_batch(self, texts: list[str], *, embed: bool = True) -> None:
+        for text, vector in zip(texts, self._embed(texts) if embed else [None] * len(texts)):
+            row = len(self.texts)
+            tokens = scan_tokens(text)
+            self.texts.append(text)
+            self._tokens.append(tokens)
+            for key in self._band_keys(tokens):
+                self._buckets.setdefault(key, []).append(row)
+            if numpy is None:
+                self._vectors.append(None)
+            self._set_vector(row, vector)
+
+    def _set_vector(self, row: int, vector: list[float] | None) -> None:
+        if vector is None:
+            return
+        if numpy is None:
+            self._vectors[row] = vector
+            return
+        if self._array is None:
+            self._dim = len(vector)
+            self._grow(max(64, row + 1))
+        if len(vector) != self._dim:
+            return
+        if row >= len(self._array):
+            self._grow(max(row + 1, 2 * len(self._array)))
+        self._array[row] = vector
+        self._embedded[row] = True
+        if self._centroids is not None:
+            self._lists[int(numpy.argmax(self._centroids @ self._array[row]))].append(row)
+
+    def _grow(self, capacity: int) -> None:
+        array = numpy.zeros((capacity, self._dim), dtype=numpy.float32)
+        embedded = numpy.zeros(capacity, dtype=bool)
+        if self._array is not None:
+            array[: len(self._array)] = self._array
+            embedded[: len(self._embedded)] = self._embedded
+        self._array, self._embedded = array, embedded
+
+    def _maybe_train(self) -> None:
+        # Trains on the first ivf_train_rows * 4**k rows once all of them are embedded, then files every row.
+        if self._array is None:
+            return
+        level = self._trained_rows * 4 if self._trained_rows else self.ivf_train_rows
+        if len(self.texts) < level:
+            return
+        while len(self.texts) >= level * 4:
+            level *= 4
+        if any(row < level for row in self._unembedded):
+            return
+        sample = numpy.flatnonzero(self._embedded[:level])
+        count = max(1, math.isqrt(level))
+        if len(sample) < count:
+            return
+        # At most 64 training rows per list, spread over the sample.
+        sample = sample[:: max(1, len(sample) // (64 * count))]
+        centroids = _kmeans(self._array[sample], count)
+        rows = numpy.flatnonzero(self._embedded[: len(self.texts)])
+        lists: list[list[int]] = [[] for _ in range(count)]
+        for row, nearest in zip(rows.tolist(), numpy.argmax(self._array[rows] @ centroids.T, axis=1).tolist()):
+            lists[nearest].append(row)
+        self._centroids, self._lists, self._trained_rows = centroids, lists, level
+
+    def _probe(self, vector):
+        # Rows whose vectors a query compares against: every embedded row, or the nearest lists once trained.
+        if self._centroids is None:
+            return numpy.flatnonzero(self._embedded[: len(self.texts)])
+        probes = min(self.ivf_probes, len(self._centroids))
+        nearest = numpy.argpartition(-(self._centroids @ vector), probes - 1)[:probes]
+        return numpy.concatenate([numpy.asarray(self._lists[index], dtype=numpy.int64) for index in nearest.tolist()])
+
+    def _row_similarity(self, row: int, query_vector: list[float] | None, vector) -> float | None:
+        if vector is not None:
+            return float(self._array[row] @ vector) if row < len(self._embedded) and self._embedded[row] else None
+        stored = self._vectors[row] if numpy is None else None
+        if query_vector is None or stored is None or len(stored) != len(query_vector):
+            return None
+        return sum(x * y for x, y in zip(query_vector, stored))
+
+    def max_similarity(self, query: str) -> float:
+        if not query.strip() or not self.texts:
+            return 0.0
+        self.embed_pending()
+        query_tokens = token_set(query)
+        candidates = {row for key in self._band_keys(query_tokens) for row in self._buckets.get(key, ())}
+        query_vector = self._embed([query])[0]
+        best = 0.0
+        scored: set[int] = set()
+        vector = None
+        if numpy is not None and query_vector is not None and self._array is not None and len(query_vector) == self._dim:
+            vector = numpy.asarray(query_vector, dtype=numpy.float32)
+            rows = self._probe(vector)
+            sims = self._array[rows] @ vector
+            if len(rows) > IVF_TOP_K:
+                top = numpy.argpartition(-sims, IVF_TOP_K - 1)[:IVF_TOP_K]
+                rows, sims = rows[top], sims[top]
+            for row, emb_sim in zip(rows.tolist(), sims.tolist()):
+                best = max(best, _combined(emb_sim, jaccard(query_tokens, self._tokens[row])))
+                scored.add(row)
+        for row in candidates - scored:
+            lexical = jaccard(query_tokens, self._tokens[row])
+            emb_sim = self._row_similarity(row, query_vector, vector)
+            best = max(best, lexical if emb_sim is None else _combined(emb_sim, lexical))
+        return best
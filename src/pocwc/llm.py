@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 from dataclasses import dataclass
@@ -7,6 +8,8 @@ from typing import Any, Protocol
 from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 
+from .async_http import AsyncHTTPClient
+
 
 class LLMAdapter(Protocol):
     def generate_json(
@@ -24,6 +27,25 @@ class LLMAdapter(Protocol):
         ...
 
 
+class AsyncLLMAdapter(Protocol):
+    async def generate_json(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.2,
+        top_p: float = 1.0,
+        max_tokens: int = 900,
+    ) -> dict[str, Any]:
+        ...
+
+    async def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        ...
+
+    async def aclose(self) -> None:
+        ...
+
+
 @dataclass(slots=True)
 class LLMSettings:
     provider: str = "none"
@@ -72,6 +94,50 @@ class LLMSettings:
         )
 
 
+def _request_headers(settings: LLMSettings) -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {settings.api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": settings.site_url,
+        "X-Title": settings.app_name,
+    }
+
+
+def _chat_body(settings: LLMSettings, system_prompt: str, user_prompt: str, temperature: float, top_p: float, max_tokens: int) -> bytes:
+    payload = {
+        "model": settings.model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        "temperature": temperature,
+        "top_p": max(0.1, min(top_p, 1.0)),
+        "max_tokens": max_tokens,
+        "response_format": {"type": "json_object"},
+    }
+    return json.dumps(payload).encode("utf-8")
+
+
+def _chat_content(response_payload: Any) -> dict[str, Any]:
+    try:
+        content = response_payload["choices"][0]["message"]["content"]
+        return json.loads(content)
+    except Exception as exc:  # noqa: BLE001
+        raise RuntimeError("OpenRouter response does not contain valid JSON content") from exc
+
+
+def _embeddings_body(settings: LLMSettings, texts: list[str]) -> bytes:
+    return json.dumps({"model": settings.embedding_model or settings.model, "input": texts}).encode("utf-8")
+
+
+def _embedding_vectors(response_payload: Any, expected: int) -> list[list[float]]:
+    data = response_payload.get("data", [])
+    vectors = [list(item.get("embedding", [])) for item in data]
+    if len(vectors) != expected:
+        raise RuntimeError("Unexpected embedding response length")
+    return vectors
+
+
 class OpenRouterAdapter:
     def __init__(self, settings: LLMSettings) -> None:
         self.settings = settings
@@ -87,78 +153,119 @@ class OpenRouterAdapter:
         top_p: float = 1.0,
         max_tokens: int = 900,
     ) -> dict[str, Any]:
-        top_p = max(0.1, min(top_p, 1.0))
-        payload = {
-            "model": self.settings.model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            "temperature": temperature,
-            "top_p": top_p,
-            "max_tokens": max_tokens,
-            "response_format": {"type": "json_object"},
-        }
-        body = json.dumps(payload).encode("utf-8")
-
-        req = Request(
-            self.endpoint,
-            data=body,
-            method="POST",
-            headers={
-                "Authorization": f"Bearer {self.settings.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": self.settings.site_url,
-                "X-Title": self.settings.app_name,
-            },
-        )
+        body = _chat_body(self.settings, system_prompt, user_prompt, temperature, top_p, max_tokens)
+        req = Request(self.endpoint, data=body, method="POST", headers=_request_headers(self.settings))
         try:
             with urlopen(req, timeout=self.settings.timeout_seconds) as resp:
                 response_payload = json.loads(resp.read().decode("utf-8"))
         except (HTTPError, URLError, TimeoutError, json.JSONDecodeError) as exc:
             raise RuntimeError(f"OpenRouter request failed: {exc}") from exc
-
-        try:
-            content = response_payload["choices"][0]["message"]["content"]
-            return json.loads(content)
-        except Exception as exc:  # noqa: BLE001
-            raise RuntimeError("OpenRouter response does not contain valid JSON content") from exc
+        return _chat_content(response_payload)
 
     def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
         if not texts:
             return []
-        model = self.settings.embedding_model or self.settings.model
-        payload = {
-            "model": model,
-            "input": texts,
-        }
-        body = json.dumps(payload).encode("utf-8")
-        req = Request(
-            self.embedding_endpoint,
-            data=body,
-            method="POST",
-            headers={
-                "Authorization": f"Bearer {self.settings.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": self.settings.site_url,
-                "X-Title": self.settings.app_name,
-            },
-        )
+        req = Request(self.embedding_endpoint, data=_embeddings_body(self.settings, texts), method="POST", headers=_request_headers(self.settings))
         try:
             with urlopen(req, timeout=self.settings.timeout_seconds) as resp:
                 response_payload = json.loads(resp.read().decode("utf-8"))
-            data = response_payload.get("data", [])
-            vectors = [list(item.get("embedding", [])) for item in data]
-            if len(vectors) != len(texts):
-                raise RuntimeError("Unexpected embedding response length")
-            return vectors
+            return _embedding_vectors(response_payload, len(texts))
         except Exception as exc:  # noqa: BLE001
             raise RuntimeError(f"OpenRouter embedding request failed: {exc}") from exc
 
 
+class AsyncOpenRouterAdapter:
+    """OpenRouter over one keep-alive ``AsyncHTTPClient``, so concurrent calls share warm connections."""
+
+    def __init__(self, settings: LLMSettings, *, client: AsyncHTTPClient | None = None, max_connections: int = 8) -> None:
+        self.settings = settings
+        self.endpoint = f"{settings.base_url}/chat/completions"
+        self.embedding_endpoint = f"{settings.base_url}/embeddings"
+        self.client = client or AsyncHTTPClient(timeout=settings.timeout_seconds, max_connections_per_origin=max_connections)
+
+    async def _post(self, url: str, body: bytes) -> Any:
+        try:
+            response = await self.client.request("POST", url, body=body, headers=_request_headers(self.settings))
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as exc:
+            raise RuntimeError(f"OpenRouter request failed: {exc!r}") from exc
+        if response.status >= 400:
+            raise RuntimeError(f"OpenRouter request failed: HTTP {response.status}")
+        try:
+            return json.loads(response.body.decode("utf-8"))
+        except json.JSONDecodeError as exc:
+            raise RuntimeError(f"OpenRouter request failed: {exc}") from exc
+
+    async def generate_json(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.2,
+        top_p: float = 1.0,
+        max_tokens: int = 900,
+    ) -> dict[str, Any]:
+        body = _chat_body(self.settings, system_prompt, user_prompt, temperature, top_p, max_tokens)
+        return _chat_content(await self._post(self.endpoint, body))
+
+    async def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        try:
+            response_payload = await self._post(self.embedding_endpoint, _embeddings_body(self.settings, texts))
+            return _embedding_vectors(response_payload, len(texts))
+        except Exception as exc:  # noqa: BLE001
+            raise RuntimeError(f"OpenRouter embedding request failed: {exc}") from exc
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class BlockingLLMAdapter:
+    """Sync ``LLMAdapter`` over an ``AsyncLLMAdapter`` running on an event loop in another thread.
+
+    Lets the sync provers and verifiers run in worker threads while their requests go
+    through the loop's shared client. Call ``bind()`` from the loop before use.
+    """
+
+    def __init__(self, adapter: AsyncLLMAdapter) -> None:
+        self.adapter = adapter
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop | None) -> None:
+        self.loop = loop
+
+    def _call(self, coro: Any) -> Any:
+        loop = self.loop
+        if loop is None:
+            coro.close()
+            raise RuntimeError("BlockingLLMAdapter is not bound to an event loop")
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            raise RuntimeError("BlockingLLMAdapter called on its own event loop thread; it would deadlock")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def generate_json(self, **kwargs: Any) -> dict[str, Any]:
+        return self._call(self.adapter.generate_json(**kwargs))
+
+    def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        return self._call(self.adapter.embed_texts(texts=texts))
+
+
 def create_llm_adapter(settings: LLMSettings) -> LLMAdapter | None:
     if not settings.enabled:
         return None
     if settings.provider == "openrouter":
         return OpenRouterAdapter(settings)
     return None
+
+
+def create_async_llm_adapter(settings: LLMSettings) -> AsyncLLMAdapter | None:
+    if not settings.enabled:
+        return None
+    if settings.provider == "openrouter":
+        return AsyncOpenRouterAdapter(settings)
+    return None
@@ -1,8 +1,9 @@
 ﻿from __future__ import annotations
 
-from dataclasses import dataclass
-from statistics import mean, pstdev
-from typing import Any
+from dataclasses import dataclass, field
+from math import sqrt
+from statistics import mean
+from typing import Any, Iterable
 
 
 @dataclass(slots=True)
@@ -13,24 +14,56 @@ class RuntimeStats:
     forks_created: int = 0
 
 
+@dataclass(slots=True)
+class ScoreRollup:
+    """Running verifier score statistics (Welford count/mean/M2) plus reject counters."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    reject_by_level: dict[str, int] = field(default_factory=dict)
+
+    def add(self, score: float, verdict: str, level: str) -> None:
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        if verdict == "reject":
+            self.reject_by_level[level] = self.reject_by_level.get(level, 0) + 1
+
+    def stdev(self) -> float:
+        return sqrt(max(0.0, self.m2) / self.count) if self.count > 1 else 0.0
+
+    @classmethod
+    def from_results(cls, verification_results: Iterable[dict[str, Any]]) -> "ScoreRollup":
+        rollup = cls()
+        for row in verification_results:
+            rollup.add(float(row["score"]), str(row["verdict"]), str(row["level_max_reached"]))
+        return rollup
+
+
 def compute_metrics(
     branches: list[dict[str, Any]],
-    verification_results: list[dict[str, Any]],
+    verification_results: Iterable[dict[str, Any]],
+    runtime: RuntimeStats,
+) -> dict[str, Any]:
+    return compute_metrics_from_rollup(branches, ScoreRollup.from_results(verification_results), runtime)
+
+
+def compute_metrics_from_rollup(
+    branches: list[dict[str, Any]],
+    rollup: ScoreRollup,
     runtime: RuntimeStats,
 ) -> dict[str, Any]:
     reject_by_level: dict[str, int] = {"L0": 0, "L1": 0, "L2": 0, "L3": 0}
-    scores: list[float] = []
-    for row in verification_results:
-        scores.append(float(row["score"]))
-        if row["verdict"] == "reject":
-            lvl = str(row["level_max_reached"])
-            reject_by_level[lvl] = reject_by_level.get(lvl, 0) + 1
+    for lvl, count in rollup.reject_by_level.items():
+        reject_by_level[lvl] = reject_by_level.get(lvl, 0) + int(count)
 
     branch_debt = [float(b["semantic_debt_est"]) for b in branches] or [0.0]
     accept_rate = runtime.accepted_candidates / max(1, runtime.attempted_challenges)
     fork_rate = runtime.forks_created / max(1, runtime.accepted_candidates)
 
-    variance = pstdev(scores) if len(scores) > 1 else 0.0
+    variance = rollup.stdev()
 
     return {
         "accept_rate": round(accept_rate, 3),
@@ -1,26 +1,37 @@
 ﻿from __future__ import annotations
 
+import copy
 import random
-import re
 import hashlib
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Generator
 
 from .aggregation import Aggregator
+from .branch_context import BranchContextCache
+from .branch_registry import BranchRegistry
 from .controller import ControllerMetrics, ControllerState, DifficultyController
 from .debt import debt_trend, estimate_semantic_debt
-from .domain import Challenge, Difficulty, Verdict
-from .metrics import RuntimeStats, compute_metrics
+from .domain import Challenge, Difficulty, VerificationResult, Verdict
+from .embedding_cache import CachedEmbeddingAdapter
+from .fact_index import EMBED_BATCH_SIZE, FactIndex
+from .metrics import RuntimeStats, ScoreRollup, compute_metrics_from_rollup
+from .profiling import NullProfiler, ProfiledLLMAdapter, Profiler
+from .progress import CallbackSink, ProgressSink, verbosity_level
 from .projection import ProjectionBuilder
 from .provers import default_provers
-from .llm import LLMSettings, create_llm_adapter
-from .store import WorldStore
+from .llm import LLMAdapter, LLMSettings, create_llm_adapter
+from .store import RetentionPolicy, WorldStore
 from .taskgen import BranchSignals, TaskGenerator
-from .verifiers import default_verifiers
+from .verifiers import NoveltyGateVerifier, default_verifiers
 from .world_config import DEFAULT_WORLD_CONFIG_PATH, load_world_config
-from .semantic import semantic_similarity
+from .semantic import lexical_jaccard, max_similarity, semantic_similarity, tokenize
 from .fact_schema import validate_and_normalize_fact_object
 
 
@@ -37,16 +48,107 @@ class SimulationConfig:
     llm_top_p: float = 0.92
     story_language: str = "english"
     world_config_path: Path = DEFAULT_WORLD_CONFIG_PATH
+    storage_compression: str = "none"
+    # 0 disables retention; otherwise candidates older than this many steps are summarized every retention_interval steps.
+    retention_keep_steps: int = 0
+    retention_interval: int = 50
+    retention_archive_path: Path | None = None
+    # Per-phase spans and counters, reported in progress events and the final summary.
+    profile: bool = False
+    profile_trace_path: Path | None = None
+    # 0 calls the provers one after another on the engine RNG. N > 0 fans them out to N worker threads;
+    # each call then draws from its own RNG stream seeded by (seed, challenge, prover), so the run is
+    # the same for every N.
+    prover_concurrency: int = 0
+    # Fan-out only: a prover call running longer than this is replaced by its offline fallback.
+    prover_timeout_s: float | None = None
+    # Same scheme for the verifier panel, seeded by (seed, candidate, verifier). Results are read in
+    # panel order and the rest is dropped once that prefix reaches the aggregator's reject quorum.
+    verifier_concurrency: int = 0
+    # The sequential panel (verifier_concurrency = 0) evaluates every verifier unless this is set; with
+    # it, it stops at the same reject-quorum prefix and records the same rows as the fan-out panel.
+    sequential_panel_short_circuit: bool = False
+    # Fan-out only: verifiers still running this long after the panel started are evaluated offline.
+    verifier_deadline_s: float | None = None
+    # 0 steps one randomly chosen branch at a time. N > 0 steps up to N distinct active branches per
+    # round: their prover and verifier work runs on N worker threads (with the per-call RNG streams
+    # above), while every step's own logic and store writes stay on the calling thread. Reject and
+    # stagnation streaks are then tracked per branch.
+    branch_concurrency: int = 0
+    # 0 commits every step before the next one starts. N > 0 hands each step's writes to a background
+    # writer thread (at most N steps queued) and builds the next challenge from in-memory state meanwhile;
+    # progress events are delivered on that thread once their step has committed.
+    pipeline_depth: int = 0
+    # Fields built for a plain progress_callback (see progress.PROGRESS_VERBOSITY); a ProgressSink brings its own.
+    progress_verbosity: str = "full"
+    # Vectors kept in memory by the embedding cache around the LLM adapter (0 disables the cache).
+    # With embedding_cache_persist, vectors are also stored in the world database and reused by later runs.
+    embedding_cache_size: int = 4096
+    embedding_cache_persist: bool = True
+    # Also compare candidate facts with every earlier fact of their branch, not only the last 120, through
+    # a per-branch FactIndex (MinHash LSH, plus numpy IVF lists over the embeddings when available).
+    # Screening, the hard repetition check and NoveltyGate then use the higher of the two similarities.
+    fact_index: bool = False
+
+
+@dataclass(slots=True)
+class StepOutcome:
+    step: int
+    branch_id: str
+    challenge: Challenge
+    metrics: dict[str, Any]
+    candidate: Any
+    score: float
+    signals: dict[str, Any]
+    reasons: list[str]
+    reason_codes: list[str]
+    reason_details: dict[str, Any]
+    candidate_traces: list[dict[str, Any]]
+    new_fact_count: int
+    reject_streak: int
+    accepted_via_retry: bool = False
+    # Run-wide counters and controller values as of this step's completion; see _step_counters.
+    counters: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class BranchProgress:
+    """Streaks a step reads and updates. Serial runs share one across all branches."""
+
+    reject_streak: int = 0
+    stagnation_streak: int = 0
+    steps_since_new_fact: int = 0
+    ontological_stagnation_score: float = 0.0
+
+
+@dataclass(slots=True)
+class StepRequest:
+    """Work a step waits on: candidates for ``challenge`` ("generate"), the verifier panel for
+    ``candidate`` ("verify"), or ``texts`` to embed before its similarity checks ("embed")."""
+
+    kind: str
+    challenge: Challenge
+    candidate: Any = None
+    texts: list[str] = field(default_factory=list)
 
 
 class SimulationEngine:
-    def __init__(self, config: SimulationConfig) -> None:
+    def __init__(self, config: SimulationConfig, *, llm_adapter: LLMAdapter | None = None) -> None:
         self.config = config
         self.rng = random.Random(config.seed)
-        self.store = WorldStore(config.db_path)
+        self.store = WorldStore(config.db_path, compression=config.storage_compression)
+        self.profiler: Profiler | NullProfiler = Profiler(config.profile_trace_path) if config.profile else NullProfiler()
+        if config.profile:
+            self.store.set_trace_callback(self.profiler.count_statement)
+        self.branches = BranchRegistry(self.store)
         self.world = load_world_config(config.world_config_path)
         self.main_branch_id = str(self.world.get("main_branch_id", "branch-main"))
         self.progression = dict(self.world.get("progression", {}))
+        self.contexts = BranchContextCache(
+            self.store,
+            # Deep enough for the projection (dependency_depth <= 8) and the stagnation window.
+            state_window=max(8, self._progression_int("stagnation_window", 6)),
+        )
         self.taskgen_policy = dict(self.world.get("taskgen_policy", {}))
         self.projection = ProjectionBuilder()
         self.taskgen = TaskGenerator(self.rng, self.taskgen_policy)
@@ -55,7 +157,19 @@ class SimulationEngine:
             model_override=config.llm_model,
             base_url_override=config.llm_base_url,
         )
-        llm_adapter = create_llm_adapter(llm_settings)
+        if llm_adapter is None:
+            llm_adapter = create_llm_adapter(llm_settings)
+        if llm_adapter is not None and config.profile:
+            llm_adapter = ProfiledLLMAdapter(llm_adapter, self.profiler)
+        self.embedding_cache: CachedEmbeddingAdapter | None = None
+        if llm_adapter is not None and config.embedding_cache_size > 0:
+            # Outside the profiler wrapper, so llm.embed_texts only counts calls that reach the provider.
+            llm_adapter = self.embedding_cache = CachedEmbeddingAdapter(
+                llm_adapter,
+                model=llm_settings.embedding_model or llm_settings.model or "default",
+                store=self.store if config.embedding_cache_persist else None,
+                capacity=config.embedding_cache_size,
+            )
         self.llm_adapter = llm_adapter
         if llm_adapter is not None:
             llm_reason = "ready"
@@ -86,11 +200,35 @@ class SimulationEngine:
         self.controller = DifficultyController(epoch=config.epoch)
         self.controller_state = ControllerState(difficulty=Difficulty())
         self.runtime = RuntimeStats()
+        # Mirror of the store's metrics rollup, updated as verification results are written.
+        self._score_rollup: ScoreRollup | None = None
         self.debt_history: list[float] = []
-        self.stagnation_streak = 0
-        self.steps_since_new_fact = 0
+        self.progress = BranchProgress()
+        self.branch_progress: dict[str, BranchProgress] = {}
+        # Last observed score on any branch; feeds the controller and the final summary.
         self.ontological_stagnation_score = 0.0
         self.scene_stagnation_by_branch: dict[str, int] = {}
+        # Per-candidate traces are only built for "full" progress events.
+        self._trace_candidates = False
+        # branch_id -> (head state id, similarity to its parent); the head only moves on accept.
+        self._head_similarity: dict[str, tuple[str, float]] = {}
+        # Loaded on first use like BranchContextCache; see _fact_index.
+        self._fact_indexes: dict[str, FactIndex] = {}
+        self._fact_index_lock = threading.Lock()
+        if config.fact_index:
+            for verifier in self.verifiers:
+                if isinstance(verifier, NoveltyGateVerifier):
+                    verifier.fact_history = self._history_fact_similarity
+        self._pools: dict[str, ThreadPoolExecutor] = {}
+        self._pools_lock = threading.Lock()
+
+    def close(self) -> None:
+        for pool in list(self._pools.values()):
+            # Calls that missed their timeout may still be running; don't wait for them.
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools.clear()
+        self.profiler.close()
+        self.store.close()
 
     @staticmethod
     def _now() -> str:
@@ -98,19 +236,18 @@ class SimulationEngine:
 
     @staticmethod
     def _tokenize(text: str) -> set[str]:
-        return set(re.findall(r"[a-zA-Zа-яА-Я0-9]+", text.lower()))
+        return tokenize(text)
 
-    @classmethod
-    def _text_similarity(cls, a: str, b: str) -> float:
-        aa = cls._tokenize(a)
-        bb = cls._tokenize(b)
-        if not aa or not bb:
-            return 0.0
-        return len(aa.intersection(bb)) / max(1, len(aa.union(bb)))
+    @staticmethod
+    def _text_similarity(a: str, b: str) -> float:
+        return lexical_jaccard(a, b)
 
     def _semantic_similarity(self, a: str, b: str) -> float:
         return semantic_similarity(a, b, self.llm_adapter)
 
+    def _max_similarity(self, query: str, corpus: list[str]) -> float:
+        return max_similarity(query, corpus, self.llm_adapter)
+
     @staticmethod
     def _fact_object_text(fact_object: Any) -> str:
         if not isinstance(fact_object, dict):
@@ -147,9 +284,125 @@ class SimulationEngine:
         except (TypeError, ValueError):
             return default
 
+    def _insert_state(self, state: dict[str, Any]) -> None:
+        self.store.insert_state(state)
+        self.contexts.record_state(state)
+
+    def _insert_branch_fact(self, fact: dict[str, Any]) -> None:
+        self.store.insert_branch_fact(fact)
+        self.contexts.record_fact(fact)
+        index = self._fact_indexes.get(str(fact["branch_id"]))
+        if index is not None:
+            index.add(self._indexed_fact_text(str(fact.get("anchor_type", "")), str(fact.get("fact_text", ""))))
+
+    def _upsert_story_memory(self, memory: dict[str, Any]) -> None:
+        self.store.upsert_story_memory(memory)
+        self.contexts.record_story_memory(memory)
+
+    def _insert_verification_result(self, result: dict[str, Any]) -> None:
+        self.store.insert_verification_result(result)
+        if self._score_rollup is not None:
+            self._score_rollup.add(float(result["score"]), str(result["verdict"]), str(result["level_max_reached"]))
+
+    def _metrics_rollup(self) -> ScoreRollup:
+        if self._score_rollup is None:
+            self._score_rollup = self.store.get_metrics_rollup()
+        return self._score_rollup
+
+    def _state_in_context(self, branch_id: str, state_id: str) -> Any:
+        return self.contexts.get(branch_id).state(state_id) or self.store.get_state(state_id)
+
+    def _flush_embeddings(self) -> None:
+        # Vectors embedded on any thread since the last flush, written in the caller's transaction.
+        if self.embedding_cache is not None:
+            with self.store.transaction():
+                self.embedding_cache.flush()
+
+    def _invalidate_caches(self) -> None:
+        # After a rollback (or a failed write-behind batch) the store may not hold what the caches do.
+        self.branches.invalidate()
+        self.contexts.invalidate()
+        self._score_rollup = None
+        self._head_similarity.clear()
+        self._fact_indexes.clear()
+        if self.embedding_cache is not None:
+            # Vectors flushed into a transaction that never committed.
+            self.embedding_cache.requeue()
+
+    def _snapshot_state(self) -> dict[str, Any]:
+        # Engine state a step changes outside the store; see _restore_state.
+        return {
+            "rng": self.rng.getstate(),
+            # Append-only, so its length is enough.
+            "debt_history": len(self.debt_history),
+            **copy.deepcopy(
+                {
+                    "runtime": self.runtime,
+                    "controller_state": self.controller_state,
+                    "progress": self.progress,
+                    "branch_progress": self.branch_progress,
+                    "ontological_stagnation_score": self.ontological_stagnation_score,
+                    "scene_stagnation_by_branch": self.scene_stagnation_by_branch,
+                }
+            ),
+        }
+
+    def _restore_state(self, snapshot: dict[str, Any]) -> None:
+        # Puts back what _snapshot_state saved, so a rolled-back step leaves no trace in counters,
+        # controller input or the RNG stream either.
+        state = dict(snapshot)
+        self.rng.setstate(state.pop("rng"))
+        del self.debt_history[state.pop("debt_history") :]
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @staticmethod
+    def _indexed_fact_text(anchor_type: str, fact_text: str) -> str:
+        # Same form as the recent_fact_texts compared in _step_phases.
+        return f"{anchor_type.strip()}: {fact_text.strip()}"
+
+    def _fact_index(self, branch_id: str) -> FactIndex:
+        index = self._fact_indexes.get(branch_id)
+        if index is None:
+            # NoveltyGateVerifier may get here from a verifier thread; indexes are only added to
+            # between phases, so a finished one is safe to read anywhere.
+            with self._fact_index_lock:
+                index = self._fact_indexes.get(branch_id)
+                if index is None:
+                    index = FactIndex(self.llm_adapter)
+                    index.add_many(self._indexed_fact_text(anchor, text) for anchor, text in self.store.iter_branch_fact_texts(branch_id))
+                    self._fact_indexes[branch_id] = index
+        return index
+
+    def _load_fact_indexes(self) -> None:
+        # Called before a step's transaction: a first load inside it reads the branch's facts through the
+        # step's buffered writes, which flushes them and holds the write lock until commit. Only a branch
+        # that turns up during the step (none of these) is still loaded lazily.
+        if self.config.fact_index:
+            for branch in (*self.branches.with_status("active"), *self.branches.with_status("stalled")):
+                self._fact_index(str(branch["branch_id"]))
+
+    def _prefetch_embeddings(self, request: StepRequest) -> None:
+        # Answers an "embed" request: loads the branch's FactIndex and puts the step's texts in the
+        # embedding cache, so the similarity checks that follow on the step's thread are cache hits.
+        if self.config.fact_index:
+            self._fact_index(request.challenge.branch_id).embed_pending()
+        for start in range(0, len(request.texts), EMBED_BATCH_SIZE):
+            try:
+                self.llm_adapter.embed_texts(texts=request.texts[start : start + EMBED_BATCH_SIZE])
+            except Exception:  # noqa: BLE001
+                # The checks retry and fall back to lexical overlap on their own.
+                return
+
+    def _history_fact_similarity(self, branch_id: str, fact_text: str, window: int) -> float:
+        # ``window`` is how many of the newest facts the caller already compared against.
+        if not self.config.fact_index or not fact_text:
+            return 0.0
+        index = self._fact_index(branch_id)
+        return index.max_similarity(fact_text) if len(index) > window else 0.0
+
     def _recent_branch_narratives(self, branch_id: str, limit: int = 5) -> list[str]:
-        states = self.store.list_states(branch_id=branch_id)
-        recent = states[-limit:]
+        recent = self.contexts.get(branch_id).recent_states(limit)
         narratives: list[str] = []
         for state in recent:
             bundle = state.get("meta_m", {}).get("story_bundle", {})
@@ -175,11 +428,10 @@ class SimulationEngine:
         return hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
 
     def _recent_branch_facts(self, branch_id: str, limit: int = 120) -> list[dict[str, Any]]:
-        return self.store.list_branch_facts(branch_id, limit=limit)
+        return self.contexts.get(branch_id).recent_facts(limit)
 
     def _recent_branch_directives(self, branch_id: str, limit: int = 12) -> list[str]:
-        challenges = self.store.list_challenges(branch_id=branch_id)
-        return [str(ch.get("directive_type", "")) for ch in challenges[-limit:] if str(ch.get("directive_type", "")).strip()]
+        return self.contexts.get(branch_id).recent_directives(limit)
 
     def _required_families(self, recent_directives: list[str]) -> list[str]:
         families_window = self._progression_int("family_window", 6)
@@ -192,8 +444,8 @@ class SimulationEngine:
         seen = {self.taskgen.directive_family(d) for d in recent_directives[-families_window:]}
         return [item for item in required if item not in seen]
 
-    def _active_anchor_ids(self, branch_id: str, limit: int = 300) -> list[str]:
-        facts = self.store.list_active_facts(branch_id, limit=limit)
+    def _active_anchor_ids(self, branch_id: str, limit: int = 250) -> list[str]:
+        facts = self.contexts.get(branch_id).active_facts(limit)
         ids: list[str] = []
         for fact in facts:
             fid = str(fact.get("fact_id", "")).strip()
@@ -205,7 +457,7 @@ class SimulationEngine:
         self._seed_genesis()
         genesis_cfg = self.world.get("genesis", {})
         genesis_state_id = str(genesis_cfg.get("state_id", "state-0"))
-        branch = self.store.get_branch(self.main_branch_id)
+        branch = self.branches.get(self.main_branch_id)
         state = self.store.get_state(genesis_state_id)
         memory = self.store.get_story_memory(self.main_branch_id)
 
@@ -232,10 +484,12 @@ class SimulationEngine:
         }
 
     def _seed_genesis(self) -> None:
-        branches = self.store.list_branches()
-        if branches:
-            return
+        with self.store.transaction():
+            if self.branches.all():
+                return
+            self._insert_genesis()
 
+    def _insert_genesis(self) -> None:
         genesis = self.world.get("genesis", {})
         continuity = self.world.get("continuity", {})
         anchor = str(self.world.get("anchor_character", "anchor"))
@@ -250,7 +504,7 @@ class SimulationEngine:
         story_bundle = genesis.get("story_bundle", {})
         story_memory = genesis.get("story_memory", {})
         story_event = genesis.get("story_event", {})
-        self.store.insert_state(
+        self._insert_state(
             {
                 "state_id": state_id,
                 "branch_id": branch_id,
@@ -273,7 +527,7 @@ class SimulationEngine:
                 "created_at": created_at,
             }
         )
-        self.store.upsert_branch(
+        self.branches.upsert(
             {
                 "branch_id": branch_id,
                 "head_state_id": state_id,
@@ -285,7 +539,7 @@ class SimulationEngine:
                 "chaos_pressure": float(branch_metrics.get("chaos_pressure", 0.5)),
             }
         )
-        self.store.upsert_story_memory(
+        self._upsert_story_memory(
             {
                 "branch_id": branch_id,
                 "summary": str(story_memory.get("summary", f"{anchor}'s world begins with unresolved competing interpretations.")),
@@ -337,18 +591,38 @@ class SimulationEngine:
             }
         )
 
+    def _branch_progress(self, branch_id: str) -> BranchProgress:
+        if self.config.branch_concurrency <= 0:
+            return self.progress
+        progress = self.branch_progress.get(branch_id)
+        if progress is None:
+            progress = self.branch_progress[branch_id] = BranchProgress()
+        return progress
+
     def _choose_branch(self) -> dict[str, Any]:
-        active = [b for b in self.store.list_branches() if b["status"] == "active"]
+        active = self.branches.with_status("active")
         if not active:
-            stalled = [b for b in self.store.list_branches() if b["status"] == "stalled"]
+            stalled = self.branches.with_status("stalled")
             if not stalled:
                 raise RuntimeError("No active branch available")
             resurrect = self.rng.choice(stalled)
             resurrect["status"] = "active"
-            self.store.upsert_branch(resurrect)
+            self.branches.upsert(resurrect)
             return resurrect
         return self.rng.choice(active)
 
+    def _choose_branches(self, width: int) -> list[dict[str, Any]]:
+        # Distinct branches for one round, in registry order; a single slot behaves like _choose_branch().
+        if width < 1:
+            raise ValueError(f"Round width must be >= 1, got {width}")
+        active = self.branches.with_status("active")
+        if width == 1 or not active:
+            return [self._choose_branch()]
+        if len(active) <= width:
+            return active
+        picked = {branch["branch_id"] for branch in self.rng.sample(active, width)}
+        return [branch for branch in active if branch["branch_id"] in picked]
+
     def _branch_signals(self, branch: dict[str, Any]) -> BranchSignals:
         return BranchSignals(
             closure_pressure=float(branch["closure_pressure"]),
@@ -371,8 +645,7 @@ class SimulationEngine:
 
     def _build_challenge(self, step: int, branch: dict[str, Any], reject_streak: int = 0) -> Challenge:
         branch_id = branch["branch_id"]
-        states = self.store.list_states(branch_id=branch_id)
-        artifacts = [s["artifact_x"] for s in states]
+        progress = self._branch_progress(branch_id)
         recent_narratives = self._recent_branch_narratives(branch_id, limit=6)
         recent_facts = self._recent_branch_facts(branch_id, limit=160)
         active_anchor_ids = self._active_anchor_ids(branch_id, limit=250)
@@ -431,7 +704,7 @@ class SimulationEngine:
         force_institutional_action = scene_stagnation_streak >= scene_stagnation_trigger
         if force_institutional_action:
             directive = "InstitutionalAction"
-        if self.stagnation_streak >= 2 and not force_institutional_action:
+        if progress.stagnation_streak >= 2 and not force_institutional_action:
             directive = self.rng.choice(["AgentCommitment", "ResourceConstraint", "InformationAsymmetry", "DelayedConsequence"])
         max_streak = max(1, int(getattr(self.taskgen, "max_same_directive_streak", 2)))
         if len(recent_directives) >= max_streak:
@@ -453,8 +726,10 @@ class SimulationEngine:
                 future_fragility=difficulty.future_fragility,
                 novelty_budget=min(1.0, max(0.1, difficulty.novelty_budget + 0.10)),
             )
+        states = self.contexts.get(branch_id).recent_states(max(1, difficulty.dependency_depth))
+        artifacts = [s["artifact_x"] for s in states]
         projection = self.projection.build(artifacts, difficulty.dependency_depth)
-        story_memory = self.store.get_story_memory(branch_id)
+        story_memory = self.contexts.get(branch_id).story_memory
         if story_memory:
             projection = (
                 f"{projection}\n\nStory continuity summary:\n{story_memory.get('summary', '')}\n"
@@ -482,7 +757,7 @@ class SimulationEngine:
             )
         cadence_window = max(1, self._progression_int("fact_cadence_window", 3))
         require_new_fact_each_step = bool(self.progression.get("require_new_fact_each_step", True))
-        required_min_new_facts = 1 if require_new_fact_each_step else (1 if self.steps_since_new_fact >= cadence_window - 1 else 0)
+        required_min_new_facts = 1 if require_new_fact_each_step else (1 if progress.steps_since_new_fact >= cadence_window - 1 else 0)
         dependency_target_depth = max(1, self._progression_int("dependency_target_depth", 4))
         required_reference_count = max(1, self._progression_int("required_reference_count", 2))
         max_new_facts_per_step = max(1, self._progression_int("max_new_facts_per_step", 1))
@@ -624,7 +899,7 @@ class SimulationEngine:
                 "novelty_phase_early_end": novelty_phase_early_end,
                 "novelty_phase_mid_end": novelty_phase_mid_end,
                 "sim_fact_max": sim_fact_max,
-                "stagnation_streak": self.stagnation_streak,
+                "stagnation_streak": progress.stagnation_streak,
                 "scene_stagnation_streak": scene_stagnation_streak,
                 "escape_mode": escape_mode,
             },
@@ -642,19 +917,61 @@ class SimulationEngine:
                 "created_at": self._now(),
             }
         )
+        self.contexts.record_directive(challenge.branch_id, challenge.directive_type)
         return challenge
 
+    def _verifier_rng(self, candidate: Any, verifier: Any) -> random.Random:
+        return random.Random(f"{self.config.seed}:{candidate.candidate_id}:{verifier.verifier_id}")
+
+    def _run_verifiers(self, challenge: Challenge, candidate, *, seeded: bool = False) -> list[VerificationResult]:
+        if self.config.verifier_concurrency <= 0:
+            serial: list[VerificationResult] = []
+            for verifier in self.verifiers:
+                # Same panel-order prefix rule as the concurrent panel below, when asked for.
+                if self.config.sequential_panel_short_circuit and self.aggregator.reject_quorum_reached(serial):
+                    self.profiler.count("verifier.short_circuits")
+                    break
+                if seeded:
+                    verifier = replace(verifier, rng=self._verifier_rng(candidate, verifier))
+                serial.append(verifier.evaluate(challenge, candidate, allow_l3=True))
+            return serial
+
+        pool = self._pool("verifier", self.config.verifier_concurrency)
+        futures = [
+            pool.submit(replace(verifier, rng=self._verifier_rng(candidate, verifier)).evaluate, challenge, candidate, True)
+            for verifier in self.verifiers
+        ]
+        deadline = self.config.verifier_deadline_s
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        results: list[VerificationResult] = []
+        for verifier, future in zip(self.verifiers, futures):
+            # Judged on the panel-order prefix only, so the recorded panel never depends on timing.
+            if self.aggregator.reject_quorum_reached(results):
+                self.profiler.count("verifier.short_circuits")
+                for pending in futures[len(results):]:
+                    pending.cancel()
+                break
+            try:
+                results.append(future.result(timeout=None if deadline_at is None else max(0.0, deadline_at - time.monotonic())))
+            except FutureTimeoutError:
+                future.cancel()
+                self.profiler.count("verifier.timeouts")
+                result = replace(verifier, rng=self._verifier_rng(candidate, verifier), llm=None).evaluate(challenge, candidate, allow_l3=True)
+                result.notes = f"{result.notes}; panel deadline of {deadline}s exceeded, evaluated offline"
+                results.append(result)
+        return results
+
     def _evaluate_candidate(
         self,
         challenge: Challenge,
         candidate,
+        results: list[VerificationResult],
         *,
         repetition_penalty: float = 0.0,
         hard_repetition_fail: bool = False,
     ) -> tuple[Verdict, float, dict[str, Any], dict[str, int], list[str]]:
-        results = [v.evaluate(challenge, candidate, allow_l3=True) for v in self.verifiers]
         for result in results:
-            self.store.insert_verification_result(
+            self._insert_verification_result(
                 {
                     "candidate_id": result.candidate_id,
                     "verifier_id": result.verifier_id,
@@ -723,12 +1040,12 @@ class SimulationEngine:
         return decision.verdict, decision.score, signal_means, decision.level_counts, decision.reasons
 
     def _accept_candidate(self, challenge: Challenge, candidate, score: float, signals: dict[str, float], level_counts: dict[str, int]) -> None:
-        parent = self.store.get_state(challenge.parent_state_id)
+        parent = self._state_in_context(challenge.branch_id, challenge.parent_state_id)
         if parent is None:
             raise RuntimeError("Parent state not found")
 
         branch_id = challenge.branch_id
-        branch = self.store.get_branch(branch_id)
+        branch = self.branches.get(branch_id)
         if branch is None:
             raise RuntimeError("Branch not found")
 
@@ -742,7 +1059,7 @@ class SimulationEngine:
         )
         self.debt_history.append(debt)
 
-        self.store.insert_state(
+        self._insert_state(
             {
                 "state_id": state_id,
                 "branch_id": branch_id,
@@ -764,7 +1081,7 @@ class SimulationEngine:
         chaos_pressure = signals["chaos_risk"]
         uncertainty = abs(closure_pressure - chaos_pressure)
 
-        self.store.upsert_branch(
+        self.branches.upsert(
             {
                 "branch_id": branch_id,
                 "head_state_id": state_id,
@@ -793,11 +1110,7 @@ class SimulationEngine:
         self.runtime.accepted_candidates += 1
 
     def _record_branch_facts(self, *, branch_id: str, state_id: str, state_height: int, facts: Any, fact_object: Any) -> None:
-        existing_ids = {
-            str(row.get("fact_id", "")).strip()
-            for row in self.store.list_branch_facts(branch_id, limit=3000)
-            if str(row.get("fact_id", "")).strip()
-        }
+        existing_ids = self.contexts.get(branch_id).known_fact_ids()
 
         canonical_facts: list[dict[str, Any]] = []
         if isinstance(fact_object, dict) and str(fact_object.get("id", "")).strip():
@@ -849,7 +1162,7 @@ class SimulationEngine:
             references = item.get("references", [])
             if not isinstance(references, list):
                 references = []
-            self.store.insert_branch_fact(
+            self._insert_branch_fact(
                 {
                     "branch_id": branch_id,
                     "state_id": state_id,
@@ -872,7 +1185,7 @@ class SimulationEngine:
             )
 
     def _update_story_continuity(self, *, branch_id: str, state_id: str, height: int, story_bundle: dict[str, Any]) -> None:
-        memory = self.store.get_story_memory(branch_id)
+        memory = self.contexts.get(branch_id).story_memory
         continuity_cfg = self.world.get("continuity", {})
         anchor = str(self.world.get("anchor_character", "anchor"))
         continuity = memory.get("continuity", {}) if memory else {}
@@ -906,7 +1219,7 @@ class SimulationEngine:
             scene_excerpt=scene[:120] if scene else "state accepted with unresolved interpretations",
         )
 
-        self.store.upsert_story_memory(
+        self._upsert_story_memory(
             {
                 "branch_id": branch_id,
                 "summary": summary,
@@ -940,12 +1253,15 @@ class SimulationEngine:
         if self.rng.random() > 0.12:
             return
 
-        parent_branch = self.store.get_branch(challenge.branch_id)
+        parent_branch = self.branches.get(challenge.branch_id)
         if parent_branch is None:
             return
 
         new_branch_id = f"branch-fork-{self.runtime.forks_created + 1}"
-        self.store.upsert_branch(
+        if self.branches.get(new_branch_id) is None:
+            # Nothing to load for a brand-new branch; reading it back would wait on the write-behind queue.
+            self.contexts.create(new_branch_id)
+        self.branches.upsert(
             {
                 "branch_id": new_branch_id,
                 "head_state_id": challenge.parent_state_id,
@@ -960,12 +1276,12 @@ class SimulationEngine:
 
         # Add one accepted state on the fork from the same parent.
         fork_state_id = f"state-fork-{challenge.challenge_id}-{self.runtime.forks_created + 1}-{accepted_candidate.prover_id[-4:]}"
-        self.store.insert_state(
+        self._insert_state(
             {
                 "state_id": fork_state_id,
                 "branch_id": new_branch_id,
                 "parent_state_id": challenge.parent_state_id,
-                "height": self.store.get_state(challenge.parent_state_id)["height"] + 1,
+                "height": self._state_in_context(challenge.branch_id, challenge.parent_state_id)["height"] + 1,
                 "artifact_x": accepted_candidate.artifact_x + " Fork continuation accepted from shared parent.",
                 "meta_m": accepted_candidate.meta_m,
                 "challenge_ref": challenge.challenge_id,
@@ -973,7 +1289,7 @@ class SimulationEngine:
                 "created_at": self._now(),
             }
         )
-        self.store.upsert_branch(
+        self.branches.upsert(
             {
                 "branch_id": new_branch_id,
                 "head_state_id": fork_state_id,
@@ -989,8 +1305,8 @@ class SimulationEngine:
 
     def _ontological_stagnation(self, branch_id: str) -> dict[str, Any]:
         window = max(2, self._progression_int("stagnation_window", 6))
-        states = self.store.list_states(branch_id=branch_id)
-        recent_states = states[-window:]
+        context = self.contexts.get(branch_id)
+        recent_states = context.recent_states(window)
         if len(recent_states) < 2:
             return {
                 "score": 1.0,
@@ -1000,8 +1316,7 @@ class SimulationEngine:
                 "type_diversity_growth": 0,
                 "interpretation_shift": 0.0,
             }
-        state_ids = {str(s.get("state_id", "")) for s in recent_states}
-        facts = [f for f in self.store.list_branch_facts(branch_id, limit=1000) if str(f.get("state_id", "")) in state_ids]
+        facts = context.facts_for_states(str(s.get("state_id", "")) for s in recent_states)
         new_fact_count = len({str(f.get("fact_id", "")) for f in facts if str(f.get("fact_id", "")).strip()})
         types = {str(f.get("anchor_type", "")).strip() for f in facts if str(f.get("anchor_type", "")).strip()}
         type_diversity_growth = max(0, len(types) - 1)
@@ -1030,14 +1345,8 @@ class SimulationEngine:
             "interpretation_shift": round(float(interpretation_shift), 3),
         }
 
-    def _candidate_screen(
-        self,
-        challenge: Challenge,
-        candidate,
-        *,
-        recent_narratives: list[str],
-        recent_fact_texts: list[str],
-    ) -> dict[str, Any]:
+    def _screen_fact_object(self, challenge: Challenge, candidate) -> tuple[str, Any, Any]:
+        # Expected fact type, raw fact object and its schema result, as _candidate_screen judges them.
         policy = challenge.verifier_policy
         contracts = policy.get("directive_fact_type_contracts", {})
         expected_type = str(policy.get("expected_fact_type", "")).strip()
@@ -1052,6 +1361,23 @@ class SimulationEngine:
             expected_fact_type=expected_type,
             allow_coercion=allow_coercion,
         )
+        return expected_type, raw_fact_object, schema_result
+
+    @staticmethod
+    def _candidate_scene(candidate) -> str:
+        return str(candidate.meta_m.get("story_bundle", {}).get("scene", "")).strip() or str(candidate.artifact_x)
+
+    def _candidate_screen(
+        self,
+        challenge: Challenge,
+        candidate,
+        *,
+        recent_narratives: list[str],
+        recent_fact_texts: list[str],
+        fact_object: tuple[str, Any, Any] | None = None,
+    ) -> dict[str, Any]:
+        policy = challenge.verifier_policy
+        expected_type, raw_fact_object, schema_result = fact_object or self._screen_fact_object(challenge, candidate)
         normalized_fact_object = dict(schema_result.normalized)
         fact_type = str(normalized_fact_object.get("type", "")).strip()
         fact_id = str(normalized_fact_object.get("id", "")).strip()
@@ -1111,9 +1437,12 @@ class SimulationEngine:
             diversity_bonus -= 16.0
 
         fact_text = self._fact_object_text(normalized_fact_object)
-        max_fact_similarity = max((self._semantic_similarity(fact_text, prev) for prev in recent_fact_texts), default=0.0) if fact_text else 0.0
-        scene = str(candidate.meta_m.get("story_bundle", {}).get("scene", "")).strip() or str(candidate.artifact_x)
-        max_scene_similarity = max((self._semantic_similarity(scene, prev) for prev in recent_narratives), default=0.0) if recent_narratives else 0.0
+        max_fact_similarity = max(
+            self._max_similarity(fact_text, recent_fact_texts) if fact_text else 0.0,
+            self._history_fact_similarity(challenge.branch_id, fact_text, len(recent_fact_texts)),
+        )
+        scene = self._candidate_scene(candidate)
+        max_scene_similarity = self._max_similarity(scene, recent_narratives)
         novelty_score = max(0.0, 1.0 - max_fact_similarity)
 
         # deterministic ranking: protocol pass first, then novelty, then evidence/ref richness
@@ -1143,60 +1472,168 @@ class SimulationEngine:
             "references_count": refs_count,
         }
 
-    def run(self, steps: int | None = None, progress_callback: Callable[[dict[str, Any]], None] | None = None) -> dict[str, Any]:
-        self._seed_genesis()
-        total_steps = steps or self.config.steps
-        existing_challenges = len(self.store.list_challenges())
-        reject_streak = 0
+    def _pool(self, name: str, workers: int) -> ThreadPoolExecutor:
+        # Round workers may ask for the prover/verifier pools concurrently.
+        with self._pools_lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                pool = self._pools[name] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+            return pool
 
-        for offset in range(1, total_steps + 1):
-            step = existing_challenges + offset
-            branch = self._choose_branch()
-            challenge = self._build_challenge(step, branch, reject_streak=reject_streak)
-            self.runtime.attempted_challenges += 1
-
-            accepted_candidate = None
-            best_score = 0.0
-            best_meta: dict[str, Any] = {}
-            best_levels: dict[str, int] = {}
-            best_any_candidate = None
-            best_any_score = -1.0
-            best_any_meta: dict[str, Any] = {}
-            best_any_levels: dict[str, int] = {}
-            best_any_reasons: list[str] = []
-            best_any_reason_codes: list[str] = []
-            best_any_reason_details: dict[str, Any] = {}
-            accepted_via_retry = False
-            candidate_traces: list[dict[str, Any]] = []
-            recent_narratives = self._recent_branch_narratives(branch["branch_id"], limit=6)
-            recent_facts = self._recent_branch_facts(branch["branch_id"], limit=120)
-            recent_fact_texts = [f"{str(f.get('anchor_type', '')).strip()}: {str(f.get('fact_text', '')).strip()}" for f in recent_facts]
-
-            generated_candidates: list[Any] = []
+    def _prover_rng(self, challenge: Challenge, prover: Any) -> random.Random:
+        return random.Random(f"{self.config.seed}:{challenge.challenge_id}:{prover.prover_id}")
+
+    def _generate_candidates(self, challenge: Challenge, *, seeded: bool = False) -> list[Any]:
+        if self.config.prover_concurrency <= 0:
+            candidates: list[Any] = []
             for index, prover in enumerate(self.provers, start=1):
-                candidate = prover.generate(challenge, index)
-                generated_candidates.append(candidate)
-                self.store.insert_candidate(
-                    {
-                        "candidate_id": candidate.candidate_id,
-                        "challenge_id": candidate.challenge_id,
-                        "prover_id": candidate.prover_id,
-                        "artifact_x": candidate.artifact_x,
-                        "meta_m": candidate.meta_m,
-                        "status": "pending",
-                        "created_at": self._now(),
-                    }
-                )
+                if seeded:
+                    prover = replace(prover, rng=self._prover_rng(challenge, prover))
+                with self.profiler.span("prover_generate"):
+                    candidates.append(prover.generate(challenge, index))
+            return candidates
+
+        pool = self._pool("prover", self.config.prover_concurrency)
+        started: dict[int, float] = {}
+
+        def call(prover: Any, index: int) -> Any:
+            started[index] = time.monotonic()
+            with self.profiler.span("prover_generate"):
+                return prover.generate(challenge, index)
+
+        futures = [
+            pool.submit(call, replace(prover, rng=self._prover_rng(challenge, prover)), index)
+            for index, prover in enumerate(self.provers, start=1)
+        ]
+        candidates = []
+        for index, (prover, future) in enumerate(zip(self.provers, futures), start=1):
+            try:
+                candidates.append(self._await_prover(future, index, started))
+            except FutureTimeoutError:
+                future.cancel()
+                self.profiler.count("prover.timeouts")
+                fallback = replace(prover, rng=self._prover_rng(challenge, prover), llm=None).generate(challenge, index)
+                fallback.meta_m["llm_error"] = f"prover call timed out after {self.config.prover_timeout_s}s"
+                candidates.append(fallback)
+        return candidates
+
+    def _await_prover(self, future: Future, index: int, started: dict[int, float]) -> Any:
+        timeout = self.config.prover_timeout_s
+        if timeout is None:
+            return future.result()
+        while True:
+            # The per-call clock starts when a worker picks the call up, not when it was queued.
+            begun = started.get(index)
+            remaining = timeout if begun is None else begun + timeout - time.monotonic()
+            try:
+                return future.result(timeout=max(0.0, remaining))
+            except FutureTimeoutError:
+                if begun is not None:
+                    raise
+
+    def _answer(self, request: StepRequest, *, seeded: bool = False) -> Any:
+        # seeded=True when requests of several steps are answered at once: the engine RNG is then
+        # reserved for the step phases, which run in a fixed order.
+        if request.kind == "generate":
+            return self._generate_candidates(request.challenge, seeded=seeded)
+        if request.kind == "verify":
+            return self._run_verifiers(request.challenge, request.candidate, seeded=seeded)
+        if request.kind == "embed":
+            with self.profiler.span("embedding_prefetch"):
+                return self._prefetch_embeddings(request)
+        raise ValueError(f"Unknown step request: {request.kind}")
+
+    @staticmethod
+    def _advance_phases(
+        phases: list[Generator[StepRequest, Any, StepOutcome]],
+        answers: dict[int, Any],
+        outcomes: dict[int, StepOutcome],
+    ) -> dict[int, StepRequest]:
+        # Resumes each waiting step with its answer, in index order; returns what they wait on next.
+        requests: dict[int, StepRequest] = {}
+        for index, answer in answers.items():
+            try:
+                requests[index] = phases[index].send(answer)
+            except StopIteration as done:
+                outcomes[index] = done.value
+        return requests
+
+    def _run_step(self, step: int) -> StepOutcome:
+        phases = self._step_phases(step)
+        answer: Any = None
+        while True:
+            try:
+                request = phases.send(answer)
+            except StopIteration as done:
+                return done.value
+            # On one thread a prefetch has nothing to overlap with: the checks embed as they go.
+            answer = None if request.kind == "embed" else self._answer(request)
+
+    def _step_phases(self, step: int, branch: dict[str, Any] | None = None) -> Generator[StepRequest, Any, StepOutcome]:
+        # Yields a StepRequest wherever the step waits on provers or verifiers and resumes with the
+        # answer, so a driver can serve many steps' requests at once. No span is held across a yield.
+        with self.profiler.span("build_challenge"):
+            if branch is None:
+                branch = self._choose_branch()
+            progress = self._branch_progress(branch["branch_id"])
+            reject_streak = progress.reject_streak
+            challenge = self._build_challenge(step, branch, reject_streak=reject_streak)
+        self.runtime.attempted_challenges += 1
+
+        accepted_candidate = None
+        best_score = 0.0
+        best_meta: dict[str, Any] = {}
+        best_levels: dict[str, int] = {}
+        best_any_candidate = None
+        best_any_score = -1.0
+        best_any_meta: dict[str, Any] = {}
+        best_any_levels: dict[str, int] = {}
+        best_any_reasons: list[str] = []
+        best_any_reason_codes: list[str] = []
+        best_any_reason_details: dict[str, Any] = {}
+        accepted_via_retry = False
+        candidate_traces: list[dict[str, Any]] = []
+        trace_candidates = self._trace_candidates
+        recent_narratives = self._recent_branch_narratives(branch["branch_id"], limit=6)
+        recent_facts = self._recent_branch_facts(branch["branch_id"], limit=120)
+        recent_fact_texts = [f"{str(f.get('anchor_type', '')).strip()}: {str(f.get('fact_text', '')).strip()}" for f in recent_facts]
+
+        generated_candidates = yield StepRequest("generate", challenge)
+        for candidate in generated_candidates:
+            self.store.insert_candidate(
+                {
+                    "candidate_id": candidate.candidate_id,
+                    "challenge_id": candidate.challenge_id,
+                    "prover_id": candidate.prover_id,
+                    "artifact_x": candidate.artifact_x,
+                    "meta_m": candidate.meta_m,
+                    "status": "pending",
+                    "created_at": self._now(),
+                }
+            )
 
-            screening: list[dict[str, Any]] = []
-            for candidate in generated_candidates:
+        fact_objects = [self._screen_fact_object(challenge, candidate) for candidate in generated_candidates]
+        if self.embedding_cache is not None:
+            # Everything the screening, repetition and scene checks below embed, fetched by the driver.
+            # The head's fact text is what the progress event's step_similarity compares with.
+            head = self.contexts.get(branch["branch_id"]).recent_states(1)
+            texts = [*recent_fact_texts, *recent_narratives, *(self._state_fact_text(state) for state in head)]
+            for candidate, (_, _, schema_result) in zip(generated_candidates, fact_objects):
+                texts += [self._fact_object_text(dict(schema_result.normalized)), self._candidate_scene(candidate)]
+            yield StepRequest("embed", challenge, texts=[text for text in dict.fromkeys(texts) if text.strip()])
+
+        screening: list[dict[str, Any]] = []
+        for candidate, fact_object in zip(generated_candidates, fact_objects):
+            with self.profiler.span("candidate_screen"):
                 screen = self._candidate_screen(
                     challenge,
                     candidate,
                     recent_narratives=recent_narratives,
                     recent_fact_texts=recent_fact_texts,
+                    fact_object=fact_object,
                 )
-                screening.append(screen)
+            screening.append(screen)
+            if trace_candidates:
                 candidate_traces.append(
                     {
                         "prover_id": candidate.prover_id,
@@ -1247,50 +1684,57 @@ class SimulationEngine:
                     }
                 )
 
-            # Select one canonical candidate per step: schema/contract clean first, then highest rank.
-            candidate_indices = list(range(len(generated_candidates)))
-            preferred = [i for i in candidate_indices if not screening[i].get("reason_codes")]
-            select_pool = preferred if preferred else candidate_indices
-            selected_index = max(select_pool, key=lambda i: float(screening[i].get("rank_score", 0.0)))
-            selected_candidate = generated_candidates[selected_index]
-            selected_screen = screening[selected_index]
+        # Select one canonical candidate per step: schema/contract clean first, then highest rank.
+        candidate_indices = list(range(len(generated_candidates)))
+        preferred = [i for i in candidate_indices if not screening[i].get("reason_codes")]
+        select_pool = preferred if preferred else candidate_indices
+        selected_index = max(select_pool, key=lambda i: float(screening[i].get("rank_score", 0.0)))
+        selected_candidate = generated_candidates[selected_index]
+        selected_screen = screening[selected_index]
+        if trace_candidates:
             candidate_traces[selected_index]["selected"] = True
-            if isinstance(selected_candidate.meta_m, dict):
-                selected_candidate.meta_m["fact_object"] = dict(selected_screen.get("normalized_fact_object", {}))
-
-            candidate_scene = str(selected_candidate.meta_m.get("story_bundle", {}).get("scene", "")).strip()
-            candidate_text = candidate_scene or selected_candidate.artifact_x
-            candidate_fact_text = self._fact_object_text(selected_screen.get("normalized_fact_object", {}))
-            max_fact_similarity = 0.0
-            max_scene_similarity = 0.0
+        if isinstance(selected_candidate.meta_m, dict):
+            selected_candidate.meta_m["fact_object"] = dict(selected_screen.get("normalized_fact_object", {}))
+
+        candidate_scene = str(selected_candidate.meta_m.get("story_bundle", {}).get("scene", "")).strip()
+        candidate_text = candidate_scene or selected_candidate.artifact_x
+        candidate_fact_text = self._fact_object_text(selected_screen.get("normalized_fact_object", {}))
+        max_fact_similarity = 0.0
+        max_scene_similarity = 0.0
+        with self.profiler.span("repetition_check"):
             if candidate_fact_text and recent_fact_texts:
-                max_fact_similarity = max(self._semantic_similarity(candidate_fact_text, prev) for prev in recent_fact_texts)
+                max_fact_similarity = self._max_similarity(candidate_fact_text, recent_fact_texts)
+            max_fact_similarity = max(max_fact_similarity, self._history_fact_similarity(challenge.branch_id, candidate_fact_text, len(recent_fact_texts)))
             if recent_narratives:
-                max_scene_similarity = max(self._semantic_similarity(candidate_text, prev) for prev in recent_narratives)
-            hard_similarity_threshold = float(challenge.verifier_policy.get("sim_fact_max", 0.92))
-            hard_repetition_fail = max_fact_similarity >= hard_similarity_threshold
-            novelty_penalty = 0.0
-            if max_fact_similarity > 0.80:
-                novelty_penalty = min(0.85, ((max_fact_similarity - 0.80) / 0.20) ** 2 * 0.85)
-
+                max_scene_similarity = self._max_similarity(candidate_text, recent_narratives)
+        hard_similarity_threshold = float(challenge.verifier_policy.get("sim_fact_max", 0.92))
+        hard_repetition_fail = max_fact_similarity >= hard_similarity_threshold
+        novelty_penalty = 0.0
+        if max_fact_similarity > 0.80:
+            novelty_penalty = min(0.85, ((max_fact_similarity - 0.80) / 0.20) ** 2 * 0.85)
+
+        results = yield StepRequest("verify", challenge, selected_candidate)
+        with self.profiler.span("evaluate_candidate"):
             verdict, score, signals, levels, reasons = self._evaluate_candidate(
                 challenge,
                 selected_candidate,
+                results,
                 repetition_penalty=novelty_penalty,
                 hard_repetition_fail=hard_repetition_fail,
             )
-            adjusted_score = score
-            adjusted_verdict = verdict
-            adjusted_reasons = list(reasons)
-            if novelty_penalty > 0:
-                adjusted_reasons.append(
-                    f"Repetition penalty applied (fact_similarity={max_fact_similarity:.2f}, penalty={novelty_penalty:.3f})"
-                )
-            if hard_repetition_fail:
-                adjusted_reasons.append(
-                    f"Hard repetition reject (fact_similarity={max_fact_similarity:.2f} >= threshold={hard_similarity_threshold:.2f})"
-                )
+        adjusted_score = score
+        adjusted_verdict = verdict
+        adjusted_reasons = list(reasons)
+        if novelty_penalty > 0:
+            adjusted_reasons.append(
+                f"Repetition penalty applied (fact_similarity={max_fact_similarity:.2f}, penalty={novelty_penalty:.3f})"
+            )
+        if hard_repetition_fail:
+            adjusted_reasons.append(
+                f"Hard repetition reject (fact_similarity={max_fact_similarity:.2f} >= threshold={hard_similarity_threshold:.2f})"
+            )
 
+        if trace_candidates:
             candidate_traces[selected_index].update(
                 {
                     "score": round(adjusted_score, 3),
@@ -1311,155 +1755,314 @@ class SimulationEngine:
                 }
             )
 
-            for i, candidate in enumerate(generated_candidates):
-                if i == selected_index:
-                    self.store.update_candidate_status(candidate.candidate_id, adjusted_verdict.value)
-                else:
-                    self.store.update_candidate_status(candidate.candidate_id, Verdict.REJECT.value)
-
-            best_any_candidate = selected_candidate
-            best_any_score = adjusted_score
-            best_any_meta = signals
-            best_any_levels = levels
-            best_any_reasons = adjusted_reasons
-            best_any_reason_codes = list(signals.get("reason_codes", [])) if isinstance(signals.get("reason_codes", []), list) else []
-            best_any_reason_details = dict(signals.get("reason_details", {})) if isinstance(signals.get("reason_details", {}), dict) else {}
-            if adjusted_verdict == Verdict.ACCEPT:
-                accepted_candidate = selected_candidate
-                best_score = adjusted_score
-                best_meta = signals
-                best_levels = levels
-
-            new_fact_count_current = int(best_any_meta.get("new_fact_count", 0.0)) if best_any_meta else 0
-            if accepted_candidate is not None:
+        for i, candidate in enumerate(generated_candidates):
+            if i == selected_index:
+                self.store.update_candidate_status(candidate.candidate_id, adjusted_verdict.value)
+            else:
+                self.store.update_candidate_status(candidate.candidate_id, Verdict.REJECT.value)
+
+        best_any_candidate = selected_candidate
+        best_any_score = adjusted_score
+        best_any_meta = signals
+        best_any_levels = levels
+        best_any_reasons = adjusted_reasons
+        best_any_reason_codes = list(signals.get("reason_codes", [])) if isinstance(signals.get("reason_codes", []), list) else []
+        best_any_reason_details = dict(signals.get("reason_details", {})) if isinstance(signals.get("reason_details", {}), dict) else {}
+        if adjusted_verdict == Verdict.ACCEPT:
+            accepted_candidate = selected_candidate
+            best_score = adjusted_score
+            best_meta = signals
+            best_levels = levels
+
+        new_fact_count_current = int(best_any_meta.get("new_fact_count", 0.0)) if best_any_meta else 0
+        if accepted_candidate is not None:
+            with self.profiler.span("accept_candidate"):
                 self._accept_candidate(challenge, accepted_candidate, best_score, best_meta, best_levels)
                 self._maybe_create_fork(challenge, accepted_candidate)
-                reject_streak = 0
-                new_fact_count_current = int(best_meta.get("new_fact_count", 0.0))
-            else:
-                self.runtime.rejected_candidates += 1
-                reject_streak += 1
-                stale = self.store.get_branch(branch["branch_id"])
-                if stale is not None:
-                    self.store.upsert_branch(
-                        {
-                            "branch_id": stale["branch_id"],
-                            "head_state_id": stale["head_state_id"],
-                            "created_at": stale["created_at"],
-                            "status": "stalled" if self.rng.random() < 0.15 else "active",
-                            "semantic_debt_est": stale["semantic_debt_est"],
-                            "uncertainty": stale["uncertainty"],
-                            "closure_pressure": stale["closure_pressure"],
-                            "chaos_pressure": stale["chaos_pressure"],
-                        }
-                    )
+            reject_streak = 0
+            new_fact_count_current = int(best_meta.get("new_fact_count", 0.0))
+        else:
+            self.runtime.rejected_candidates += 1
+            reject_streak += 1
+            stale = self.branches.get(branch["branch_id"])
+            if stale is not None:
+                self.branches.upsert(
+                    {
+                        "branch_id": stale["branch_id"],
+                        "head_state_id": stale["head_state_id"],
+                        "created_at": stale["created_at"],
+                        "status": "stalled" if self.rng.random() < 0.15 else "active",
+                        "semantic_debt_est": stale["semantic_debt_est"],
+                        "uncertainty": stale["uncertainty"],
+                        "closure_pressure": stale["closure_pressure"],
+                        "chaos_pressure": stale["chaos_pressure"],
+                    }
+                )
 
-            if new_fact_count_current >= 1:
-                self.steps_since_new_fact = 0
-            else:
-                self.steps_since_new_fact += 1
-
-            scene_stagnation_threshold = self._progression_float("scene_stagnation_similarity_threshold", 0.95)
-            branch_states = self.store.list_states(branch_id=branch["branch_id"])
-            if len(branch_states) >= 2:
-                prev_scene = str(branch_states[-2].get("meta_m", {}).get("story_bundle", {}).get("scene", "")).strip() or str(branch_states[-2].get("artifact_x", "")).strip()
-                curr_scene = str(branch_states[-1].get("meta_m", {}).get("story_bundle", {}).get("scene", "")).strip() or str(branch_states[-1].get("artifact_x", "")).strip()
-                scene_sim = self._semantic_similarity(prev_scene, curr_scene)
-                if scene_sim > scene_stagnation_threshold:
-                    self.scene_stagnation_by_branch[branch["branch_id"]] = int(self.scene_stagnation_by_branch.get(branch["branch_id"], 0)) + 1
-                else:
-                    self.scene_stagnation_by_branch[branch["branch_id"]] = 0
+        progress.reject_streak = reject_streak
+        if new_fact_count_current >= 1:
+            progress.steps_since_new_fact = 0
+        else:
+            progress.steps_since_new_fact += 1
+
+        scene_stagnation_threshold = self._progression_float("scene_stagnation_similarity_threshold", 0.95)
+        branch_states = self.contexts.get(branch["branch_id"]).recent_states(2)
+        if len(branch_states) >= 2:
+            prev_scene = str(branch_states[-2].get("meta_m", {}).get("story_bundle", {}).get("scene", "")).strip() or str(branch_states[-2].get("artifact_x", "")).strip()
+            curr_scene = str(branch_states[-1].get("meta_m", {}).get("story_bundle", {}).get("scene", "")).strip() or str(branch_states[-1].get("artifact_x", "")).strip()
+            scene_sim = self._semantic_similarity(prev_scene, curr_scene)
+            if scene_sim > scene_stagnation_threshold:
+                self.scene_stagnation_by_branch[branch["branch_id"]] = int(self.scene_stagnation_by_branch.get(branch["branch_id"], 0)) + 1
             else:
                 self.scene_stagnation_by_branch[branch["branch_id"]] = 0
+        else:
+            self.scene_stagnation_by_branch[branch["branch_id"]] = 0
+        with self.profiler.span("ontological_stagnation"):
             ontological = self._ontological_stagnation(branch["branch_id"])
-            self.ontological_stagnation_score = float(ontological["score"])
-            if self.ontological_stagnation_score >= self._progression_float("stagnation_threshold", 0.66):
-                self.stagnation_streak += 1
-            else:
-                self.stagnation_streak = 0
-
-            verif = self.store.list_verification_results()
-            branches = self.store.list_branches()
-            metrics = compute_metrics(branches, verif, self.runtime)
-            cm = ControllerMetrics(
-                block_interval=1.0,
-                accept_rate=metrics["accept_rate"],
-                fork_rate=metrics["fork_rate"],
-                validator_variance=metrics["validator_variance"],
-                debt_level=metrics["semantic_debt_est"],
-                debt_trend=debt_trend(self.debt_history),
-                novelty_score=float(best_meta.get("novelty_score", 0.5)) if best_meta else 0.5,
-                stability_score=1.0 - min(1.0, metrics["validator_variance"] * 2.0),
-                ontological_stagnation=self.ontological_stagnation_score,
-            )
-            self.controller_state = self.controller.update(step, self.controller_state, cm)
-            self._record_controller_epoch(
-                step,
-                {
-                    **metrics,
-                    "debt_trend": cm.debt_trend,
-                    "stability": cm.stability_score,
-                    "ontological_stagnation": self.ontological_stagnation_score,
-                },
-            )
+        self.ontological_stagnation_score = progress.ontological_stagnation_score = float(ontological["score"])
+        if self.ontological_stagnation_score >= self._progression_float("stagnation_threshold", 0.66):
+            progress.stagnation_streak += 1
+        else:
+            progress.stagnation_streak = 0
+
+        with self.profiler.span("metrics"):
+            metrics = compute_metrics_from_rollup(self.branches.all(), self._metrics_rollup(), self.runtime)
+        cm = ControllerMetrics(
+            block_interval=1.0,
+            accept_rate=metrics["accept_rate"],
+            fork_rate=metrics["fork_rate"],
+            validator_variance=metrics["validator_variance"],
+            debt_level=metrics["semantic_debt_est"],
+            debt_trend=debt_trend(self.debt_history),
+            novelty_score=float(best_meta.get("novelty_score", 0.5)) if best_meta else 0.5,
+            stability_score=1.0 - min(1.0, metrics["validator_variance"] * 2.0),
+            ontological_stagnation=self.ontological_stagnation_score,
+        )
+        self.controller_state = self.controller.update(step, self.controller_state, cm)
+        self._record_controller_epoch(
+            step,
+            {
+                **metrics,
+                "debt_trend": cm.debt_trend,
+                "stability": cm.stability_score,
+                "ontological_stagnation": self.ontological_stagnation_score,
+            },
+        )
 
-            if progress_callback is not None:
-                head_state = self.store.get_branch(branch["branch_id"])
-                head_id = head_state["head_state_id"] if head_state else None
-                head_node = self.store.get_state(head_id) if head_id else None
-                artifact = head_node["artifact_x"] if head_node else ""
-                story_bundle = (head_node or {}).get("meta_m", {}).get("story_bundle", {}) if head_node else {}
-                parent_node = self.store.get_state(head_node.get("parent_state_id")) if head_node and head_node.get("parent_state_id") else None
-                current_progress_text = self._state_fact_text(head_node)
-                parent_progress_text = self._state_fact_text(parent_node)
-                step_similarity = self._semantic_similarity(parent_progress_text, current_progress_text)
-                candidate_artifact = best_any_candidate.artifact_x if best_any_candidate is not None else ""
-                max_facts = max(1, self._progression_int("max_new_facts_per_step", 1))
-                active_anchor_count = len(self._active_anchor_ids(branch["branch_id"], limit=250))
-                progress_callback(
-                    {
-                        "step": step,
-                        "total_steps": total_steps,
-                        "branch_id": branch["branch_id"],
-                        "directive_type": challenge.directive_type,
-                        "accepted": self.runtime.accepted_candidates,
-                        "rejected": self.runtime.rejected_candidates,
-                        "forks": self.runtime.forks_created,
-                        "debt": metrics["semantic_debt_est"],
-                        "variance": metrics["validator_variance"],
-                        "mode": self.controller_state.mode,
-                        "theta": self.controller_state.theta,
-                        "artifact": artifact,
-                        "candidate_artifact": candidate_artifact,
-                        "candidate_score": round(best_any_score, 3) if best_any_score >= 0 else None,
-                        "step_similarity": round(step_similarity, 3),
-                        "new_fact_count": int(new_fact_count_current),
-                        "novel_fact_ratio": round(min(1.0, float(new_fact_count_current) / float(max_facts)), 3),
-                        "semantic_delta_score": round(float(best_any_meta.get("novelty_score", 0.0)), 3),
-                        "stagnation_streak": self.stagnation_streak,
-                        "ontological_stagnation": round(self.ontological_stagnation_score, 3),
-                        "active_anchor_count": active_anchor_count,
-                        "decision_reasons": best_any_reasons,
-                        "decision_reason_codes": best_any_reason_codes,
-                        "decision_reason_details": best_any_reason_details,
-                        "selected_candidate_id": best_any_candidate.candidate_id if best_any_candidate is not None else "",
-                        "selected_fact_object": dict(best_any_candidate.meta_m.get("fact_object", {})) if best_any_candidate is not None and isinstance(best_any_candidate.meta_m.get("fact_object", {}), dict) else {},
-                        "candidate_traces": candidate_traces,
-                        "accepted_via_retry": accepted_via_retry,
-                        "reject_streak": reject_streak,
-                        "escape_mode": bool(challenge.verifier_policy.get("escape_mode", False)),
-                        "scene_stagnation_streak": int(self.scene_stagnation_by_branch.get(branch["branch_id"], 0)),
-                        "projection_fact_ids": list(challenge.verifier_policy.get("last_fact_ids", [])),
-                        "scene": story_bundle.get("scene", ""),
-                        "deferred_tension": story_bundle.get("deferred_tension", ""),
-                    }
-                )
+        self._flush_embeddings()
+        return StepOutcome(
+            step=step,
+            branch_id=branch["branch_id"],
+            challenge=challenge,
+            metrics=metrics,
+            candidate=best_any_candidate,
+            score=best_any_score,
+            signals=best_any_meta,
+            reasons=best_any_reasons,
+            reason_codes=best_any_reason_codes,
+            reason_details=best_any_reason_details,
+            candidate_traces=candidate_traces,
+            new_fact_count=new_fact_count_current,
+            reject_streak=reject_streak,
+            accepted_via_retry=accepted_via_retry,
+            counters=self._step_counters(branch["branch_id"]),
+        )
+
+    def _step_counters(self, branch_id: str) -> dict[str, Any]:
+        # Taken as the step finishes: in a round, later steps move these before the events are built.
+        progress = self._branch_progress(branch_id)
+        return {
+            "accepted": self.runtime.accepted_candidates,
+            "rejected": self.runtime.rejected_candidates,
+            "forks": self.runtime.forks_created,
+            "mode": self.controller_state.mode,
+            "theta": self.controller_state.theta,
+            "stagnation_streak": progress.stagnation_streak,
+            "ontological_stagnation": round(progress.ontological_stagnation_score, 3),
+            "scene_stagnation_streak": int(self.scene_stagnation_by_branch.get(branch_id, 0)),
+        }
+
+    def _progress_event(self, outcome: StepOutcome, total_steps: int, level: int = 2) -> dict[str, Any]:
+        # Built from the step's own results and the counters it captured; nothing here reads the store.
+        challenge = outcome.challenge
+        candidate = outcome.candidate
+        branch_id = outcome.branch_id
+        max_facts = max(1, self._progression_int("max_new_facts_per_step", 1))
+        counters = outcome.counters
+        event: dict[str, Any] = {
+            "step": outcome.step,
+            "total_steps": total_steps,
+            "branch_id": branch_id,
+            "directive_type": challenge.directive_type,
+            "accepted": counters["accepted"],
+            "rejected": counters["rejected"],
+            "forks": counters["forks"],
+            "debt": outcome.metrics["semantic_debt_est"],
+            "variance": outcome.metrics["validator_variance"],
+            "mode": counters["mode"],
+            "theta": counters["theta"],
+            "candidate_score": round(outcome.score, 3) if outcome.score >= 0 else None,
+            "new_fact_count": int(outcome.new_fact_count),
+            "novel_fact_ratio": round(min(1.0, float(outcome.new_fact_count) / float(max_facts)), 3),
+            "semantic_delta_score": round(float(outcome.signals.get("novelty_score", 0.0)), 3),
+            "stagnation_streak": counters["stagnation_streak"],
+            "ontological_stagnation": counters["ontological_stagnation"],
+            "selected_candidate_id": candidate.candidate_id if candidate is not None else "",
+            "accepted_via_retry": outcome.accepted_via_retry,
+            "reject_streak": outcome.reject_streak,
+            "escape_mode": bool(challenge.verifier_policy.get("escape_mode", False)),
+            "scene_stagnation_streak": counters["scene_stagnation_streak"],
+        }
+        if level < 1:
+            return event
 
-        final_metrics = compute_metrics(self.store.list_branches(), self.store.list_verification_results(), self.runtime)
+        states = self.contexts.get(branch_id).states
+        head_node = states[-1] if states else None
+        story_bundle = head_node.get("meta_m", {}).get("story_bundle", {}) if head_node else {}
+        event.update(
+            {
+                "artifact": head_node["artifact_x"] if head_node else "",
+                "candidate_artifact": candidate.artifact_x if candidate is not None else "",
+                "step_similarity": round(self._head_step_similarity(branch_id, head_node), 3),
+                "active_anchor_count": len(self._active_anchor_ids(branch_id, limit=250)),
+                "decision_reasons": outcome.reasons,
+                "decision_reason_codes": outcome.reason_codes,
+                "decision_reason_details": outcome.reason_details,
+                "selected_fact_object": dict(candidate.meta_m.get("fact_object", {})) if candidate is not None and isinstance(candidate.meta_m.get("fact_object", {}), dict) else {},
+                "projection_fact_ids": list(challenge.verifier_policy.get("last_fact_ids", [])),
+                "scene": story_bundle.get("scene", ""),
+                "deferred_tension": story_bundle.get("deferred_tension", ""),
+            }
+        )
+        if level >= 2:
+            event["candidate_traces"] = outcome.candidate_traces
+        return event
+
+    def _head_step_similarity(self, branch_id: str, head_node: Any) -> float:
+        if not head_node:
+            return 0.0
+        head_id = str(head_node["state_id"])
+        cached = self._head_similarity.get(branch_id)
+        if cached is not None and cached[0] == head_id:
+            return cached[1]
+        parent_id = head_node.get("parent_state_id")
+        # A fork's first state has its parent on the branch it forked from.
+        parent_node = self._state_in_context(branch_id, parent_id) if parent_id else None
+        similarity = self._semantic_similarity(self._state_fact_text(parent_node), self._state_fact_text(head_node))
+        self._head_similarity[branch_id] = (head_id, similarity)
+        return similarity
+
+    def _progress_sink(
+        self,
+        progress_callback: Callable[[dict[str, Any]], None] | None,
+        progress_sink: ProgressSink | None,
+    ) -> ProgressSink | None:
+        if progress_callback is not None and progress_sink is not None:
+            raise ValueError("Pass either progress_callback or progress_sink, not both")
+        if progress_callback is not None:
+            progress_sink = CallbackSink(progress_callback, self.config.progress_verbosity)
+        self._trace_candidates = progress_sink is not None and verbosity_level(progress_sink.verbosity) >= 2
+        return progress_sink
+
+    def _maybe_apply_retention(self, step: int) -> None:
+        keep = self.config.retention_keep_steps
+        if keep <= 0 or step % max(1, self.config.retention_interval) != 0:
+            return
+        self.store.apply_retention(RetentionPolicy(keep_last_steps=keep, archive_path=self.config.retention_archive_path))
+
+    def run(
+        self,
+        steps: int | None = None,
+        progress_callback: Callable[[dict[str, Any]], None] | None = None,
+        *,
+        progress_sink: ProgressSink | None = None,
+    ) -> dict[str, Any]:
+        sink = self._progress_sink(progress_callback, progress_sink)
+        level = verbosity_level(sink.verbosity) if sink is not None else 0
+        self._invalidate_caches()
+        self._seed_genesis()
+        # Loaded up front: reading it inside a step would flush the step's writes and hold the write lock.
+        self._metrics_rollup()
+        total_steps = steps or self.config.steps
+        existing_challenges = self.store.count_challenges()
+        for progress in (self.progress, *self.branch_progress.values()):
+            progress.reject_streak = 0
+
+        pipelined = self.config.pipeline_depth > 0
+        if pipelined:
+            self.store.start_write_behind(self.config.pipeline_depth)
+        try:
+            done = 0
+            while done < total_steps:
+                first_step = existing_challenges + done + 1
+                # With branch_concurrency set, one "step" span and profile record cover a whole round.
+                width = min(self.config.branch_concurrency, total_steps - done)
+                self.profiler.begin_step(first_step)
+                snapshot = self._snapshot_state()
+                try:
+                    self._load_fact_indexes()
+                    # Under write-behind, leaving the transaction queues its writes instead of committing them.
+                    with self.profiler.span("step"), self.store.transaction() as txn:
+                        outcomes = self._run_round(first_step, width) if width > 0 else [self._run_step(first_step)]
+                        if not pipelined:
+                            with self.profiler.span("store_flush"):
+                                txn.flush()
+                except BaseException:
+                    # The cached branch rows and contexts may hold writes that were just rolled back.
+                    self._invalidate_caches()
+                    self._restore_state(snapshot)
+                    self.profiler.end_step()
+                    raise
+                for outcome in outcomes:
+                    done += 1
+                    if sink is not None:
+                        with self.profiler.span("progress_event"):
+                            event = self._progress_event(outcome, total_steps, level)
+                        if self.profiler.enabled and outcome is outcomes[-1]:
+                            event["profile"] = self.profiler.step_record()
+                            if done == total_steps:
+                                event["profile"]["summary"] = self.profiler.summary()
+                        # Under write-behind the sink sees the event on the writer, once the step has committed.
+                        self.store.defer(partial(sink.emit, event))
+                    with self.profiler.span("retention"):
+                        self._maybe_apply_retention(outcome.step)
+                self.profiler.end_step()
+        finally:
+            if pipelined:
+                try:
+                    # Drains the queue; a batch that failed to commit surfaces here at the latest.
+                    self.store.stop_write_behind()
+                except BaseException:
+                    self._invalidate_caches()
+                    raise
+
+        # Vectors embedded for the last progress events.
+        self._flush_embeddings()
+        return self._final_metrics()
+
+    def _run_round(self, first_step: int, width: int) -> list[StepOutcome]:
+        # Step phases run here, one step after another in a fixed order, so the caller's thread stays
+        # the only writer; what the steps wait on is answered on the round's worker threads.
+        phases = [self._step_phases(first_step + offset, branch) for offset, branch in enumerate(self._choose_branches(width))]
+        pool = self._pool("branch", self.config.branch_concurrency)
+        outcomes: dict[int, StepOutcome] = {}
+        answers: dict[int, Any] = dict.fromkeys(range(len(phases)))
+        while answers:
+            requests = self._advance_phases(phases, answers, outcomes)
+            futures = {index: pool.submit(self._answer, request, seeded=True) for index, request in requests.items()}
+            answers = {index: future.result() for index, future in futures.items()}
+        return [outcomes[index] for index in sorted(outcomes)]
+
+    def _final_metrics(self) -> dict[str, Any]:
+        final_metrics = compute_metrics_from_rollup(self.branches.all(), self._metrics_rollup(), self.runtime)
         final_metrics["controller"] = {
             "difficulty": self.controller_state.difficulty.as_dict(),
             "mode": self.controller_state.mode,
             "theta": self.controller_state.theta,
             "ontological_stagnation": round(self.ontological_stagnation_score, 3),
         }
+        if self.embedding_cache is not None:
+            final_metrics["embedding_cache"] = self.embedding_cache.stats.as_dict()
+        if self.profiler.enabled:
+            final_metrics["profile"] = self.profiler.summary()
         return final_metrics
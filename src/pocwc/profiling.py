@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from .llm import LLMAdapter
+
+
+class LatencyHistogram:
+    """Log-bucketed latencies (10% wide buckets), so percentiles stay cheap on long runs."""
+
+    _BASE_MS = 0.001
+    _GROWTH = math.log(1.1)
+
+    def __init__(self) -> None:
+        self.buckets: Counter[int] = Counter()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        index = 0 if ms <= self._BASE_MS else int(math.log(ms / self._BASE_MS) / self._GROWTH) + 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q / 100.0 * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Upper edge of the bucket, never above what was actually observed.
+                return min(self.max_ms, self._BASE_MS * math.exp(index * self._GROWTH))
+        return self.max_ms
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class Profiler:
+    """Per-phase spans and counters for SimulationEngine.run.
+
+    Spans nest per thread; each database statement is counted against the innermost open
+    span. With ``trace_path`` set, one JSON line per step is appended to that file.
+    """
+
+    enabled = True
+
+    def __init__(self, trace_path: Path | None = None) -> None:
+        self.trace_path = trace_path
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.counters: Counter[str] = Counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._step: int | None = None
+        self._step_spans: Counter[str] = Counter()
+        self._step_counters: Counter[str] = Counter()
+        self._trace = None
+        if trace_path is not None:
+            trace_path.parent.mkdir(parents=True, exist_ok=True)
+            self._trace = trace_path.open("a", encoding="utf-8")
+
+    def _stack(self) -> list[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        stack = self._stack()
+        stack.append(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            stack.pop()
+            with self._lock:
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = LatencyHistogram()
+                histogram.add(elapsed_ms)
+                if self._step is not None:
+                    self._step_spans[name] += elapsed_ms
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+            if self._step is not None:
+                self._step_counters[name] += n
+
+    def count_statement(self, _sql: str) -> None:
+        self.count("db.statements")
+        stack = self._stack()
+        if stack:
+            self.count(f"db.statements.{stack[-1]}")
+
+    def begin_step(self, step: int) -> None:
+        self._step = step
+        self._step_spans.clear()
+        self._step_counters.clear()
+
+    def step_record(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "step": self._step,
+                "spans_ms": {name: round(ms, 3) for name, ms in self._step_spans.items()},
+                "counters": dict(self._step_counters),
+            }
+
+    def end_step(self) -> dict[str, Any]:
+        record = self.step_record()
+        if self._trace is not None:
+            self._trace.write(json.dumps(record, sort_keys=True) + "\n")
+            self._trace.flush()
+        self._step = None
+        return record
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "spans": {name: histogram.as_dict() for name, histogram in sorted(self.histograms.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def close(self) -> None:
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
+
+
+class NullProfiler:
+    """Drop-in no-op used when profiling is off."""
+
+    enabled = False
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        yield
+
+    def count(self, name: str, n: int = 1) -> None:
+        return None
+
+    def begin_step(self, step: int) -> None:
+        return None
+
+    def end_step(self) -> dict[str, Any]:
+        return {}
+
+    def summary(self) -> dict[str, Any]:
+        return {}
+
+    def close(self) -> None:
+        return None
+
+
+class ProfiledLLMAdapter:
+    """Wraps an LLMAdapter so every call is timed and counted."""
+
+    def __init__(self, adapter: LLMAdapter, profiler: Profiler) -> None:
+        self.adapter = adapter
+        self.profiler = profiler
+
+    def generate_json(self, **kwargs: Any) -> dict[str, Any]:
+        self.profiler.count("llm.generate_json")
+        with self.profiler.span("llm.generate_json"):
+            try:
+                return self.adapter.generate_json(**kwargs)
+            except Exception:
+                self.profiler.count("llm.errors")
+                raise
+
+    def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        self.profiler.count("llm.embed_texts")
+        with self.profiler.span("llm.embed_texts"):
+            try:
+                return self.adapter.embed_texts(texts=texts)
+            except Exception:
+                self.profiler.count("llm.errors")
+                raise
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.adapter, name)
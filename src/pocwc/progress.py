@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Protocol
+
+# Each level adds fields to the one before it:
+#   minimal - counters, controller state, streaks and the step's verdict;
+#   normal  - narrative (head artifact, scene, tension), step similarity, anchors and decision details;
+#   full    - per-candidate screening and scoring traces.
+PROGRESS_VERBOSITY: tuple[str, ...] = ("minimal", "normal", "full")
+
+
+def verbosity_level(verbosity: str) -> int:
+    try:
+        return PROGRESS_VERBOSITY.index(verbosity)
+    except ValueError:
+        raise ValueError(f"Unknown progress verbosity {verbosity!r}; expected one of: {', '.join(PROGRESS_VERBOSITY)}") from None
+
+
+class ProgressSink(Protocol):
+    """Receives one structured event per step, built with the fields of ``verbosity``."""
+
+    verbosity: str
+
+    def emit(self, event: dict[str, Any]) -> None:
+        ...
+
+
+@dataclass(slots=True)
+class CallbackSink:
+    callback: Callable[[dict[str, Any]], None]
+    verbosity: str = "full"
+
+    def emit(self, event: dict[str, Any]) -> None:
+        self.callback(event)
+
+
+class JsonlSink:
+    """Appends each event to ``path`` as one JSON line."""
+
+    def __init__(self, path: Path, verbosity: str = "minimal") -> None:
+        verbosity_level(verbosity)
+        self.path = path
+        self.verbosity = verbosity
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("a", encoding="utf-8")
+
+    def emit(self, event: dict[str, Any]) -> None:
+        self._file.write(json.dumps(event, ensure_ascii=False, sort_keys=True, default=str) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class FanoutSink:
+    """Forwards every event to several sinks; events are built for the most verbose of them."""
+
+    def __init__(self, *sinks: ProgressSink) -> None:
+        if not sinks:
+            raise ValueError("FanoutSink needs at least one sink")
+        self.sinks = sinks
+        self.verbosity = max((sink.verbosity for sink in sinks), key=verbosity_level)
+
+    def emit(self, event: dict[str, Any]) -> None:
+        for sink in self.sinks:
+            sink.emit(event)
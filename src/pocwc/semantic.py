@@ -1,8 +1,33 @@
 from __future__ import annotations
 
+import hashlib
 import math
+import random
 import re
-from typing import Protocol
+import sys
+from functools import lru_cache
+from typing import Any, Protocol, Sequence
+
+try:  # optional: vectorized similarity kernels when installed
+    import numpy
+except ImportError:  # pragma: no cover - exercised only where numpy is missing
+    numpy = None
+
+SIMILARITY_BACKENDS = ("auto", "python", "numpy")
+
+_TOKEN_RE = re.compile(r"[a-zA-Zа-яА-Я0-9]+")
+# Texts compared per step are mostly the same recent facts and narratives as the step before.
+# Anything kept longer than that (e.g. FactIndex rows) stores its own tokens instead.
+TOKEN_CACHE_SIZE = 16384
+
+MINHASH_PERMUTATIONS = 64
+_MINHASH_PRIME = (1 << 61) - 1
+# Fixed coefficients and a stable token hash (not hash(), which is salted per process) keep
+# signatures comparable across runs and worker processes.
+_minhash_rng = random.Random(0x5EED)
+_MINHASH_COEFFS = tuple(
+    (_minhash_rng.randrange(1, _MINHASH_PRIME), _minhash_rng.randrange(0, _MINHASH_PRIME)) for _ in range(MINHASH_PERMUTATIONS)
+)
 
 
 class EmbeddingAdapter(Protocol):
@@ -10,16 +35,47 @@ class EmbeddingAdapter(Protocol):
         ...
 
 
+def scan_tokens(text: str) -> frozenset[str]:
+    """Interned lowercase tokens of ``text``, uncached: for callers that keep the set themselves."""
+    return frozenset(sys.intern(token) for token in _TOKEN_RE.findall(text.lower()))
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def token_set(text: str) -> frozenset[str]:
+    """``scan_tokens`` computed once per distinct text, for texts compared again and again."""
+    return scan_tokens(text)
+
+
 def tokenize(text: str) -> set[str]:
-    return set(re.findall(r"[a-zA-Zа-яА-Я0-9]+", text.lower()))
+    return set(token_set(text))
 
 
-def lexical_jaccard(a: str, b: str) -> float:
-    aa = tokenize(a)
-    bb = tokenize(b)
+def jaccard(aa: frozenset[str] | set[str], bb: frozenset[str] | set[str]) -> float:
     if not aa or not bb:
         return 0.0
-    return len(aa.intersection(bb)) / max(1, len(aa.union(bb)))
+    common = len(aa & bb)
+    return common / max(1, len(aa) + len(bb) - common)
+
+
+def lexical_jaccard(a: str, b: str) -> float:
+    return jaccard(token_set(a), token_set(b))
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _token_minhashes(token: str) -> tuple[int, ...]:
+    h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+    return tuple((a * h + b) % _MINHASH_PRIME for a, b in _MINHASH_COEFFS)
+
+
+def minhash_signature(tokens: frozenset[str] | set[str]) -> tuple[int, ...]:
+    """MinHash signature of a token set (empty for no tokens); callers keep it with the entry it describes.
+
+    Two signatures agree in about ``jaccard(a, b)`` of their slots.
+    """
+    rows = [_token_minhashes(token) for token in tokens]
+    if not rows:
+        return ()
+    return tuple(map(min, *rows)) if len(rows) > 1 else rows[0]
 
 
 def cosine_similarity(a: list[float], b: list[float]) -> float:
@@ -33,6 +89,88 @@ def cosine_similarity(a: list[float], b: list[float]) -> float:
     return dot / (na * nb)
 
 
+def numpy_available() -> bool:
+    return numpy is not None
+
+
+def resolve_similarity_backend(name: str | None) -> str:
+    value = (name or "auto").strip().lower()
+    if value == "auto":
+        return "numpy" if numpy_available() else "python"
+    if value not in SIMILARITY_BACKENDS:
+        raise ValueError(f"Unknown similarity backend: {name}")
+    if value == "numpy" and not numpy_available():
+        raise RuntimeError("numpy similarity backend requested but the numpy package is not installed")
+    return value
+
+
+def unit_rows(vectors: Sequence[float] | Sequence[Sequence[float]]) -> Any:
+    """``vectors`` (one vector or equal-length rows) as float32 unit rows; all-zero rows stay zero. Needs numpy."""
+    array = numpy.asarray(vectors, dtype=numpy.float32)
+    norms = numpy.linalg.norm(array, axis=-1, keepdims=True)
+    return numpy.divide(array, norms, out=numpy.zeros_like(array), where=norms > 0)
+
+
+class EmbeddingMatrix:
+    """Embeddings stacked once so a query can be scored against all of them.
+
+    With the numpy backend the rows are unit-normalized into a float32 array and a query
+    costs one matrix-vector product. The pure-Python backend keeps the rows with their
+    norms and returns exactly ``cosine_similarity(query, row)``. Empty or zero rows, and
+    rows whose dimension differs from the query, score 0.0.
+    """
+
+    def __init__(self, vectors: Sequence[Sequence[float]], *, backend: str = "auto") -> None:
+        self.backend = resolve_similarity_backend(backend)
+        self._size = len(vectors)
+        self._rows: list[Sequence[float]] = []
+        self._norms: list[float] = []
+        self._array = None
+        dims = {len(vector) for vector in vectors}
+        if self.backend == "numpy" and len(dims - {0}) == 1:
+            (self.dim,) = dims - {0}
+            if len(dims) > 1:
+                vectors = [vector if len(vector) else [0.0] * self.dim for vector in vectors]
+            self._array = unit_rows(vectors)
+            return
+        self._rows = [list(vector) for vector in vectors]
+        self._norms = [math.sqrt(sum(x * x for x in row)) for row in self._rows]
+        dims = {len(row) for row, norm in zip(self._rows, self._norms) if norm}
+        self.dim = dims.pop() if len(dims) == 1 else 0
+
+    @classmethod
+    def from_unit_rows(cls, rows: Any) -> EmbeddingMatrix:
+        """Wraps an ``(n, dim)`` array of rows already made by ``unit_rows``, e.g. ones kept by an embedding cache."""
+        matrix = cls([], backend="numpy")
+        matrix._array = rows
+        matrix._size, matrix.dim = rows.shape
+        return matrix
+
+    def __len__(self) -> int:
+        return self._size
+
+    def similarities(self, query: Sequence[float]) -> list[float]:
+        if self._array is not None:
+            if len(query) != self.dim:
+                return [0.0] * self._size
+            return numpy.clip(self._array @ unit_rows(query), -1.0, 1.0).tolist()
+        nq = math.sqrt(sum(x * x for x in query)) if len(query) else 0.0
+        if nq == 0:
+            return [0.0] * self._size
+        sims: list[float] = []
+        for row, nv in zip(self._rows, self._norms):
+            if not nv or len(row) != len(query):
+                sims.append(0.0)
+                continue
+            sims.append(sum(x * y for x, y in zip(query, row)) / (nq * nv))
+        return sims
+
+
+def cosine_similarities(query: list[float], vectors: Sequence[list[float]], *, backend: str = "auto") -> list[float]:
+    """``cosine_similarity(query, v)`` for every ``v``, through an ``EmbeddingMatrix``."""
+    return EmbeddingMatrix(vectors, backend=backend).similarities(query)
+
+
 def semantic_similarity(a: str, b: str, adapter: EmbeddingAdapter | None = None) -> float:
     if not a.strip() or not b.strip():
         return 0.0
@@ -48,3 +186,54 @@ def semantic_similarity(a: str, b: str, adapter: EmbeddingAdapter | None = None)
         except Exception:  # noqa: BLE001
             pass
     return lexical
+
+
+def semantic_similarity_many(
+    query: str, corpus: Sequence[str], adapter: EmbeddingAdapter | None = None, *, backend: str = "auto"
+) -> list[float]:
+    """``semantic_similarity(query, item, adapter)`` for every corpus item.
+
+    Token sets come from the ``token_set`` cache and all distinct texts go to the adapter in one
+    ``embed_texts`` call. With the numpy backend, an adapter that has ``embedding_matrix``
+    (``CachedEmbeddingAdapter``) supplies the corpus matrix instead and only the query is
+    embedded. If the adapter fails, every pair falls back to lexical overlap. With the
+    numpy backend the embedding part is computed in float32, so scores may differ from
+    the pairwise ones in the last digits.
+    """
+    if not query.strip():
+        return [0.0] * len(corpus)
+    query_tokens = token_set(query)
+    scored = [index for index, item in enumerate(corpus) if item.strip()]
+    sims = [0.0] * len(corpus)
+    for index in scored:
+        sims[index] = jaccard(query_tokens, token_set(corpus[index]))
+    if adapter is None or not scored:
+        return sims
+    matrix_for = getattr(adapter, "embedding_matrix", None) if resolve_similarity_backend(backend) == "numpy" else None
+    try:
+        if matrix_for is not None:
+            # Kept by the adapter for the next query over the same corpus.
+            matrix = matrix_for([corpus[index] for index in scored])
+            emb = adapter.embed_texts(texts=[query])
+            if len(emb) != 1:
+                return sims
+            emb_sims = matrix.similarities(emb[0])
+        else:
+            texts = list(dict.fromkeys([query, *(corpus[index] for index in scored)]))
+            emb = adapter.embed_texts(texts=texts)
+            if len(emb) != len(texts):
+                return sims
+            vectors = dict(zip(texts, emb))
+            emb_sims = cosine_similarities(vectors[query], [vectors[corpus[index]] for index in scored], backend=backend)
+    except Exception:  # noqa: BLE001
+        return sims
+    for index, emb_sim in zip(scored, emb_sims):
+        emb_norm = max(0.0, min(1.0, (emb_sim + 1.0) / 2.0))
+        sims[index] = max(0.0, min(1.0, emb_norm * 0.75 + sims[index] * 0.25))
+    return sims
+
+
+def max_similarity(
+    query: str, corpus: Sequence[str], adapter: EmbeddingAdapter | None = None, *, backend: str = "auto"
+) -> float:
+    return max(semantic_similarity_many(query, corpus, adapter, backend=backend), default=0.0)
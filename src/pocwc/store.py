@@ -1,26 +1,423 @@
 ﻿from __future__ import annotations
 
+import hashlib
 import json
+import queue
 import sqlite3
-from contextlib import closing
+import threading
+import zlib
+from collections import Counter
+from collections.abc import Callable, MutableMapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
+
+from .codec import ColumnCodec, decode_text, resolve_codec, train_dictionary
+from .connections import ConnectionManager
+from .metrics import ScoreRollup
+
+
+# Scope of a write that may touch any row: every scoped read has to wait for it.
+ANY_SCOPE = "*"
+
+
+@lru_cache(maxsize=256)
+def _compress_policy_blob(text: str) -> bytes:
+    # Most policy values repeat step to step; skip recompressing them.
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+class LazyRow(MutableMapping):
+    """Row mapping whose JSON columns are decoded on first access and cached."""
+
+    __slots__ = ("_data", "_pending", "_decoders")
+
+    def __init__(
+        self,
+        data: dict[str, Any],
+        json_fields: tuple[str, ...] = (),
+        decoders: dict[str, Callable[[Any], Any]] | None = None,
+    ) -> None:
+        self._data = data
+        self._decoders = decoders or {}
+        self._pending = {field for field in (*json_fields, *self._decoders) if data.get(field)}
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._data[key]
+        if key in self._pending:
+            decoder = self._decoders.get(key, json.loads)
+            value = decoder(value)
+            self._data[key] = value
+            self._pending.discard(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._data[key] = value
+        self._pending.discard(key)
+
+    def __delitem__(self, key: str) -> None:
+        del self._data[key]
+        self._pending.discard(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __repr__(self) -> str:
+        return f"LazyRow({dict(self)!r})"
+
+
+@dataclass(slots=True)
+class RetentionPolicy:
+    keep_last_steps: int = 200
+    archive_path: Path | None = None
+    batch_size: int = 100
+
+
+class UnitOfWork:
+    """Writes buffered on one connection and committed as a single transaction.
+
+    Each write names the scopes it touches (a branch id, ``state:<id>``); see
+    ``WorldStore._write``. Nothing reaches the database, and no write lock is taken,
+    until ``commit`` or a read that needs one of the buffered scopes.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, *, barrier: Callable[[], None] | None = None) -> None:
+        self.conn = conn
+        self._pending: list[tuple[str, list[Any]]] = []
+        # Scopes the buffered writes touch (see WorldStore._write); the write-behind queue keeps them per batch.
+        self.scopes: set[str] = set()
+        # Called before this connection takes the write lock, so queued write-behind batches land first.
+        self._barrier = barrier
+        # Deferred until the unit of work commits; dropped if it rolls back.
+        self._after_commit: list[Callable[[], None]] = []
+
+    def add(self, sql: str, params: Any, scopes: Iterable[str] | None = None) -> None:
+        if self._pending and self._pending[-1][0] == sql:
+            self._pending[-1][1].append(params)
+        else:
+            self._pending.append((sql, [params]))
+        if scopes is None:
+            self.scopes.add(ANY_SCOPE)
+        else:
+            self.scopes.update(scopes)
+
+    def buffers(self, scope: str | None) -> bool:
+        """Whether a read of ``scope`` (None: any row) could see a write that is still buffered."""
+        if not self._pending:
+            return False
+        return scope is None or scope in self.scopes or ANY_SCOPE in self.scopes
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        self._after_commit.append(callback)
+
+    def take_after_commit(self) -> list[Callable[[], None]]:
+        callbacks, self._after_commit = self._after_commit, []
+        return callbacks
+
+    def pending_count(self) -> int:
+        return sum(len(rows) for _, rows in self._pending)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        if not self.conn.in_transaction:
+            if self._barrier is not None:
+                self._barrier()
+            self.conn.execute("BEGIN IMMEDIATE")
+        _execute_batch(self.conn, pending)
+
+    def take_pending(self) -> tuple[list[tuple[str, list[Any]]], frozenset[str]]:
+        pending, self._pending = self._pending, []
+        scopes, self.scopes = frozenset(self.scopes), set()
+        return pending, scopes
+
+    def commit(self) -> None:
+        self.flush()
+        if self.conn.in_transaction:
+            self.conn.execute("COMMIT")
+
+    def rollback(self) -> None:
+        self._pending.clear()
+        self.scopes.clear()
+        self._after_commit.clear()
+        if self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+
+
+def _execute_batch(conn: sqlite3.Connection, pending: list[tuple[str, list[Any]]]) -> None:
+    for sql, rows in pending:
+        if len(rows) == 1:
+            conn.execute(sql, rows[0])
+        else:
+            conn.executemany(sql, rows)
+
+
+class WriteBehind:
+    """Background thread that commits queued write batches in submission order.
+
+    Each batch is the buffered SQL of one ``UnitOfWork`` and commits as one transaction on
+    the writer's own connection, and carries the scopes its writes touch so a read can
+    wait for just the batches that hold its rows (batches commit in order, so that also
+    covers every earlier batch). Callbacks queued with ``defer`` run on the writer once
+    every earlier batch has committed. The queue holds at most ``depth`` items, so a
+    producer that gets ahead of the disk blocks in ``submit``. After a failure the rest of
+    the queue is dropped and the error is raised from the next ``submit`` or ``barrier``.
+    """
+
+    _STOP = object()
+
+    def __init__(self, connections: ConnectionManager, depth: int) -> None:
+        if depth < 1:
+            raise ValueError(f"Write-behind depth must be >= 1, got {depth}")
+        self._connections = connections
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=depth)
+        self._idle = threading.Condition()
+        self._outstanding = 0
+        # Queued batches per scope.
+        self._in_flight: Counter[str] = Counter()
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._drain, name="pocwc-write-behind", daemon=True)
+        self._thread.start()
+
+    def on_writer_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, pending: list[tuple[str, list[Any]]], scopes: Iterable[str] = (ANY_SCOPE,)) -> None:
+        if pending:
+            self._put(("batch", (pending, frozenset(scopes))))
+
+    def defer(self, callback: Callable[[], None]) -> None:
+        self._put(("call", callback))
+
+    def _put(self, item: tuple[str, Any]) -> None:
+        self._raise_error()
+        with self._idle:
+            self._outstanding += 1
+            if item[0] == "batch":
+                self._in_flight.update(item[1][1])
+        self._queue.put(item)
+
+    def barrier(self, scope: str | None = None) -> None:
+        """Waits until everything submitted so far has committed (or run), then re-raises a writer failure.
+
+        With ``scope``, only waits for the batches that touch that scope or ``ANY_SCOPE``.
+        """
+        with self._idle:
+            while self._pending_for(scope):
+                self._idle.wait()
+        self._raise_error()
+
+    def _pending_for(self, scope: str | None) -> int:
+        if scope is None:
+            return self._outstanding
+        return self._in_flight[scope] + self._in_flight[ANY_SCOPE]
+
+    def close(self) -> None:
+        try:
+            self.barrier()
+        finally:
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _drain(self) -> None:
+        with self._connections.connection() as conn:
+            while True:
+                item = self._queue.get()
+                if item is self._STOP:
+                    return
+                kind, payload = item
+                try:
+                    if self._error is None:
+                        if kind == "batch":
+                            conn.execute("BEGIN IMMEDIATE")
+                            try:
+                                _execute_batch(conn, payload[0])
+                                conn.execute("COMMIT")
+                            except BaseException:
+                                conn.execute("ROLLBACK")
+                                raise
+                        else:
+                            payload()
+                except BaseException as exc:  # noqa: BLE001
+                    self._error = exc
+                finally:
+                    with self._idle:
+                        self._outstanding -= 1
+                        if kind == "batch":
+                            self._in_flight.subtract(payload[1])
+                            self._in_flight += Counter()
+                        self._idle.notify_all()
 
 
 class WorldStore:
-    def __init__(self, db_path: Path) -> None:
+    _MIGRATIONS: tuple[tuple[int, str], ...] = (
+        (1, "_migrate_branch_fact_columns"),
+        (2, "_migrate_hot_path_indexes"),
+        (3, "_migrate_keyset_indexes"),
+        (4, "_migrate_metrics_rollup"),
+        (5, "_migrate_policy_blobs"),
+        (6, "_migrate_codec_dictionaries"),
+        (7, "_migrate_candidate_summaries"),
+        (8, "_migrate_embedding_cache"),
+    )
+    # Columns that may hold ColumnCodec blobs instead of text.
+    _COMPRESSED_COLUMNS: dict[str, tuple[str, ...]] = {
+        "states": ("artifact_x", "meta_m"),
+        "candidates": ("artifact_x", "meta_m"),
+    }
+    # verifier_policy values whose JSON reaches this size get a policy_blobs entry of their own.
+    _POLICY_BLOB_MIN_BYTES = 128
+    _VERIFICATION_COLUMNS: tuple[str, ...] = (
+        "id",
+        "candidate_id",
+        "verifier_id",
+        "level_max_reached",
+        "verdict",
+        "score",
+        "signals",
+        "notes",
+        "created_at",
+    )
+
+    def __init__(self, db_path: Path, *, pool_size: int = 0, compression: str | None = None) -> None:
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._discard_orphaned_sidecars()
+        self._connections = ConnectionManager(db_path, pool_size=pool_size)
+        self._local = threading.local()
+        self._write_behind: WriteBehind | None = None
+        self._table_columns: dict[str, set[str]] = {}
+        self._policy_blob_text = lru_cache(maxsize=1024)(self._load_policy_blob_text)
         self._init_db()
+        self._dictionaries: dict[int, bytes] = {}
+        self._column_codec: ColumnCodec | None = None
+        self._load_dictionaries()
+        self.set_compression(compression)
+
+    def _discard_orphaned_sidecars(self) -> None:
+        # A WAL left behind by a deleted database would be replayed into the new file.
+        if self.db_path.exists():
+            return
+        for suffix in ("-wal", "-shm"):
+            sidecar = self.db_path.with_name(self.db_path.name + suffix)
+            if sidecar.exists():
+                sidecar.unlink()
+
+    def start_write_behind(self, depth: int) -> None:
+        """Commits later transactions on a background thread, at most ``depth`` of them queued.
+
+        Reads made outside the writer wait until the queued transactions that touch what they
+        read have committed (all of them for reads without a scope), so callers keep seeing
+        their own writes. ``stop_write_behind`` drains the queue.
+        """
+        if self._write_behind is not None:
+            raise RuntimeError("Write-behind is already running")
+        self._write_behind = WriteBehind(self._connections, depth)
+
+    def stop_write_behind(self) -> None:
+        writer, self._write_behind = self._write_behind, None
+        if writer is not None:
+            writer.close()
+
+    def defer(self, callback: Callable[[], None]) -> None:
+        """Runs ``callback`` once everything written so far has committed; on the writer thread under write-behind.
+
+        Inside a ``transaction()`` that includes the transaction's own writes: the callback
+        waits for it to commit and is dropped if it rolls back.
+        """
+        txn = getattr(self._local, "txn", None)
+        if txn is not None:
+            txn.after_commit(callback)
+        elif self._write_behind is None:
+            callback()
+        else:
+            self._write_behind.defer(callback)
 
-    def _conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.isolation_level = None
-        conn.row_factory = sqlite3.Row
-        return conn
+    def _write_barrier(self, scope: str | None = None) -> None:
+        writer = self._write_behind
+        if writer is not None and not writer.on_writer_thread():
+            writer.barrier(scope)
+
+    @contextmanager
+    def _conn(self, scope: str | None = None) -> Iterator[sqlite3.Connection]:
+        # ``scope`` names the rows the read depends on (a branch id or ``state:<id>``); None means any row.
+        self._write_barrier(scope)
+        txn = getattr(self._local, "txn", None)
+        if txn is not None:
+            # Reads inside a unit of work must see its buffered writes. Flushing takes the write
+            # lock until the step commits, so it only happens when a buffered write is relevant.
+            if txn.buffers(scope):
+                txn.flush()
+            yield txn.conn
+            return
+        with self._connections.connection() as conn:
+            yield conn
+
+    def _write(self, sql: str, params: Any, scopes: Iterable[str] | None = None) -> None:
+        """Runs or buffers one write.
+
+        ``scopes`` lists every scope a scoped read could find this row under; None means
+        the write may touch any row. Rows that no scoped read looks at pass ``()``.
+        """
+        txn = getattr(self._local, "txn", None)
+        if txn is not None:
+            txn.add(sql, params, scopes)
+            return
+        self._write_barrier()
+        with self._connections.connection() as conn:
+            conn.execute(sql, params)
+
+    @contextmanager
+    def transaction(self) -> Iterator[UnitOfWork]:
+        current = getattr(self._local, "txn", None)
+        if current is not None:
+            yield current
+            return
+        with self._connections.connection() as conn:
+            txn = UnitOfWork(conn, barrier=self._write_barrier)
+            self._local.txn = txn
+            try:
+                yield txn
+                writer = self._write_behind
+                if writer is not None and not conn.in_transaction:
+                    writer.submit(*txn.take_pending())
+                else:
+                    # Already holding the write lock (a read flushed the buffer), so commit in place.
+                    txn.commit()
+            except BaseException:
+                txn.rollback()
+                raise
+            finally:
+                self._local.txn = None
+        for callback in txn.take_after_commit():
+            self.defer(callback)
+
+    def close(self) -> None:
+        try:
+            self.stop_write_behind()
+        finally:
+            self._connections.close()
+
+    def set_trace_callback(self, callback: Callable[[str], None] | None) -> None:
+        self._connections.set_trace_callback(callback)
 
     def _init_db(self) -> None:
-        with closing(self._conn()) as conn:
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.executescript(
                 """
                 CREATE TABLE IF NOT EXISTS branches (
@@ -131,7 +528,26 @@ class WorldStore:
                 );
                 """
             )
-            self._migrate_branch_fact_columns(conn)
+            self._apply_migrations(conn)
+
+    def schema_version(self) -> int:
+        with self._conn() as conn:
+            return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+    def _apply_migrations(self, conn: sqlite3.Connection) -> None:
+        for target, name in self._MIGRATIONS:
+            if int(conn.execute("PRAGMA user_version").fetchone()[0]) >= target:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have migrated while we waited for the write lock.
+                if int(conn.execute("PRAGMA user_version").fetchone()[0]) < target:
+                    getattr(self, name)(conn)
+                    conn.execute(f"PRAGMA user_version={int(target)}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
 
     def _migrate_branch_fact_columns(self, conn: sqlite3.Connection) -> None:
         columns = {str(row[1]) for row in conn.execute("PRAGMA table_info(branch_facts)").fetchall()}
@@ -145,108 +561,602 @@ class WorldStore:
             if column not in columns:
                 conn.execute(f"ALTER TABLE branch_facts ADD COLUMN {column} {ddl}")
 
-    def upsert_branch(self, branch: dict[str, Any]) -> None:
-        with closing(self._conn()) as conn:
+    def _migrate_hot_path_indexes(self, conn: sqlite3.Connection) -> None:
+        # Implicit rowid suffixes keep `ORDER BY id` index-ordered for branch_facts and verification_results.
+        for ddl in (
+            "CREATE INDEX IF NOT EXISTS idx_states_branch_height ON states(branch_id, height)",
+            "CREATE INDEX IF NOT EXISTS idx_challenges_branch_created ON challenges(branch_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_candidates_challenge_created ON candidates(challenge_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_verification_results_candidate ON verification_results(candidate_id)",
+            "CREATE INDEX IF NOT EXISTS idx_branch_facts_branch ON branch_facts(branch_id)",
+            "CREATE INDEX IF NOT EXISTS idx_branch_facts_branch_fact ON branch_facts(branch_id, fact_id)",
+            "CREATE INDEX IF NOT EXISTS idx_story_events_branch_height ON story_events(branch_id, height)",
+        ):
+            conn.execute(ddl)
+
+    def _migrate_keyset_indexes(self, conn: sqlite3.Connection) -> None:
+        for ddl in (
+            "CREATE INDEX IF NOT EXISTS idx_states_created ON states(created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_challenges_created ON challenges(created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_candidates_created ON candidates(created_at)",
+        ):
+            conn.execute(ddl)
+
+    def _migrate_metrics_rollup(self, conn: sqlite3.Connection) -> None:
+        # Maintained by trigger so every verification insert updates the rollup in the same transaction.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS metrics_rollup (
+                scope TEXT PRIMARY KEY,
+                count INTEGER NOT NULL,
+                mean REAL NOT NULL,
+                m2 REAL NOT NULL,
+                updated_at TEXT
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS metrics_reject_levels (
+                level TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            )
+            """
+        )
+        rollup = ScoreRollup()
+        updated_at = None
+        for row in conn.execute("SELECT score, verdict, level_max_reached, created_at FROM verification_results ORDER BY id ASC"):
+            rollup.add(float(row[0]), str(row[1]), str(row[2]))
+            updated_at = row[3]
+        conn.execute(
+            "INSERT OR REPLACE INTO metrics_rollup(scope, count, mean, m2, updated_at) VALUES ('global', ?, ?, ?, ?)",
+            (rollup.count, rollup.mean, rollup.m2, updated_at),
+        )
+        conn.execute("DELETE FROM metrics_reject_levels")
+        conn.executemany(
+            "INSERT INTO metrics_reject_levels(level, count) VALUES (?, ?)",
+            list(rollup.reject_by_level.items()),
+        )
+        # UPDATE right-hand sides see pre-update values, so this is the Welford step from ScoreRollup.add.
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_verification_results_rollup
+            AFTER INSERT ON verification_results
+            BEGIN
+                UPDATE metrics_rollup SET
+                    count = count + 1,
+                    mean = mean + (NEW.score - mean) / (count + 1),
+                    m2 = m2 + (NEW.score - mean) * (NEW.score - (mean + (NEW.score - mean) / (count + 1))),
+                    updated_at = NEW.created_at
+                WHERE scope = 'global';
+                INSERT INTO metrics_reject_levels(level, count)
+                SELECT NEW.level_max_reached, 1 WHERE NEW.verdict = 'reject'
+                ON CONFLICT(level) DO UPDATE SET count = count + 1;
+            END
+            """
+        )
+
+    def _migrate_policy_blobs(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS policy_blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        columns = {str(row[1]) for row in conn.execute("PRAGMA table_info(challenges)").fetchall()}
+        if "policy_refs" not in columns:
+            conn.execute("ALTER TABLE challenges ADD COLUMN policy_refs TEXT NOT NULL DEFAULT '{}'")
+
+    def _migrate_codec_dictionaries(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS codec_dictionaries (
+                dict_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                codec TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+
+    def _migrate_candidate_summaries(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS candidate_summaries (
+                challenge_id TEXT PRIMARY KEY,
+                rejected_candidates INTEGER NOT NULL,
+                status_counts TEXT NOT NULL,
+                prover_ids TEXT NOT NULL,
+                verification_rows INTEGER NOT NULL,
+                score_sum REAL NOT NULL,
+                score_max REAL,
+                reject_by_level TEXT NOT NULL,
+                archived INTEGER NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+
+    def _migrate_embedding_cache(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                model TEXT NOT NULL,
+                text_sha TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (model, text_sha)
+            ) WITHOUT ROWID
+            """
+        )
+
+    def _load_dictionaries(self) -> None:
+        with self._conn() as conn:
+            rows = conn.execute("SELECT dict_id, payload FROM codec_dictionaries").fetchall()
+        self._dictionaries = {int(r["dict_id"]): bytes(r["payload"]) for r in rows}
+
+    def compression(self) -> str | None:
+        return self._column_codec.codec if self._column_codec else None
+
+    def set_compression(self, compression: str | None) -> None:
+        codec = resolve_codec(compression)
+        if codec is None:
+            self._column_codec = None
+            return
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT dict_id, payload FROM codec_dictionaries WHERE codec=? ORDER BY dict_id DESC LIMIT 1",
+                (codec,),
+            ).fetchone()
+        if row is None:
+            self._column_codec = ColumnCodec(codec)
+        else:
+            self._column_codec = ColumnCodec(codec, dictionary=bytes(row["payload"]), dict_id=int(row["dict_id"]))
+
+    def train_dictionary(self, compression: str | None = None, *, sample_rows: int = 2000) -> int | None:
+        codec = resolve_codec(compression) or self.compression()
+        if codec is None:
+            return None
+        samples: list[str] = []
+        for table, columns in self._COMPRESSED_COLUMNS.items():
+            with self._conn() as conn:
+                rows = conn.execute(
+                    f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid DESC LIMIT ?",
+                    (sample_rows,),
+                ).fetchall()
+            for row in rows:
+                samples.extend(self._decode_column(row[col]) or "" for col in columns)
+        dictionary = train_dictionary(codec, samples)
+        if not dictionary:
+            return None
+        with self.transaction(), self._conn() as conn:
+            cursor = conn.execute(
+                "INSERT INTO codec_dictionaries(codec, payload, created_at) VALUES(?, ?, ?)",
+                (codec, dictionary, datetime.now(timezone.utc).isoformat()),
+            )
+            dict_id = int(cursor.lastrowid)
+        self._dictionaries[dict_id] = dictionary
+        if self.compression() == codec:
+            self._column_codec = ColumnCodec(codec, dictionary=dictionary, dict_id=dict_id)
+        return dict_id
+
+    def compact(
+        self,
+        compression: str | None = "auto",
+        *,
+        train: bool = True,
+        batch_size: int = 500,
+        vacuum: bool = False,
+    ) -> dict[str, Any]:
+        """Re-encode every compressible column with ``compression`` (``"none"`` decompresses)."""
+        codec = resolve_codec(compression)
+        previous = self.compression()
+        bytes_before = self._compressed_bytes()
+        dict_id = None
+        self.set_compression(codec)
+        try:
+            if codec is not None and train:
+                dict_id = self.train_dictionary(codec)
+            rewritten = 0
+            for table, columns in self._COMPRESSED_COLUMNS.items():
+                rewritten += self._recompress_table(table, columns, batch_size)
+        finally:
+            self.set_compression(previous)
+        with self._conn() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            if vacuum:
+                conn.execute("VACUUM")
+        return {
+            "compression": codec or "none",
+            "dict_id": dict_id,
+            "rows_rewritten": rewritten,
+            "bytes_before": bytes_before,
+            "bytes_after": self._compressed_bytes(),
+        }
+
+    def _recompress_table(self, table: str, columns: tuple[str, ...], batch_size: int) -> int:
+        rewritten = 0
+        last_rowid = 0
+        while True:
+            # One short transaction per batch keeps the database usable by a running engine.
+            with self.transaction():
+                with self._conn() as conn:
+                    rows = conn.execute(
+                        f"SELECT rowid, {', '.join(columns)} FROM {table} WHERE rowid > ? ORDER BY rowid ASC LIMIT ?",
+                        (last_rowid, batch_size),
+                    ).fetchall()
+                for row in rows:
+                    values = [row[col] for col in columns]
+                    encoded = [self._encode_column(self._decode_column(value)) for value in values]
+                    if encoded != values:
+                        assignments = ", ".join(f"{col}=?" for col in columns)
+                        self._write(f"UPDATE {table} SET {assignments} WHERE rowid=?", (*encoded, row["rowid"]))
+                        rewritten += 1
+            if len(rows) < batch_size:
+                return rewritten
+            last_rowid = int(rows[-1]["rowid"])
+
+    def _compressed_bytes(self) -> int:
+        total = 0
+        with self._conn() as conn:
+            for table, columns in self._COMPRESSED_COLUMNS.items():
+                expr = " + ".join(f"COALESCE(SUM(length(CAST({col} AS BLOB))), 0)" for col in columns)
+                total += int(conn.execute(f"SELECT {expr} FROM {table}").fetchone()[0])
+        return total
+
+    def _encode_column(self, text: str | None) -> str | bytes | None:
+        if text is None or self._column_codec is None:
+            return text
+        return self._column_codec.encode(text)
+
+    def _decode_column(self, value: str | bytes | None) -> str | None:
+        try:
+            return decode_text(value, self._dictionaries)
+        except KeyError:
+            # Dictionary trained by another process (e.g. a compact run) after we loaded ours.
+            self._load_dictionaries()
+            return decode_text(value, self._dictionaries)
+
+    def _decode_json_column(self, value: str | bytes) -> Any:
+        return json.loads(self._decode_column(value))
+
+    def apply_retention(self, policy: RetentionPolicy) -> dict[str, Any]:
+        """Summarize and drop (or archive) non-accepted candidates of all but the newest steps."""
+        keep = int(policy.keep_last_steps)
+        if keep < 1:
+            # 0 would retire every step; callers that mean "keep everything" skip the call instead.
+            raise ValueError(f"keep_last_steps must be >= 1, got {keep}")
+        if getattr(self._local, "txn", None) is not None:
+            raise RuntimeError("apply_retention must run outside a transaction")
+        self._write_barrier()
+        report = {"challenges_summarized": 0, "candidates_removed": 0, "verification_rows_removed": 0}
+        with self._connections.connection() as conn:
+            cutoff = conn.execute(
+                "SELECT created_at, rowid FROM challenges ORDER BY created_at DESC, rowid DESC LIMIT 1 OFFSET ?",
+                (keep - 1,),
+            ).fetchone()
+            if cutoff is None:
+                return report
+            archive = policy.archive_path is not None
+            if archive:
+                self._attach_archive(conn, Path(policy.archive_path))
+            try:
+                while True:
+                    # Short write transactions so a live engine only waits for one batch.
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        ids = self._cold_challenge_ids(conn, cutoff, max(1, int(policy.batch_size)))
+                        if ids:
+                            batch = self._retire_candidates(conn, ids, archive)
+                            for key, value in batch.items():
+                                report[key] += value
+                        conn.execute("COMMIT")
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+                    if not ids:
+                        break
+            finally:
+                if archive:
+                    conn.execute("DETACH DATABASE archive")
+        return report
+
+    def _attach_archive(self, conn: sqlite3.Connection, archive_path: Path) -> None:
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        conn.execute("ATTACH DATABASE ? AS archive", (str(archive_path),))
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS archive.candidates (
+                candidate_id TEXT PRIMARY KEY,
+                challenge_id TEXT NOT NULL,
+                prover_id TEXT NOT NULL,
+                artifact_x TEXT NOT NULL,
+                meta_m TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS archive.verification_results (
+                id INTEGER PRIMARY KEY,
+                candidate_id TEXT NOT NULL,
+                verifier_id TEXT NOT NULL,
+                level_max_reached TEXT NOT NULL,
+                verdict TEXT NOT NULL,
+                score REAL NOT NULL,
+                signals TEXT NOT NULL,
+                notes TEXT,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS archive.codec_dictionaries (
+                dict_id INTEGER PRIMARY KEY,
+                codec TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS archive.idx_archive_candidates_challenge ON candidates(challenge_id);
+            CREATE INDEX IF NOT EXISTS archive.idx_archive_verification_candidate ON verification_results(candidate_id);
+            -- Archived rows may be compressed with this world's dictionaries.
+            INSERT OR IGNORE INTO archive.codec_dictionaries SELECT dict_id, codec, payload, created_at FROM main.codec_dictionaries;
+            """
+        )
+
+    @staticmethod
+    def _cold_challenge_ids(conn: sqlite3.Connection, cutoff: sqlite3.Row, limit: int) -> list[str]:
+        # A candidate_summaries row marks a challenge as already retired.
+        rows = conn.execute(
+            """
+            SELECT ch.challenge_id FROM challenges ch
+            WHERE NOT EXISTS (SELECT 1 FROM candidate_summaries s WHERE s.challenge_id = ch.challenge_id)
+              AND (ch.created_at, ch.rowid) < (?, ?)
+            ORDER BY ch.created_at ASC, ch.rowid ASC LIMIT ?
+            """,
+            (cutoff[0], cutoff[1], limit),
+        ).fetchall()
+        return [str(r[0]) for r in rows]
+
+    def _retire_candidates(self, conn: sqlite3.Connection, challenge_ids: list[str], archive: bool) -> dict[str, int]:
+        marks = ", ".join("?" for _ in challenge_ids)
+        candidates = conn.execute(
+            f"SELECT candidate_id, challenge_id, prover_id, status FROM candidates WHERE challenge_id IN ({marks}) AND status != 'accept'",
+            challenge_ids,
+        ).fetchall()
+        candidate_ids = [str(r["candidate_id"]) for r in candidates]
+        cmarks = ", ".join("?" for _ in candidate_ids)
+        results = (
             conn.execute(
-                """
-                INSERT INTO branches(branch_id, head_state_id, created_at, status, semantic_debt_est, uncertainty, closure_pressure, chaos_pressure)
-                VALUES(:branch_id, :head_state_id, :created_at, :status, :semantic_debt_est, :uncertainty, :closure_pressure, :chaos_pressure)
-                ON CONFLICT(branch_id) DO UPDATE SET
-                  head_state_id=excluded.head_state_id,
-                  status=excluded.status,
-                  semantic_debt_est=excluded.semantic_debt_est,
-                  uncertainty=excluded.uncertainty,
-                  closure_pressure=excluded.closure_pressure,
-                  chaos_pressure=excluded.chaos_pressure
-                """,
-                branch,
+                f"SELECT candidate_id, verdict, level_max_reached, score FROM verification_results WHERE candidate_id IN ({cmarks})",
+                candidate_ids,
+            ).fetchall()
+            if candidate_ids
+            else []
+        )
+        summaries: dict[str, dict[str, Any]] = {
+            cid: {
+                "rejected_candidates": 0,
+                "status_counts": {},
+                "prover_ids": [],
+                "verification_rows": 0,
+                "score_sum": 0.0,
+                "score_max": None,
+                "reject_by_level": {},
+            }
+            for cid in challenge_ids
+        }
+        challenge_of: dict[str, str] = {}
+        for row in candidates:
+            summary = summaries[str(row["challenge_id"])]
+            challenge_of[str(row["candidate_id"])] = str(row["challenge_id"])
+            summary["rejected_candidates"] += 1
+            status = str(row["status"])
+            summary["status_counts"][status] = summary["status_counts"].get(status, 0) + 1
+            summary["prover_ids"].append(str(row["prover_id"]))
+        for row in results:
+            summary = summaries[challenge_of[str(row["candidate_id"])]]
+            score = float(row["score"])
+            summary["verification_rows"] += 1
+            summary["score_sum"] += score
+            summary["score_max"] = score if summary["score_max"] is None else max(summary["score_max"], score)
+            if row["verdict"] == "reject":
+                level = str(row["level_max_reached"])
+                summary["reject_by_level"][level] = summary["reject_by_level"].get(level, 0) + 1
+        created_at = datetime.now(timezone.utc).isoformat()
+        conn.executemany(
+            """
+            INSERT INTO candidate_summaries(
+                challenge_id, rejected_candidates, status_counts, prover_ids, verification_rows,
+                score_sum, score_max, reject_by_level, archived, created_at
             )
+            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    cid,
+                    summary["rejected_candidates"],
+                    json.dumps(summary["status_counts"], ensure_ascii=False),
+                    json.dumps(summary["prover_ids"], ensure_ascii=False),
+                    summary["verification_rows"],
+                    summary["score_sum"],
+                    summary["score_max"],
+                    json.dumps(summary["reject_by_level"], ensure_ascii=False),
+                    1 if archive else 0,
+                    created_at,
+                )
+                for cid, summary in summaries.items()
+            ],
+        )
+        if candidate_ids:
+            if archive:
+                # OR IGNORE keeps a retried batch idempotent: archive and main commit separately under WAL.
+                conn.execute(
+                    f"INSERT OR IGNORE INTO archive.candidates SELECT candidate_id, challenge_id, prover_id, artifact_x, meta_m, status, created_at "
+                    f"FROM main.candidates WHERE candidate_id IN ({cmarks})",
+                    candidate_ids,
+                )
+                conn.execute(
+                    f"INSERT OR IGNORE INTO archive.verification_results SELECT id, candidate_id, verifier_id, level_max_reached, verdict, score, signals, notes, created_at "
+                    f"FROM main.verification_results WHERE candidate_id IN ({cmarks})",
+                    candidate_ids,
+                )
+            conn.execute(f"DELETE FROM main.verification_results WHERE candidate_id IN ({cmarks})", candidate_ids)
+            conn.execute(f"DELETE FROM main.candidates WHERE candidate_id IN ({cmarks})", candidate_ids)
+        return {
+            "challenges_summarized": len(challenge_ids),
+            "candidates_removed": len(candidate_ids),
+            "verification_rows_removed": len(results),
+        }
+
+    def get_candidate_summary(self, challenge_id: str) -> LazyRow | None:
+        with self._conn() as conn:
+            row = conn.execute("SELECT * FROM candidate_summaries WHERE challenge_id=?", (challenge_id,)).fetchone()
+        return self._decode_row(row, ("status_counts", "prover_ids", "reject_by_level")) if row else None
+
+    def upsert_branch(self, branch: dict[str, Any]) -> None:
+        self._write(
+            """
+            INSERT INTO branches(branch_id, head_state_id, created_at, status, semantic_debt_est, uncertainty, closure_pressure, chaos_pressure)
+            VALUES(:branch_id, :head_state_id, :created_at, :status, :semantic_debt_est, :uncertainty, :closure_pressure, :chaos_pressure)
+            ON CONFLICT(branch_id) DO UPDATE SET
+              head_state_id=excluded.head_state_id,
+              status=excluded.status,
+              semantic_debt_est=excluded.semantic_debt_est,
+              uncertainty=excluded.uncertainty,
+              closure_pressure=excluded.closure_pressure,
+              chaos_pressure=excluded.chaos_pressure
+            """,
+            dict(branch),
+            (branch["branch_id"],),
+        )
 
     def insert_state(self, state: dict[str, Any]) -> None:
         payload = dict(state)
-        payload["meta_m"] = json.dumps(payload["meta_m"], ensure_ascii=False)
+        payload["meta_m"] = self._encode_column(json.dumps(payload["meta_m"], ensure_ascii=False))
+        payload["artifact_x"] = self._encode_column(payload["artifact_x"])
         payload["acceptance_summary"] = json.dumps(payload["acceptance_summary"], ensure_ascii=False)
-        with closing(self._conn()) as conn:
-            conn.execute(
-                """
-                INSERT INTO states(state_id, branch_id, parent_state_id, height, artifact_x, meta_m, challenge_ref, acceptance_summary, created_at)
-                VALUES(:state_id, :branch_id, :parent_state_id, :height, :artifact_x, :meta_m, :challenge_ref, :acceptance_summary, :created_at)
-                """,
-                payload,
-            )
+        self._write(
+            """
+            INSERT INTO states(state_id, branch_id, parent_state_id, height, artifact_x, meta_m, challenge_ref, acceptance_summary, created_at)
+            VALUES(:state_id, :branch_id, :parent_state_id, :height, :artifact_x, :meta_m, :challenge_ref, :acceptance_summary, :created_at)
+            """,
+            payload,
+            (payload["branch_id"], f"state:{payload['state_id']}"),
+        )
 
     def insert_challenge(self, challenge: dict[str, Any]) -> None:
         payload = dict(challenge)
         payload["difficulty_params"] = json.dumps(payload["difficulty_params"], ensure_ascii=False)
-        payload["verifier_policy"] = json.dumps(payload["verifier_policy"], ensure_ascii=False)
-        with closing(self._conn()) as conn:
-            conn.execute(
-                """
-                INSERT INTO challenges(challenge_id, branch_id, parent_state_id, projection, directive_type, difficulty_params, verifier_policy, created_at)
-                VALUES(:challenge_id, :branch_id, :parent_state_id, :projection, :directive_type, :difficulty_params, :verifier_policy, :created_at)
-                """,
-                payload,
-            )
+        core: dict[str, Any] = {}
+        refs: dict[str, str] = {}
+        for key, value in payload["verifier_policy"].items():
+            text = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+            if len(text) < self._POLICY_BLOB_MIN_BYTES:
+                core[key] = value
+            else:
+                refs[key] = self._put_policy_blob(text, payload["created_at"])
+        # Small values travel together as one blob, stored under the reserved "*" ref.
+        refs["*"] = self._put_policy_blob(json.dumps(core, ensure_ascii=False, separators=(",", ":")), payload["created_at"])
+        payload["verifier_policy"] = "{}"
+        payload["policy_refs"] = json.dumps(refs, ensure_ascii=False, separators=(",", ":"))
+        self._write(
+            """
+            INSERT INTO challenges(challenge_id, branch_id, parent_state_id, projection, directive_type, difficulty_params, verifier_policy, policy_refs, created_at)
+            VALUES(:challenge_id, :branch_id, :parent_state_id, :projection, :directive_type, :difficulty_params, :verifier_policy, :policy_refs, :created_at)
+            """,
+            payload,
+            (payload["branch_id"],),
+        )
+
+    def _put_policy_blob(self, text: str, created_at: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+        self._write(
+            "INSERT OR IGNORE INTO policy_blobs(hash, codec, payload, created_at) VALUES(?, ?, ?, ?)",
+            (digest, "zlib", _compress_policy_blob(text), created_at),
+            # Read only through the challenge that references it, which is written after it.
+            (),
+        )
+        return digest
+
+    def _load_policy_blob_text(self, digest: str) -> str:
+        # Content-addressed, so a cached text can never go stale.
+        with self._conn() as conn:
+            row = conn.execute("SELECT codec, payload FROM policy_blobs WHERE hash=?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"policy blob not found: {digest}")
+        if row["codec"] != "zlib":
+            raise ValueError(f"Unsupported policy blob codec: {row['codec']}")
+        return zlib.decompress(row["payload"]).decode("utf-8")
+
+    def _decode_verifier_policy(self, raw: str, refs_raw: str | None) -> dict[str, Any]:
+        policy = json.loads(raw) if raw else {}
+        for key, digest in (json.loads(refs_raw) if refs_raw else {}).items():
+            value = json.loads(self._policy_blob_text(digest))
+            if key == "*":
+                policy.update(value)
+            else:
+                policy[key] = value
+        return policy
 
     def insert_candidate(self, candidate: dict[str, Any]) -> None:
         payload = dict(candidate)
-        payload["meta_m"] = json.dumps(payload["meta_m"], ensure_ascii=False)
-        with closing(self._conn()) as conn:
-            conn.execute(
-                """
-                INSERT INTO candidates(candidate_id, challenge_id, prover_id, artifact_x, meta_m, status, created_at)
-                VALUES(:candidate_id, :challenge_id, :prover_id, :artifact_x, :meta_m, :status, :created_at)
-                """,
-                payload,
-            )
+        payload["meta_m"] = self._encode_column(json.dumps(payload["meta_m"], ensure_ascii=False))
+        payload["artifact_x"] = self._encode_column(payload["artifact_x"])
+        self._write(
+            """
+            INSERT INTO candidates(candidate_id, challenge_id, prover_id, artifact_x, meta_m, status, created_at)
+            VALUES(:candidate_id, :challenge_id, :prover_id, :artifact_x, :meta_m, :status, :created_at)
+            """,
+            payload,
+            (),
+        )
 
     def update_candidate_status(self, candidate_id: str, status: str) -> None:
-        with closing(self._conn()) as conn:
-            conn.execute("UPDATE candidates SET status=? WHERE candidate_id=?", (status, candidate_id))
+        self._write("UPDATE candidates SET status=? WHERE candidate_id=?", (status, candidate_id), ())
 
     def insert_verification_result(self, result: dict[str, Any]) -> None:
         payload = dict(result)
         payload["signals"] = json.dumps(payload["signals"], ensure_ascii=False)
-        with closing(self._conn()) as conn:
-            conn.execute(
-                """
-                INSERT INTO verification_results(candidate_id, verifier_id, level_max_reached, verdict, score, signals, notes, created_at)
-                VALUES(:candidate_id, :verifier_id, :level_max_reached, :verdict, :score, :signals, :notes, :created_at)
-                """,
-                payload,
-            )
+        self._write(
+            """
+            INSERT INTO verification_results(candidate_id, verifier_id, level_max_reached, verdict, score, signals, notes, created_at)
+            VALUES(:candidate_id, :verifier_id, :level_max_reached, :verdict, :score, :signals, :notes, :created_at)
+            """,
+            payload,
+            (),
+        )
 
     def insert_controller_epoch(self, row: dict[str, Any]) -> None:
         payload = dict(row)
         payload["difficulty"] = json.dumps(payload["difficulty"], ensure_ascii=False)
         payload["metrics"] = json.dumps(payload["metrics"], ensure_ascii=False)
-        with closing(self._conn()) as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO controller_epochs(step, difficulty, mode, theta, metrics, created_at)
-                VALUES(:step, :difficulty, :mode, :theta, :metrics, :created_at)
-                """,
-                payload,
-            )
+        self._write(
+            """
+            INSERT OR REPLACE INTO controller_epochs(step, difficulty, mode, theta, metrics, created_at)
+            VALUES(:step, :difficulty, :mode, :theta, :metrics, :created_at)
+            """,
+            payload,
+            (),
+        )
 
     def upsert_story_memory(self, row: dict[str, Any]) -> None:
         payload = dict(row)
         payload["continuity"] = json.dumps(payload["continuity"], ensure_ascii=False)
-        with closing(self._conn()) as conn:
-            conn.execute(
-                """
-                INSERT INTO story_memory(branch_id, summary, continuity, updated_at)
-                VALUES(:branch_id, :summary, :continuity, :updated_at)
-                ON CONFLICT(branch_id) DO UPDATE SET
-                  summary=excluded.summary,
-                  continuity=excluded.continuity,
-                  updated_at=excluded.updated_at
-                """,
-                payload,
-            )
+        self._write(
+            """
+            INSERT INTO story_memory(branch_id, summary, continuity, updated_at)
+            VALUES(:branch_id, :summary, :continuity, :updated_at)
+            ON CONFLICT(branch_id) DO UPDATE SET
+              summary=excluded.summary,
+              continuity=excluded.continuity,
+              updated_at=excluded.updated_at
+            """,
+            payload,
+            (payload["branch_id"],),
+        )
 
-    def get_story_memory(self, branch_id: str) -> dict[str, Any] | None:
-        with closing(self._conn()) as conn:
+    def get_story_memory(self, branch_id: str) -> LazyRow | None:
+        with self._conn(branch_id) as conn:
             row = conn.execute("SELECT * FROM story_memory WHERE branch_id=?", (branch_id,)).fetchone()
         return self._decode_row(row, ("continuity",)) if row else None
 
@@ -254,18 +1164,18 @@ class WorldStore:
         payload = dict(row)
         alt = payload.get("alternative_compatibility", [])
         payload["alternative_compatibility"] = json.dumps(alt, ensure_ascii=False)
-        with closing(self._conn()) as conn:
-            conn.execute(
-                """
-                INSERT INTO story_events(branch_id, state_id, height, title, scene, surface_confirmation, alternative_compatibility, social_effect, deferred_tension, created_at)
-                VALUES(:branch_id, :state_id, :height, :title, :scene, :surface_confirmation, :alternative_compatibility, :social_effect, :deferred_tension, :created_at)
-                """,
-                payload,
-            )
+        self._write(
+            """
+            INSERT INTO story_events(branch_id, state_id, height, title, scene, surface_confirmation, alternative_compatibility, social_effect, deferred_tension, created_at)
+            VALUES(:branch_id, :state_id, :height, :title, :scene, :surface_confirmation, :alternative_compatibility, :social_effect, :deferred_tension, :created_at)
+            """,
+            payload,
+            (payload["branch_id"],),
+        )
 
-    def list_story_events(self, branch_id: str | None = None, limit: int = 200) -> list[dict[str, Any]]:
+    def list_story_events(self, branch_id: str | None = None, limit: int = 200) -> list[LazyRow]:
         cap = max(1, min(limit, 1000))
-        with closing(self._conn()) as conn:
+        with self._conn(branch_id or None) as conn:
             if branch_id:
                 rows = conn.execute(
                     "SELECT * FROM story_events WHERE branch_id=? ORDER BY height ASC, id ASC LIMIT ?",
@@ -284,33 +1194,47 @@ class WorldStore:
         payload.setdefault("anchor_type", "public_artifact")
         payload.setdefault("can_be_reinterpreted", 1)
         payload.setdefault("introduced_height", 0)
-        with closing(self._conn()) as conn:
-            conn.execute(
-                """
-                INSERT INTO branch_facts(
-                    branch_id, state_id, fact_id, anchor_type, subject, predicate, object, time_hint, location_hint,
-                    evidence_type, falsifiable, can_be_reinterpreted, references_json, introduced_height, fact_text, fact_hash, created_at
-                )
-                VALUES(
-                    :branch_id, :state_id, :fact_id, :anchor_type, :subject, :predicate, :object, :time_hint, :location_hint,
-                    :evidence_type, :falsifiable, :can_be_reinterpreted, :references_json, :introduced_height, :fact_text, :fact_hash, :created_at
-                )
-                """,
-                payload,
+        self._write(
+            """
+            INSERT INTO branch_facts(
+                branch_id, state_id, fact_id, anchor_type, subject, predicate, object, time_hint, location_hint,
+                evidence_type, falsifiable, can_be_reinterpreted, references_json, introduced_height, fact_text, fact_hash, created_at
+            )
+            VALUES(
+                :branch_id, :state_id, :fact_id, :anchor_type, :subject, :predicate, :object, :time_hint, :location_hint,
+                :evidence_type, :falsifiable, :can_be_reinterpreted, :references_json, :introduced_height, :fact_text, :fact_hash, :created_at
             )
+            """,
+            payload,
+            (payload["branch_id"],),
+        )
 
-    def list_branch_facts(self, branch_id: str, limit: int = 200) -> list[dict[str, Any]]:
+    def list_branch_facts(self, branch_id: str, limit: int = 200) -> list[LazyRow]:
         cap = max(1, min(limit, 5000))
-        with closing(self._conn()) as conn:
+        with self._conn(branch_id) as conn:
             rows = conn.execute(
                 "SELECT * FROM branch_facts WHERE branch_id=? ORDER BY id DESC LIMIT ?",
                 (branch_id, cap),
             ).fetchall()
         return [self._decode_row(r, ("references_json",)) for r in rows]
 
-    def list_active_facts(self, branch_id: str, limit: int = 200) -> list[dict[str, Any]]:
+    def iter_branch_fact_texts(self, branch_id: str, *, batch_size: int = 1000) -> Iterator[tuple[str, str]]:
+        """(anchor_type, fact_text) of every fact of the branch, oldest first, without the 5000-row cap."""
+        after_id = 0
+        while True:
+            with self._conn(branch_id) as conn:
+                rows = conn.execute(
+                    "SELECT id, anchor_type, fact_text FROM branch_facts WHERE branch_id=? AND id>? ORDER BY id LIMIT ?",
+                    (branch_id, after_id, batch_size),
+                ).fetchall()
+            yield from ((str(row["anchor_type"]), str(row["fact_text"])) for row in rows)
+            if len(rows) < batch_size:
+                return
+            after_id = int(rows[-1]["id"])
+
+    def list_active_facts(self, branch_id: str, limit: int = 200) -> list[LazyRow]:
         cap = max(1, min(limit, 1000))
-        with closing(self._conn()) as conn:
+        with self._conn(branch_id) as conn:
             rows = conn.execute(
                 """
                 SELECT bf.*
@@ -329,78 +1253,310 @@ class WorldStore:
             ).fetchall()
         return [self._decode_row(r, ("references_json",)) for r in rows]
 
-    def _decode_row(self, row: sqlite3.Row, json_fields: tuple[str, ...]) -> dict[str, Any]:
+    def _decode_row(self, row: sqlite3.Row, json_fields: tuple[str, ...]) -> LazyRow:
         data = dict(row)
-        for field in json_fields:
-            if data.get(field):
-                data[field] = json.loads(data[field])
         if "references_json" in data:
-            data["references"] = data.get("references_json", [])
-        return data
+            data["references"] = data["references_json"]
+            json_fields = (*json_fields, "references")
+        decoders: dict[str, Callable[[Any], Any]] = {}
+        for field in ("artifact_x", "meta_m"):
+            if isinstance(data.get(field), bytes):
+                decoders[field] = self._decode_json_column if field in json_fields else self._decode_column
+        return LazyRow(data, json_fields, decoders)
+
+    def _challenge_row(self, row: sqlite3.Row) -> LazyRow:
+        data = dict(row)
+        refs_raw = data.pop("policy_refs", None)
+        return LazyRow(
+            data,
+            ("difficulty_params", "verifier_policy"),
+            {"verifier_policy": lambda raw: self._decode_verifier_policy(raw, refs_raw)},
+        )
+
+    def _projection(self, table: str, columns: tuple[str, ...] | None) -> str:
+        if not columns:
+            return "*"
+        known = self._table_columns.get(table)
+        if known is None:
+            # Schema only: no barrier and no flush of buffered rows.
+            with self._connections.connection() as conn:
+                known = {str(r[1]) for r in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+            self._table_columns[table] = known
+        unknown = [col for col in columns if col not in known]
+        if unknown:
+            raise ValueError(f"Unknown {table} columns: {', '.join(unknown)}")
+        return ", ".join(columns)
+
+    def get_embeddings(self, model: str, text_shas: list[str]) -> dict[str, bytes]:
+        # Rows are content-addressed and never change, so this skips the write-behind barrier and
+        # the buffered writes of the current transaction: missing one only costs a recomputation.
+        found: dict[str, bytes] = {}
+        with self._connections.connection() as conn:
+            for start in range(0, len(text_shas), 500):
+                chunk = text_shas[start : start + 500]
+                rows = conn.execute(
+                    f"SELECT text_sha, vector FROM embedding_cache WHERE model=? AND text_sha IN ({', '.join('?' * len(chunk))})",
+                    (model, *chunk),
+                ).fetchall()
+                found.update((str(row["text_sha"]), bytes(row["vector"])) for row in rows)
+        return found
+
+    def insert_embeddings(self, model: str, vectors: dict[str, bytes]) -> None:
+        created_at = datetime.now(timezone.utc).isoformat()
+        for text_sha, vector in vectors.items():
+            self._write(
+                "INSERT OR IGNORE INTO embedding_cache(model, text_sha, vector, created_at) VALUES (?, ?, ?, ?)",
+                (model, text_sha, vector, created_at),
+                (),
+            )
 
     def list_branches(self) -> list[dict[str, Any]]:
-        with closing(self._conn()) as conn:
+        with self._conn() as conn:
             rows = conn.execute("SELECT * FROM branches ORDER BY created_at ASC").fetchall()
         return [dict(r) for r in rows]
 
     def get_branch(self, branch_id: str) -> dict[str, Any] | None:
-        with closing(self._conn()) as conn:
+        with self._conn(branch_id) as conn:
             row = conn.execute("SELECT * FROM branches WHERE branch_id=?", (branch_id,)).fetchone()
         return dict(row) if row else None
 
-    def list_states(self, branch_id: str | None = None) -> list[dict[str, Any]]:
-        with closing(self._conn()) as conn:
-            if branch_id:
-                rows = conn.execute("SELECT * FROM states WHERE branch_id=? ORDER BY height ASC", (branch_id,)).fetchall()
-            else:
-                rows = conn.execute("SELECT * FROM states ORDER BY created_at ASC").fetchall()
+    def _select_window(
+        self,
+        select_sql: str,
+        where: list[str],
+        params: list[Any],
+        order_by: tuple[str, ...],
+        *,
+        last_n: int | None = None,
+        limit: int | None = None,
+        scope: str | None = None,
+    ) -> list[sqlite3.Row]:
+        sql = select_sql
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if last_n is not None:
+            sql += " ORDER BY " + ", ".join(f"{col} DESC" for col in order_by) + " LIMIT ?"
+            with self._conn(scope) as conn:
+                rows = conn.execute(sql, (*params, max(0, int(last_n)))).fetchall()
+            rows.reverse()
+            return rows
+        sql += " ORDER BY " + ", ".join(f"{col} ASC" for col in order_by)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = [*params, max(0, int(limit))]
+        with self._conn(scope) as conn:
+            return conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _after_key(table: str, key_column: str, order_by: tuple[str, ...]) -> str:
+        # Keyset cursor: resume strictly after the row whose natural key was handed back last.
+        columns = ", ".join(order_by)
+        return f"({columns}) > (SELECT {columns} FROM {table} WHERE {key_column}=?)"
+
+    def list_states(
+        self,
+        branch_id: str | None = None,
+        *,
+        last_n: int | None = None,
+        after_id: str | None = None,
+        before_height: int | None = None,
+        after_height: int | None = None,
+        limit: int | None = None,
+        columns: tuple[str, ...] | None = None,
+    ) -> list[LazyRow]:
+        order_by = ("height", "rowid") if branch_id else ("created_at", "rowid")
+        where: list[str] = []
+        params: list[Any] = []
+        if branch_id:
+            where.append("branch_id=?")
+            params.append(branch_id)
+        if before_height is not None:
+            where.append("height < ?")
+            params.append(int(before_height))
+        if after_height is not None:
+            where.append("height > ?")
+            params.append(int(after_height))
+        if after_id is not None:
+            where.append(self._after_key("states", "state_id", order_by))
+            params.append(after_id)
+        rows = self._select_window(
+            f"SELECT {self._projection('states', columns)} FROM states", where, params, order_by, last_n=last_n, limit=limit, scope=branch_id or None
+        )
         return [self._decode_row(r, ("meta_m", "acceptance_summary")) for r in rows]
 
-    def get_state(self, state_id: str) -> dict[str, Any] | None:
-        with closing(self._conn()) as conn:
+    def iter_states(self, branch_id: str | None = None, *, batch_size: int = 500) -> Iterator[LazyRow]:
+        after_id: str | None = None
+        while True:
+            page = self.list_states(branch_id=branch_id, after_id=after_id, limit=batch_size)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after_id = page[-1]["state_id"]
+
+    def get_state(self, state_id: str) -> LazyRow | None:
+        with self._conn(f"state:{state_id}") as conn:
             row = conn.execute("SELECT * FROM states WHERE state_id=?", (state_id,)).fetchone()
         return self._decode_row(row, ("meta_m", "acceptance_summary")) if row else None
 
-    def list_challenges(self, branch_id: str | None = None) -> list[dict[str, Any]]:
-        with closing(self._conn()) as conn:
+    def count_challenges(self, branch_id: str | None = None) -> int:
+        with self._conn() as conn:
             if branch_id:
-                rows = conn.execute("SELECT * FROM challenges WHERE branch_id=? ORDER BY created_at ASC", (branch_id,)).fetchall()
+                row = conn.execute("SELECT COUNT(*) FROM challenges WHERE branch_id=?", (branch_id,)).fetchone()
             else:
-                rows = conn.execute("SELECT * FROM challenges ORDER BY created_at ASC").fetchall()
-        return [self._decode_row(r, ("difficulty_params", "verifier_policy")) for r in rows]
+                row = conn.execute("SELECT COUNT(*) FROM challenges").fetchone()
+        return int(row[0])
+
+    def list_challenges(
+        self,
+        branch_id: str | None = None,
+        *,
+        last_n: int | None = None,
+        after_id: str | None = None,
+        limit: int | None = None,
+        columns: tuple[str, ...] | None = None,
+    ) -> list[LazyRow]:
+        if columns and "verifier_policy" in columns and "policy_refs" not in columns:
+            columns = (*columns, "policy_refs")
+        order_by = ("created_at", "rowid")
+        where: list[str] = []
+        params: list[Any] = []
+        if branch_id:
+            where.append("branch_id=?")
+            params.append(branch_id)
+        if after_id is not None:
+            where.append(self._after_key("challenges", "challenge_id", order_by))
+            params.append(after_id)
+        rows = self._select_window(
+            f"SELECT {self._projection('challenges', columns)} FROM challenges", where, params, order_by, last_n=last_n, limit=limit, scope=branch_id or None
+        )
+        return [self._challenge_row(r) for r in rows]
 
-    def get_challenge(self, challenge_id: str) -> dict[str, Any] | None:
-        with closing(self._conn()) as conn:
+    def iter_challenges(self, branch_id: str | None = None, *, batch_size: int = 500) -> Iterator[LazyRow]:
+        after_id: str | None = None
+        while True:
+            page = self.list_challenges(branch_id=branch_id, after_id=after_id, limit=batch_size)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after_id = page[-1]["challenge_id"]
+
+    def get_challenge(self, challenge_id: str) -> LazyRow | None:
+        with self._conn() as conn:
             row = conn.execute("SELECT * FROM challenges WHERE challenge_id=?", (challenge_id,)).fetchone()
-        return self._decode_row(row, ("difficulty_params", "verifier_policy")) if row else None
+        return self._challenge_row(row) if row else None
 
-    def list_candidates(self, challenge_id: str | None = None) -> list[dict[str, Any]]:
-        with closing(self._conn()) as conn:
-            if challenge_id:
-                rows = conn.execute("SELECT * FROM candidates WHERE challenge_id=? ORDER BY created_at ASC", (challenge_id,)).fetchall()
-            else:
-                rows = conn.execute("SELECT * FROM candidates ORDER BY created_at ASC").fetchall()
+    def list_candidates(
+        self,
+        challenge_id: str | None = None,
+        *,
+        challenge_ids: list[str] | None = None,
+        last_n: int | None = None,
+        after_id: str | None = None,
+        limit: int | None = None,
+        columns: tuple[str, ...] | None = None,
+    ) -> list[LazyRow]:
+        order_by = ("created_at", "rowid")
+        where: list[str] = []
+        params: list[Any] = []
+        if challenge_id:
+            where.append("challenge_id=?")
+            params.append(challenge_id)
+        if challenge_ids is not None:
+            if not challenge_ids:
+                return []
+            where.append(f"challenge_id IN ({', '.join('?' for _ in challenge_ids)})")
+            params.extend(challenge_ids)
+        if after_id is not None:
+            where.append(self._after_key("candidates", "candidate_id", order_by))
+            params.append(after_id)
+        rows = self._select_window(f"SELECT {self._projection('candidates', columns)} FROM candidates", where, params, order_by, last_n=last_n, limit=limit)
         return [self._decode_row(r, ("meta_m",)) for r in rows]
 
-    def get_candidate(self, candidate_id: str) -> dict[str, Any] | None:
-        with closing(self._conn()) as conn:
+    def iter_candidates(self, challenge_id: str | None = None, *, batch_size: int = 500) -> Iterator[LazyRow]:
+        after_id: str | None = None
+        while True:
+            page = self.list_candidates(challenge_id=challenge_id, after_id=after_id, limit=batch_size)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after_id = page[-1]["candidate_id"]
+
+    def get_candidate(self, candidate_id: str) -> LazyRow | None:
+        with self._conn() as conn:
             row = conn.execute("SELECT * FROM candidates WHERE candidate_id=?", (candidate_id,)).fetchone()
         return self._decode_row(row, ("meta_m",)) if row else None
 
-    def list_verification_results(self, candidate_id: str | None = None) -> list[dict[str, Any]]:
-        with closing(self._conn()) as conn:
-            if candidate_id:
-                rows = conn.execute(
-                    "SELECT candidate_id, verifier_id, level_max_reached, verdict, score, signals, notes, created_at FROM verification_results WHERE candidate_id=? ORDER BY id ASC",
-                    (candidate_id,),
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    "SELECT candidate_id, verifier_id, level_max_reached, verdict, score, signals, notes, created_at FROM verification_results ORDER BY id ASC"
-                ).fetchall()
+    def list_verification_results(
+        self,
+        candidate_id: str | None = None,
+        *,
+        candidate_ids: list[str] | None = None,
+        last_n: int | None = None,
+        after_id: int | None = None,
+        limit: int | None = None,
+        columns: tuple[str, ...] | None = None,
+    ) -> list[LazyRow]:
+        where: list[str] = []
+        params: list[Any] = []
+        if candidate_id:
+            where.append("candidate_id=?")
+            params.append(candidate_id)
+        if candidate_ids is not None:
+            if not candidate_ids:
+                return []
+            where.append(f"candidate_id IN ({', '.join('?' for _ in candidate_ids)})")
+            params.extend(candidate_ids)
+        if after_id is not None:
+            where.append("id > ?")
+            params.append(int(after_id))
+        rows = self._select_window(
+            f"SELECT {self._projection('verification_results', columns or self._VERIFICATION_COLUMNS)} FROM verification_results",
+            where,
+            params,
+            ("id",),
+            last_n=last_n,
+            limit=limit,
+        )
         return [self._decode_row(r, ("signals",)) for r in rows]
 
-    def latest_epoch(self) -> dict[str, Any] | None:
-        with closing(self._conn()) as conn:
+    def iter_verification_results(self, candidate_id: str | None = None, *, batch_size: int = 1000) -> Iterator[LazyRow]:
+        after_id: int | None = None
+        while True:
+            page = self.list_verification_results(candidate_id=candidate_id, after_id=after_id, limit=batch_size)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after_id = int(page[-1]["id"])
+
+    def get_metrics_rollup(self) -> ScoreRollup:
+        with self._conn() as conn:
+            row = conn.execute("SELECT count, mean, m2 FROM metrics_rollup WHERE scope='global'").fetchone()
+            levels = conn.execute("SELECT level, count FROM metrics_reject_levels ORDER BY level ASC").fetchall()
+        if row is None:
+            return ScoreRollup()
+        return ScoreRollup(
+            count=int(row["count"]),
+            mean=float(row["mean"]),
+            m2=float(row["m2"]),
+            reject_by_level={str(r["level"]): int(r["count"]) for r in levels},
+        )
+
+    def latest_epoch(self) -> LazyRow | None:
+        with self._conn() as conn:
             row = conn.execute("SELECT * FROM controller_epochs ORDER BY step DESC LIMIT 1").fetchone()
         return self._decode_row(row, ("difficulty", "metrics")) if row else None
+
+    def list_controller_epochs(self, *, stride: int = 1) -> list[LazyRow]:
+        # Every stride-th step, plus the last one, so long runs can be sampled cheaply.
+        if stride < 1:
+            raise ValueError(f"stride must be >= 1, got {stride}")
+        with self._conn() as conn:
+            rows = conn.execute(
+                """
+                SELECT step, difficulty, mode, theta, metrics FROM controller_epochs
+                WHERE step % ? = 0 OR step = (SELECT MAX(step) FROM controller_epochs)
+                ORDER BY step ASC
+                """,
+                (stride,),
+            ).fetchall()
+        return [self._decode_row(row, ("difficulty", "metrics")) for row in rows]
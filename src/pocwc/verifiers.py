@@ -3,12 +3,12 @@
 import math
 import random
 from dataclasses import dataclass
-from typing import Any, ClassVar
+from typing import Any, Callable, ClassVar
 
 from .domain import Candidate, Challenge, VerificationLevel, VerificationResult, Verdict
 from .invariants import evaluate_invariants
 from .llm import LLMAdapter
-from .semantic import semantic_similarity
+from .semantic import max_similarity
 from .fact_schema import validate_and_normalize_fact_object
 
 
@@ -108,6 +108,9 @@ class NoveltyGateVerifier:
     llm: LLMAdapter | None = None
     min_novelty_score: float = 0.30
     hard_similarity_threshold: float = 0.92
+    # (branch_id, fact_text, window) -> best similarity among the branch's facts older than the
+    # ``window`` in recent_fact_texts; set by the engine when its fact index is enabled.
+    fact_history: Callable[[str, str, int], float] | None = None
     allowed_fact_types: ClassVar[tuple[str, ...]] = (
         "public_artifact",
         "witness",
@@ -193,11 +196,11 @@ class NoveltyGateVerifier:
             return False, "references must be a list"
         return True, ""
 
-    def _equivalent_fact(self, fact: dict[str, Any], recent_facts: list[str]) -> bool:
+    def _equivalent_fact(self, fact: dict[str, Any], recent_facts: list[str], history_sim: float = 0.0) -> bool:
         probe = self._canonical_fact_text_from_object(fact)
         if not probe.strip():
             return False
-        max_sim = max((semantic_similarity(probe, prev, self.llm) for prev in recent_facts), default=0.0)
+        max_sim = max(max_similarity(probe, recent_facts, self.llm), history_sim)
         return max_sim >= 0.93
 
     @staticmethod
@@ -320,7 +323,11 @@ class NoveltyGateVerifier:
         fact_ok, fact_reason = self._fact_object_valid(fact_object) if not schema_result.errors else (False, "schema validation failed")
 
         canonical_fact = self._canonical_fact_text_from_object(fact_object if isinstance(fact_object, dict) else {})
-        sim_fact = max((semantic_similarity(canonical_fact, prev, self.llm) for prev in recent_fact_texts), default=0.0)
+        sim_fact = max_similarity(canonical_fact, recent_fact_texts, self.llm)
+        history_sim = 0.0
+        if self.fact_history is not None and canonical_fact.strip():
+            history_sim = self.fact_history(challenge.branch_id, canonical_fact, len(recent_fact_texts))
+            sim_fact = max(sim_fact, history_sim)
         novel_fact = max(0.0, min(1.0, 1.0 - sim_fact))
 
         raw_fact_type = str((fact_object or {}).get("type", "")).strip() if isinstance(fact_object, dict) else ""
@@ -367,7 +374,7 @@ class NoveltyGateVerifier:
             novelty_min = novelty_min_mid
 
         scene = str(candidate.meta_m.get("story_bundle", {}).get("scene", "")).strip()
-        max_scene_similarity = max((semantic_similarity(scene, prev, self.llm) for prev in recent_narratives), default=0.0)
+        max_scene_similarity = max_similarity(scene, recent_narratives, self.llm)
 
         llm_novelty = self._llm_novelty_estimate(challenge, candidate, recent_narratives)
         novelty_score = novelty_structural
@@ -500,7 +507,7 @@ class NoveltyGateVerifier:
 
         if challenge.directive_type == "AgentCommitment" and commitment_count < 1:
             fail("DIRECTIVE_CONTRACT_FAIL", "AgentCommitment directive requires commitment anchor")
-        if self._equivalent_fact(fact_object if isinstance(fact_object, dict) else {}, recent_fact_texts):
+        if self._equivalent_fact(fact_object if isinstance(fact_object, dict) else {}, recent_fact_texts, history_sim):
             fail("FACT_EQUIVALENT", "fact is equivalent to an existing anchor")
 
         progress_gate = refs_gate
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from pathlib import Path
+
+from pocwc.orchestrator import SimulationConfig, SimulationEngine
+from pocwc.store import WorldStore
+
+
+def fresh_store(name: str, **kwargs: object) -> WorldStore:
+    db = Path(f"data/{name}.db")
+    if db.exists():
+        db.unlink()
+    return WorldStore(db, **kwargs)
+
+
+def fresh_config(name: str, **overrides: object) -> SimulationConfig:
+    db = Path(f"data/{name}.db")
+    if db.exists():
+        db.unlink()
+    return SimulationConfig(db_path=db, seed=11, llm_provider="none", **overrides)
+
+
+def fresh_engine(name: str, **overrides: object) -> SimulationEngine:
+    llm_adapter = overrides.pop("llm_adapter", None)
+    return SimulationEngine(fresh_config(name, **overrides), llm_adapter=llm_adapter)
+
+
+def fingerprint(engine: SimulationEngine) -> list:
+    return [(s["state_id"], s["artifact_x"]) for s in engine.store.list_states()] + [
+        (c["challenge_id"], c["branch_id"], c["directive_type"]) for c in engine.store.list_challenges()
+    ]
+
+
+class HashEmbedder:
+    """Deterministic 8-dim vectors derived from the text; records every text it embeds."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.embedded: list[str] = []
+
+    def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        with self.lock:
+            self.calls += 1
+            self.embedded.extend(texts)
+        return [[byte / 255.0 - 0.5 for byte in hashlib.sha256(" ".join(text.split()).encode()).digest()[:8]] for text in texts]
+
+    def generate_json(self, **_: object) -> dict:
+        return {}
+
+
+class SlowLLM:
+    """Sleeps on every generate_json call and records the peak number of calls in flight."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def generate_json(self, **_: object) -> dict:
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.delay)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+        return {}
+
+    def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        raise RuntimeError("embeddings unavailable")
@@ -0,0 +1,405 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import threading
+import time
+import unittest
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import mock
+
+from helpers import fingerprint, fresh_config
+from pocwc.async_engine import AsyncSimulationEngine
+from pocwc.async_http import AsyncHTTPClient
+from pocwc.llm import AsyncOpenRouterAdapter, LLMSettings
+from pocwc.orchestrator import SimulationConfig
+from pocwc.provers import Prover
+from pocwc.verifiers import NoveltyGateVerifier, Verifier
+
+
+class SlowAsyncLLM:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+
+    async def generate_json(self, **_: object) -> dict:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return {}
+
+    async def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        raise RuntimeError("embeddings unavailable")
+
+    async def aclose(self) -> None:
+        return None
+
+
+@dataclass(slots=True)
+class SleepyProver:
+    prover_id: str
+    delay: float
+    rng: random.Random | None = None
+    llm: object | None = object()
+
+    def generate(self, challenge, index: int) -> SimpleNamespace:  # noqa: ANN001
+        if self.llm is not None:
+            time.sleep(self.delay)
+        return SimpleNamespace(prover_id=self.prover_id, meta_m={})
+
+
+class EmbeddingAsyncLLM:
+    async def generate_json(self, **_: object) -> dict:
+        raise RuntimeError("generation unavailable")
+
+    async def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        return [[float(len(text) % 7), float(len(text.split()) % 5), 1.0] for text in texts]
+
+    async def aclose(self) -> None:
+        return None
+
+
+class ThreadRecordingEmbedder:
+    def __init__(self, adapter) -> None:  # noqa: ANN001
+        self.adapter = adapter
+        self.threads: list[str] = []
+
+    def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        self.threads.append(threading.current_thread().name)
+        return self.adapter.embed_texts(texts=texts)
+
+    def __getattr__(self, name: str):  # noqa: ANN204
+        return getattr(self.adapter, name)
+
+
+async def _run(config: SimulationConfig, steps: int, **kwargs: object) -> tuple[AsyncSimulationEngine, list, list]:
+    engine = AsyncSimulationEngine(config, **kwargs)
+    events: list = []
+    try:
+        await engine.run(steps, events.append)
+        run_fingerprint = fingerprint(engine.engine)
+    finally:
+        await engine.aclose()
+    return engine, run_fingerprint, events
+
+
+class AsyncSimulationEngineTests(unittest.TestCase):
+    def test_rounds_are_reproducible(self) -> None:
+        _, first, events = asyncio.run(_run(fresh_config("test_async_engine_a"), 30, branch_concurrency=3))
+        _, second, _ = asyncio.run(_run(fresh_config("test_async_engine_b"), 30, branch_concurrency=3))
+        self.assertEqual(first, second)
+        self.assertEqual([event["step"] for event in events], list(range(1, 31)))
+
+    def test_progress_events_are_emitted_on_the_store_writer(self) -> None:
+        engine = AsyncSimulationEngine(fresh_config("test_async_engine_emit"), branch_concurrency=3)
+        threads: list[str] = []
+
+        async def main() -> None:
+            try:
+                await engine.run(6, lambda event: threads.append(threading.current_thread().name))
+            finally:
+                await engine.aclose()
+
+        asyncio.run(main())
+        self.assertEqual(len(threads), 6)
+        self.assertTrue(all(name.startswith("store-writer") for name in threads), threads)
+
+    def test_each_round_steps_distinct_branches(self) -> None:
+        engine = AsyncSimulationEngine(fresh_config("test_async_engine_rounds"), branch_concurrency=3)
+        rounds: list[list[str]] = []
+        choose = engine.engine._choose_branches
+
+        def recording(width: int) -> list[dict]:
+            branches = choose(width)
+            rounds.append([branch["branch_id"] for branch in branches])
+            return branches
+
+        engine.engine._choose_branches = recording
+
+        async def main() -> None:
+            try:
+                await engine.run(30)
+            finally:
+                await engine.aclose()
+
+        asyncio.run(main())
+        self.assertEqual(sum(len(ids) for ids in rounds), 30)
+        self.assertTrue(all(len(ids) == len(set(ids)) for ids in rounds))
+        self.assertTrue(any(len(ids) > 1 for ids in rounds))
+
+    def test_branches_wait_on_the_llm_concurrently(self) -> None:
+        llm = SlowAsyncLLM(0.05)
+        engine, _, events = asyncio.run(_run(fresh_config("test_async_engine_llm"), 6, branch_concurrency=3, llm_adapter=llm))
+        self.assertEqual(len(events), 6)
+        self.assertTrue(engine.engine.llm_status["enabled"])
+        # Three provers per step, several steps per round.
+        self.assertGreater(llm.peak, len(engine.engine.provers))
+
+    def test_timeout_fallbacks_run_off_the_event_loop(self) -> None:
+        offline_threads: list[str] = []
+
+        def recording(method):  # noqa: ANN001
+            def wrapper(self, *args, **kwargs):  # noqa: ANN001
+                if self.llm is None:
+                    offline_threads.append(threading.current_thread().name)
+                return method(self, *args, **kwargs)
+
+            return wrapper
+
+        config = fresh_config("test_async_engine_fallback", prover_timeout_s=0.05, verifier_deadline_s=0.05)
+        with (
+            mock.patch.object(Prover, "generate", recording(Prover.generate)),
+            mock.patch.object(Verifier, "evaluate", recording(Verifier.evaluate)),
+            mock.patch.object(NoveltyGateVerifier, "evaluate", recording(NoveltyGateVerifier.evaluate)),
+        ):
+            _, _, events = asyncio.run(_run(config, 1, branch_concurrency=1, llm_adapter=SlowAsyncLLM(0.3)))
+        self.assertEqual(len(events), 1)
+        self.assertTrue(offline_threads)
+        self.assertTrue(all(name.startswith("llm-call") for name in offline_threads), offline_threads)
+
+    def test_embeddings_are_fetched_off_the_store_writer(self) -> None:
+        config = fresh_config("test_async_engine_embed", fact_index=True)
+        engine = AsyncSimulationEngine(config, branch_concurrency=3, llm_adapter=EmbeddingAsyncLLM())
+        cache = engine.engine.embedding_cache
+        recorder = cache.adapter = ThreadRecordingEmbedder(cache.adapter)
+        events: list = []
+
+        async def main() -> None:
+            try:
+                await engine.run(9, events.append)
+            finally:
+                await engine.aclose()
+
+        asyncio.run(main())
+        self.assertEqual(len(events), 9)
+        self.assertTrue(recorder.threads)
+        self.assertFalse([name for name in recorder.threads if name.startswith("store-writer")], recorder.threads)
+
+    def test_abandoned_calls_keep_their_slot(self) -> None:
+        config = fresh_config("test_async_engine_timeout_clock", prover_timeout_s=0.3)
+        engine = AsyncSimulationEngine(config, branch_concurrency=1, max_inflight_calls=1)
+        engine.engine.provers = [SleepyProver("p-slow", 0.6), SleepyProver("p-next", 0.1)]
+
+        async def main() -> list:
+            engine._slots = asyncio.Semaphore(1)
+            try:
+                return await engine._generate_candidates(SimpleNamespace(challenge_id="c-1"))
+            finally:
+                await engine.aclose()
+
+        slow, following = asyncio.run(main())
+        self.assertIn("timed out", slow.meta_m["llm_error"])
+        # Waited for the timed-out call's thread, and its own clock only started on the worker.
+        self.assertNotIn("llm_error", following.meta_m)
+
+    def test_rejects_invalid_width(self) -> None:
+        with self.assertRaises(ValueError):
+            AsyncSimulationEngine(fresh_config("test_async_engine_invalid"), branch_concurrency=0)
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections: set[int] = set()
+
+    def do_POST(self) -> None:  # noqa: N802
+        _ChatHandler.connections.add(id(self.connection))
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path.endswith("/embeddings"):
+            payload = {"data": [{"embedding": [float(len(text))]} for text in request["input"]]}
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            middle = len(body) // 2
+            for chunk in (body[:middle], body[middle:]):
+                self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        if request["model"] == "broken":
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        content = json.dumps({"echo": request["messages"][1]["content"]})
+        body = json.dumps({"choices": [{"message": {"content": content}}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        return None
+
+
+class AsyncOpenRouterAdapterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        _ChatHandler.connections = set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v1"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _adapter(self, model: str = "test-model") -> AsyncOpenRouterAdapter:
+        settings = LLMSettings(provider="openrouter", model=model, base_url=self.base_url, api_key="k", timeout_seconds=5)
+        return AsyncOpenRouterAdapter(settings, max_connections=2)
+
+    def test_sequential_calls_reuse_one_connection(self) -> None:
+        async def main() -> tuple[list[dict], list[list[float]], int]:
+            adapter = self._adapter()
+            try:
+                replies = [await adapter.generate_json(system_prompt="s", user_prompt=f"u{i}") for i in range(4)]
+                vectors = await adapter.embed_texts(texts=["ab", "abcd"])
+                return replies, vectors, adapter.client.connections_opened
+            finally:
+                await adapter.aclose()
+
+        replies, vectors, opened = asyncio.run(main())
+        self.assertEqual([reply["echo"] for reply in replies], ["u0", "u1", "u2", "u3"])
+        self.assertEqual(vectors, [[2.0], [4.0]])
+        self.assertEqual(opened, 1)
+        self.assertEqual(len(_ChatHandler.connections), 1)
+
+    def test_concurrent_calls_are_bounded_per_origin(self) -> None:
+        async def main() -> int:
+            adapter = self._adapter()
+            try:
+                await asyncio.gather(*(adapter.generate_json(system_prompt="s", user_prompt=str(i)) for i in range(8)))
+                return adapter.client.connections_opened
+            finally:
+                await adapter.aclose()
+
+        self.assertLessEqual(asyncio.run(main()), 2)
+
+    def test_http_errors_raise_runtime_error(self) -> None:
+        async def main() -> None:
+            adapter = self._adapter("broken")
+            try:
+                await adapter.generate_json(system_prompt="s", user_prompt="u")
+            finally:
+                await adapter.aclose()
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(main())
+
+
+class _ScriptedServer:
+    """Raw HTTP server: ``reply(connection, method)`` gives the bytes to answer with, or None to hang up."""
+
+    def __init__(self, reply) -> None:  # noqa: ANN001
+        self.reply = reply
+        self.requests: list[tuple[int, str]] = []
+        self._connections = 0
+        self._handlers: set[asyncio.Task] = set()
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}/x"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = self._connections = self._connections + 1
+        self._handlers.add(asyncio.current_task())
+        try:
+            while True:
+                head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+                length = next(int(line.split(":", 1)[1]) for line in head.split("\r\n") if line.lower().startswith("content-length:"))
+                await reader.readexactly(length)
+                method = head.split(" ", 1)[0]
+                self.requests.append((connection, method))
+                answer = self.reply(connection, method)
+                if answer is None:
+                    break
+                writer.write(answer)
+                await writer.drain()
+                if b"Connection: close" in answer:
+                    break
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+        # The client has closed its side by now, so every handler is about to see EOF.
+        await asyncio.wait_for(asyncio.gather(*self._handlers, return_exceptions=True), 2.0)
+
+
+class AsyncHTTPClientTests(unittest.TestCase):
+    def _run(self, server: _ScriptedServer, calls) -> tuple[list, int]:  # noqa: ANN001
+        async def main() -> tuple[list, int]:
+            url = await server.start()
+            client = AsyncHTTPClient(timeout=2.0)
+            outcomes: list = []
+            try:
+                for method in calls:
+                    try:
+                        response = await client.request(method, url, body=b"{}" if method == "POST" else b"")
+                        outcomes.append((response.status, response.body))
+                    except (OSError, asyncio.IncompleteReadError) as exc:
+                        outcomes.append(type(exc))
+                return outcomes, client.connections_opened
+            finally:
+                await client.aclose()
+                await server.stop()
+
+        return asyncio.run(main())
+
+    def test_bodyless_responses_keep_the_connection(self) -> None:
+        replies = iter(
+            [
+                b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\n",
+                b"HTTP/1.1 204 No Content\r\n\r\n",
+                b"HTTP/1.1 304 Not Modified\r\nETag: x\r\n\r\n",
+                b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok",
+            ]
+        )
+        server = _ScriptedServer(lambda connection, method: next(replies))
+        outcomes, opened = self._run(server, ["HEAD", "GET", "GET", "POST"])
+        self.assertEqual(outcomes, [(200, b""), (204, b""), (304, b""), (200, b"ok")])
+        self.assertEqual(opened, 1)
+
+    def test_unframed_body_is_read_to_eof_only_when_the_server_closes(self) -> None:
+        replies = iter([b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\nhello", b"HTTP/1.1 200 OK\r\n\r\nhello"])
+
+        def reply(connection: int, method: str) -> bytes:
+            return next(replies)
+
+        server = _ScriptedServer(reply)
+        outcomes, opened = self._run(server, ["POST", "POST"])
+        self.assertEqual(outcomes, [(200, b"hello"), ConnectionError])
+        self.assertEqual(opened, 2)
+
+    def test_only_idempotent_requests_are_retried_on_a_dropped_connection(self) -> None:
+        ok = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"
+        for method, expected, sent in (
+            ("POST", [(200, b"ok"), asyncio.IncompleteReadError], [(1, "POST"), (1, "POST")]),
+            ("GET", [(200, b"ok"), (200, b"ok")], [(1, "GET"), (1, "GET"), (2, "GET")]),
+        ):
+            with self.subTest(method):
+
+                def reply(connection: int, _method: str) -> bytes | None:
+                    # The first connection goes away after one answer, with the next request already sent on it.
+                    return None if connection == 1 and len(server.requests) == 2 else ok
+
+                server = _ScriptedServer(reply)
+                outcomes, opened = self._run(server, [method, method])
+                self.assertEqual(outcomes, expected)
+                self.assertEqual(server.requests, sent)
+                self.assertEqual(opened, len({connection for connection, _ in sent}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import shutil
+import unittest
+from pathlib import Path
+
+from pocwc.batch import merge_results, plan_jobs, run_batch, run_job
+from pocwc.orchestrator import SimulationConfig
+from pocwc.world_config import DEFAULT_WORLD_CONFIG_PATH
+
+
+class BatchRunnerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.out_dir = Path("data/test_batch")
+        shutil.rmtree(self.out_dir, ignore_errors=True)
+        self.out_dir.mkdir(parents=True)
+        self.alt_world = self.out_dir / "alt-world.json"
+        shutil.copyfile(DEFAULT_WORLD_CONFIG_PATH, self.alt_world)
+
+    def test_plan_rejects_ambiguous_matrices(self) -> None:
+        with self.assertRaises(ValueError):
+            plan_jobs([DEFAULT_WORLD_CONFIG_PATH, DEFAULT_WORLD_CONFIG_PATH], [1], self.out_dir)
+        with self.assertRaises(ValueError):
+            plan_jobs([DEFAULT_WORLD_CONFIG_PATH], [3, 3], self.out_dir)
+
+    def test_matrix_runs_in_worker_processes_and_merges(self) -> None:
+        config = SimulationConfig(steps=12, llm_provider="none")
+        missing = self.out_dir / "missing-world.json"
+        report = run_batch(
+            config,
+            [DEFAULT_WORLD_CONFIG_PATH, self.alt_world, missing],
+            [5, 9],
+            self.out_dir / "runs",
+            workers=2,
+            trajectory_stride=5,
+        )
+        self.assertEqual(len(report["jobs"]), 6)
+        self.assertEqual(report["failed"], 2)
+        self.assertEqual(report["aggregate"][str(missing)]["failed_seeds"], [5, 9])
+
+        default = report["aggregate"][str(DEFAULT_WORLD_CONFIG_PATH)]
+        self.assertEqual(default["seeds"], [5, 9])
+        self.assertEqual(sum(default["final_modes"].values()), 2)
+        self.assertIn("accept_rate", default["metrics"])
+
+        first = next(job for job in report["jobs"] if job["world_config"] == str(self.alt_world) and job["seed"] == 5)
+        self.assertTrue(Path(first["db_path"]).exists())
+        self.assertEqual([point["step"] for point in first["controller_trajectory"]], [5, 10, 12])
+
+        # A job gives the same result in a worker process as in this one.
+        again = run_job(
+            plan_jobs([self.alt_world], [5], self.out_dir / "again")[0],
+            config,
+            trajectory_stride=5,
+        )
+        for result in (first, again):
+            result["metrics"].pop("steps_per_sec")
+        self.assertEqual(first["metrics"], again["metrics"])
+        self.assertEqual(first["controller_trajectory"], again["controller_trajectory"])
+
+        with self.assertRaises(FileExistsError):
+            run_batch(config, [self.alt_world], [5], self.out_dir / "runs", workers=1)
+
+    def test_merge_orders_jobs_and_skips_failures(self) -> None:
+        merged = merge_results(
+            [
+                {"world_config": "w", "seed": 2, "db_path": "b", "metrics": {"accept_rate": 0.5, "controller": {"mode": "stabilize"}}},
+                {"world_config": "w", "seed": 1, "db_path": "a", "error": "RuntimeError: boom"},
+                {"world_config": "w", "seed": 3, "db_path": "c", "metrics": {"accept_rate": 0.25, "controller": {"mode": "stabilize"}}},
+            ]
+        )
+        self.assertEqual([job["seed"] for job in merged["jobs"]], [1, 2, 3])
+        self.assertEqual(merged["failed"], 1)
+        self.assertEqual(merged["aggregate"]["w"]["metrics"]["accept_rate"], {"mean": 0.375, "min": 0.25, "max": 0.5})
+        self.assertEqual(merged["aggregate"]["w"]["final_modes"], {"stabilize": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+
+from helpers import fresh_store
+from pocwc.branch_context import BranchContext
+from pocwc.orchestrator import SimulationConfig, SimulationEngine
+
+
+def _fact(fact_id: str, state_id: str, height: int) -> dict:
+    return {"branch_id": "branch-main", "state_id": state_id, "fact_id": fact_id, "introduced_height": height}
+
+
+class BranchContextTests(unittest.TestCase):
+    def test_ring_buffers_keep_the_tail(self) -> None:
+        context = BranchContext("branch-main", state_window=3, fact_window=2, directive_window=2, fact_id_window=3)
+        for height in range(5):
+            context.add_state({"state_id": f"s{height}", "height": height})
+            context.add_fact(_fact(f"f{height}", f"s{height}", height))
+            context.add_directive(f"d{height}")
+        self.assertEqual([s["state_id"] for s in context.recent_states(2)], ["s3", "s4"])
+        self.assertEqual([f["fact_id"] for f in context.recent_facts(2)], ["f4", "f3"])
+        self.assertEqual(context.recent_directives(12), ["d3", "d4"])
+        self.assertEqual(context.known_fact_ids(), {"f2", "f3", "f4"})
+        self.assertEqual([f["fact_id"] for f in context.facts_for_states(["s2", "s3", "s1"])], ["f2", "f3"])
+        with self.assertRaises(ValueError):
+            context.recent_states(4)
+
+    def test_active_facts_fill_past_repeated_fact_ids(self) -> None:
+        store = fresh_store("test_branch_context_active_facts")
+        live = BranchContext("branch-main", state_window=3, fact_window=250, directive_window=2, fact_id_window=400)
+        try:
+            # 300 distinct facts, then 300 rows that keep revising 20 of them: the newest 250 rows hold 20 ids.
+            fact_ids = [f"f{index}" for index in range(300)] + [f"f{index % 20}" for index in range(300)]
+            for height, fact_id in enumerate(fact_ids):
+                row = {
+                    **_fact(fact_id, f"s{height}", height),
+                    "subject": fact_id,
+                    "predicate": "is",
+                    "object": str(height),
+                    "time_hint": "",
+                    "location_hint": "",
+                    "evidence_type": "observation",
+                    "falsifiable": 1,
+                    "fact_text": f"{fact_id} is {height}",
+                    "fact_hash": f"{fact_id}-{height}",
+                    "created_at": "2026-01-01T00:00:00+00:00",
+                }
+                store.insert_branch_fact(row)
+                live.add_fact(row)
+            expected = [(f["fact_id"], f["introduced_height"]) for f in store.list_active_facts("branch-main", limit=250)]
+            loaded = BranchContext.load(store, "branch-main", state_window=3, fact_window=250, directive_window=2, fact_id_window=400)
+            self.assertEqual(len(expected), 250)
+            for context in (live, loaded):
+                self.assertEqual([(f["fact_id"], f["introduced_height"]) for f in context.active_facts(250)], expected)
+            with self.assertRaises(ValueError):
+                live.active_facts(251)
+        finally:
+            store.close()
+
+    def test_incremental_context_matches_a_fresh_load(self) -> None:
+        db = Path("data/test_branch_context_run.db")
+        if db.exists():
+            db.unlink()
+        engine = SimulationEngine(SimulationConfig(db_path=db, steps=40, seed=11))
+        engine._seed_genesis()
+        statements: list[str] = []
+        with engine.store._conn() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            engine.run(40)
+        finally:
+            with engine.store._conn() as conn:
+                conn.set_trace_callback(None)
+        try:
+            cache = engine.contexts
+            for branch in engine.store.list_branches():
+                branch_id = branch["branch_id"]
+                live = cache.get(branch_id)
+                fresh = BranchContext.load(
+                    engine.store,
+                    branch_id,
+                    state_window=cache.state_window,
+                    fact_window=cache.fact_window,
+                    directive_window=cache.directive_window,
+                    fact_id_window=cache.fact_id_window,
+                )
+                self.assertEqual([s["state_id"] for s in live.states], [s["state_id"] for s in fresh.states])
+                self.assertEqual([f["fact_id"] for f in live.facts], [f["fact_id"] for f in fresh.facts])
+                self.assertEqual(list(live.directives), list(fresh.directives))
+                self.assertEqual(live.known_fact_ids(), fresh.known_fact_ids())
+                self.assertEqual(
+                    [f["fact_id"] for f in live.active_facts(250)],
+                    [f["fact_id"] for f in engine.store.list_active_facts(branch_id, limit=250)],
+                )
+            # Each branch context is seeded once; steps never re-read the fact log.
+            fact_reads = [sql for sql in statements if "FROM branch_facts" in sql]
+            self.assertLessEqual(len(fact_reads), len(engine.store.list_branches()))
+        finally:
+            engine.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
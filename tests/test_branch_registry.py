@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+
+from pocwc.branch_registry import BranchRegistry
+from pocwc.orchestrator import SimulationConfig, SimulationEngine
+from pocwc.store import WorldStore
+
+
+def _branch(branch_id: str, created_at: str, status: str = "active") -> dict:
+    return {
+        "branch_id": branch_id,
+        "head_state_id": None,
+        "created_at": created_at,
+        "status": status,
+        "semantic_debt_est": 0.5,
+        "uncertainty": 0.5,
+        "closure_pressure": 0.5,
+        "chaos_pressure": 0.5,
+    }
+
+
+class BranchRegistryTests(unittest.TestCase):
+    def test_write_through_matches_store_and_hands_out_copies(self) -> None:
+        db = Path("data/test_branch_registry.db")
+        if db.exists():
+            db.unlink()
+        store = WorldStore(db)
+        registry = BranchRegistry(store)
+        try:
+            registry.upsert(_branch("branch-b", "2026-01-02T00:00:00+00:00"))
+            registry.upsert(_branch("branch-a", "2026-01-01T00:00:00+00:00"))
+            registry.upsert({**_branch("branch-b", "2026-02-01T00:00:00+00:00"), "status": "stalled"})
+            self.assertEqual(registry.all(), [dict(row) for row in store.list_branches()])
+            self.assertEqual(registry.get("branch-b")["created_at"], "2026-01-02T00:00:00+00:00")
+            self.assertEqual([b["branch_id"] for b in registry.with_status("stalled")], ["branch-b"])
+            registry.get("branch-a")["status"] = "mutated"
+            self.assertEqual(registry.get("branch-a")["status"], "active")
+        finally:
+            store.close()
+
+    def test_run_reads_branches_from_cache(self) -> None:
+        db = Path("data/test_branch_registry_run.db")
+        if db.exists():
+            db.unlink()
+        engine = SimulationEngine(SimulationConfig(db_path=db, steps=5, seed=5))
+        engine._seed_genesis()
+        statements: list[str] = []
+        with engine.store._conn() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            engine.run(5)
+        finally:
+            with engine.store._conn() as conn:
+                conn.set_trace_callback(None)
+        try:
+            # run() reloads once; every later read is served from memory.
+            self.assertEqual(sum(1 for sql in statements if "FROM branches" in sql), 1)
+            self.assertEqual(engine.branches.all(), [dict(row) for row in engine.store.list_branches()])
+        finally:
+            engine.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
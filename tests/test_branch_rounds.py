@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import unittest
+
+from helpers import SlowLLM, fingerprint, fresh_engine
+from pocwc.orchestrator import BranchProgress
+
+
+class BranchRoundTests(unittest.TestCase):
+    def test_rounds_are_reproducible(self) -> None:
+        fingerprints = []
+        for run in range(2):
+            engine = fresh_engine(f"test_rounds_repro_{run}", branch_concurrency=3)
+            try:
+                engine.run(40)
+                fingerprints.append(fingerprint(engine))
+            finally:
+                engine.close()
+        self.assertEqual(fingerprints[0], fingerprints[1])
+
+    def test_each_round_steps_distinct_branches(self) -> None:
+        engine = fresh_engine("test_rounds_distinct", branch_concurrency=3)
+        rounds: list[list[str]] = []
+        choose = engine._choose_branches
+
+        def recording(width: int) -> list[dict]:
+            branches = choose(width)
+            rounds.append([branch["branch_id"] for branch in branches])
+            return branches
+
+        engine._choose_branches = recording
+        events: list[dict] = []
+        try:
+            engine.run(40, events.append)
+        finally:
+            engine.close()
+        self.assertEqual([event["step"] for event in events], list(range(1, 41)))
+        self.assertEqual(sum(len(ids) for ids in rounds), 40)
+        self.assertTrue(all(len(ids) == len(set(ids)) for ids in rounds))
+        self.assertTrue(any(len(ids) > 1 for ids in rounds))
+        self.assertTrue(set(engine.branch_progress) <= {branch["branch_id"] for branch in engine.store.list_branches()})
+
+    def test_streaks_are_isolated_per_branch(self) -> None:
+        engine = fresh_engine("test_rounds_isolation", branch_concurrency=2)
+        try:
+            engine._seed_genesis()
+            engine.branch_progress["branch-other"] = BranchProgress(reject_streak=4, stagnation_streak=5)
+            branch = engine.branches.get("branch-main")
+            challenge = engine._build_challenge(1, branch)
+            self.assertEqual(challenge.verifier_policy["stagnation_streak"], 0)
+            self.assertIs(engine._branch_progress("branch-main"), engine.branch_progress["branch-main"])
+        finally:
+            engine.close()
+
+        serial = fresh_engine("test_rounds_isolation_serial")
+        try:
+            # The default scheduler keeps one set of streaks for the whole run.
+            self.assertIs(serial._branch_progress("branch-main"), serial._branch_progress("branch-other"))
+        finally:
+            serial.close()
+
+    def test_branches_wait_on_the_llm_concurrently(self) -> None:
+        llm = SlowLLM(0.005)
+        engine = fresh_engine("test_rounds_parallel", branch_concurrency=3, llm_adapter=llm)
+        try:
+            # Long enough for forks to exist, so rounds hold more than one branch.
+            engine.run(40)
+        finally:
+            engine.close()
+        self.assertGreater(llm.peak, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
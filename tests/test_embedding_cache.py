@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+
+from helpers import HashEmbedder, fresh_store
+from pocwc.embedding_cache import CachedEmbeddingAdapter, text_sha
+from pocwc.orchestrator import SimulationConfig, SimulationEngine
+from pocwc.semantic import numpy_available, semantic_similarity_many
+
+
+class EmbeddingCacheTests(unittest.TestCase):
+    def test_tiers_and_counters(self) -> None:
+        store = fresh_store("test_embedding_cache_tiers")
+        try:
+            embedder = HashEmbedder()
+            cache = CachedEmbeddingAdapter(embedder, model="m1", store=store, capacity=2)
+            first = cache.embed_texts(texts=["a cat", "a dog", "a  cat"])
+            self.assertEqual(first[0], first[2])
+            # Duplicates and whitespace variants share one key; misses go out as one batch.
+            self.assertEqual((embedder.calls, embedder.embedded), (1, ["a cat", "a dog"]))
+            self.assertEqual(cache.embed_texts(texts=["a dog"]), [first[1]])
+            self.assertEqual(cache.flush(), 2)
+
+            cache.embed_texts(texts=["a bird"])
+            self.assertEqual(cache.stats.evictions, 1)
+            self.assertEqual(cache.embed_texts(texts=["a cat"]), [first[0]])
+            self.assertEqual(cache.stats.disk_hits, 1)
+            stats = cache.stats.as_dict()
+            self.assertEqual(stats["lookups"], stats["memory_hits"] + stats["disk_hits"] + stats["misses"])
+
+            # A new cache over the same store starts warm for its model only.
+            again = CachedEmbeddingAdapter(HashEmbedder(), model="m1", store=store)
+            self.assertEqual(again.embed_texts(texts=["a cat", "a dog"]), first[:2])
+            self.assertEqual((again.adapter.calls, again.stats.disk_hits), (0, 2))
+            other = CachedEmbeddingAdapter(HashEmbedder(), model="m2", store=store)
+            other.embed_texts(texts=["a cat"])
+            self.assertEqual(other.adapter.calls, 1)
+            self.assertEqual(other.generate_json(), {})
+        finally:
+            store.close()
+
+    def test_rolled_back_flush_is_requeued(self) -> None:
+        store = fresh_store("test_embedding_cache_rollback")
+        try:
+            cache = CachedEmbeddingAdapter(HashEmbedder(), model="m1", store=store)
+            cache.embed_texts(texts=["a cat", "a dog"])
+            with self.assertRaises(RuntimeError):
+                with store.transaction():
+                    self.assertEqual(cache.flush(), 2)
+                    raise RuntimeError("step failed")
+            self.assertEqual(store.get_embeddings("m1", [text_sha("a cat")]), {})
+            # Still in memory, so nothing would embed them again: the next flush has to write them.
+            self.assertEqual(cache.requeue(), 2)
+            with store.transaction():
+                self.assertEqual(cache.flush(), 2)
+            self.assertEqual(len(store.get_embeddings("m1", [text_sha("a cat"), text_sha("a dog")])), 2)
+            self.assertEqual((cache.requeue(), cache.flush()), (0, 0))
+        finally:
+            store.close()
+
+    @unittest.skipUnless(numpy_available(), "numpy is not installed")
+    def test_corpus_matrix_is_reused_across_queries(self) -> None:
+        embedder = HashEmbedder()
+        cache = CachedEmbeddingAdapter(embedder, model="m1", matrix_capacity=1)
+        corpus = ["a cat", "a dog", "", "a bird"]
+        first = semantic_similarity_many("a cat sat", corpus, cache, backend="numpy")
+        expected = semantic_similarity_many("a cat sat", corpus, HashEmbedder(), backend="python")
+        for got, want in zip(first, expected, strict=True):
+            self.assertAlmostEqual(got, want, places=5)
+
+        matrix = cache.embedding_matrix(["a cat", "a dog", "a bird"])
+        calls, lookups = embedder.calls, cache.stats.lookups
+        semantic_similarity_many("a dog ran", corpus, cache, backend="numpy")
+        self.assertIs(cache.embedding_matrix(["a cat", "a dog", "a bird"]), matrix)
+        # Only the new query was looked up and embedded.
+        self.assertEqual((embedder.calls - calls, cache.stats.lookups - lookups), (1, 1))
+        cache.embedding_matrix(["a dog"])
+        self.assertIsNot(cache.embedding_matrix(["a cat", "a dog", "a bird"]), matrix)
+
+    def test_engine_reuses_vectors_without_changing_the_run(self) -> None:
+        runs = []
+        for size in (0, 4096):
+            db = Path(f"data/test_embedding_cache_engine_{size}.db")
+            if db.exists():
+                db.unlink()
+            embedder = HashEmbedder()
+            engine = SimulationEngine(SimulationConfig(db_path=db, seed=11, llm_provider="none", embedding_cache_size=size), llm_adapter=embedder)
+            try:
+                metrics = engine.run(15)
+                states = [(s["state_id"], s["artifact_x"]) for s in engine.store.list_states()]
+                with engine.store._conn() as conn:
+                    stored = conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+            finally:
+                engine.close()
+            runs.append((states, metrics, embedder, stored))
+
+        (plain_states, plain_metrics, plain, _), (states, metrics, cached, stored) = runs
+        self.assertEqual(states, plain_states)
+        self.assertNotIn("embedding_cache", plain_metrics)
+        self.assertLess(len(cached.embedded), len(plain.embedded) / 2)
+        self.assertEqual(len(cached.embedded), len(set(" ".join(text.split()) for text in cached.embedded)))
+        self.assertEqual(stored, len(cached.embedded))
+        self.assertGreater(metrics["embedding_cache"]["hit_rate"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
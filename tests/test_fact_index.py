@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import random
+import unittest
+from pathlib import Path
+
+from helpers import HashEmbedder
+from pocwc.fact_index import FactIndex
+from pocwc.orchestrator import SimulationConfig, SimulationEngine
+from pocwc.semantic import lexical_jaccard, numpy, numpy_available
+from pocwc.verifiers import NoveltyGateVerifier
+
+
+def _fact_texts(count: int, seed: int = 3) -> list[str]:
+    rng = random.Random(seed)
+    words = [f"w{index}" for index in range(300)]
+    return [f"public_artifact: {' '.join(rng.sample(words, 10))}" for _ in range(count)]
+
+
+class FactIndexTests(unittest.TestCase):
+    def test_lexical_lookup_matches_exhaustive_search(self) -> None:
+        texts = _fact_texts(400)
+        index = FactIndex()
+        index.add_many([*texts, "   "])
+        self.assertEqual(len(index), 400)
+        for source in (texts[0], texts[199], texts[-1]):
+            query = source.rsplit(" ", 1)[0] + " zz"
+            self.assertEqual(index.max_similarity(query), max(lexical_jaccard(query, text) for text in texts))
+        self.assertEqual(index.max_similarity(""), 0.0)
+        self.assertEqual(FactIndex().max_similarity(texts[0]), 0.0)
+        with self.assertRaises(ValueError):
+            FactIndex(band_rows=3)
+        with self.assertRaises(ValueError):
+            FactIndex(embed_batch_size=0)
+
+    def test_embedding_scores_follow_semantic_similarity(self) -> None:
+        embedder = HashEmbedder()
+        index = FactIndex(embedder)
+        texts = _fact_texts(50)
+        index.add_many(texts)
+        self.assertEqual(embedder.calls, 1)
+        self.assertAlmostEqual(index.max_similarity(texts[3]), 1.0, places=5)
+
+    def test_large_loads_are_embedded_in_batches(self) -> None:
+        embedder = HashEmbedder()
+        index = FactIndex(embedder, embed_batch_size=20)
+        texts = _fact_texts(50)
+        index.add_many(iter(texts))
+        self.assertEqual(embedder.calls, 3)
+        self.assertEqual(index.texts, texts)
+        self.assertAlmostEqual(index.max_similarity(texts[45]), 1.0, places=5)
+
+    @unittest.skipUnless(numpy_available(), "numpy is not installed")
+    def test_ivf_lists_depend_on_the_rows_only(self) -> None:
+        texts = _fact_texts(700)
+        loaded = FactIndex(HashEmbedder(), ivf_train_rows=128)
+        loaded.add_many(texts)
+        grown = FactIndex(HashEmbedder(), ivf_train_rows=128)
+        for number, text in enumerate(texts):
+            grown.add(text)
+            if number % 50 == 0:
+                grown.max_similarity(text)
+        self.assertEqual(loaded.max_similarity(texts[0]), grown.max_similarity(texts[0]))
+        # Both trained on the first 512 rows, whether they came in one load or one by one.
+        self.assertEqual((loaded._trained_rows, grown._trained_rows), (512, 512))
+        self.assertTrue(numpy.array_equal(loaded._centroids, grown._centroids))
+        self.assertEqual(loaded._lists, grown._lists)
+        self.assertEqual(sorted(row for rows in loaded._lists for row in rows), list(range(700)))
+        for text in texts[::37]:
+            self.assertAlmostEqual(loaded.max_similarity(text), 1.0, places=5)
+        for query in _fact_texts(20, seed=9):
+            self.assertEqual(loaded.max_similarity(query), grown.max_similarity(query))
+        with self.assertRaises(ValueError):
+            FactIndex(ivf_probes=0)
+
+
+class EngineFactIndexTests(unittest.TestCase):
+    def test_history_check_sees_facts_older_than_the_window(self) -> None:
+        db = Path("data/test_fact_index_engine.db")
+        if db.exists():
+            db.unlink()
+        engine = SimulationEngine(SimulationConfig(db_path=db, seed=5, llm_provider="none", fact_index=True))
+        try:
+            engine.run(3)
+            branch_id = engine.main_branch_id
+            head = engine.branches.get(branch_id)["head_state_id"]
+            index = engine._fact_index(branch_id)
+            with engine.store.transaction():
+                for number, text in enumerate(_fact_texts(150)):
+                    subject, rest = text.split(": ", 1)[1].split(" ", 1)
+                    engine._record_branch_facts(
+                        branch_id=branch_id,
+                        state_id=head,
+                        state_height=3,
+                        facts=[{"fact_id": f"F-TEST-{number}", "subject": subject, "predicate": "notes", "object": rest}],
+                        fact_object={},
+                    )
+            stored = [engine._indexed_fact_text(anchor, text) for anchor, text in engine.store.iter_branch_fact_texts(branch_id)]
+            self.assertEqual(index.texts, stored)
+            engine._invalidate_caches()
+            self.assertEqual(engine._fact_index(branch_id).texts, stored)
+
+            # A repeat of the oldest fact: the 120-fact window misses it, the index does not.
+            oldest = stored[0]
+            window = [engine._indexed_fact_text(f["anchor_type"], f["fact_text"]) for f in engine._recent_branch_facts(branch_id, limit=120)]
+            self.assertNotIn(oldest, window)
+            self.assertLess(engine._max_similarity(oldest, window), 0.9)
+            self.assertEqual(engine._history_fact_similarity(branch_id, oldest, len(window)), 1.0)
+            self.assertEqual(engine._history_fact_similarity(branch_id, oldest, len(stored)), 0.0)
+
+            novelty = [verifier for verifier in engine.verifiers if isinstance(verifier, NoveltyGateVerifier)]
+            self.assertTrue(novelty)
+            self.assertTrue(all(verifier.fact_history == engine._history_fact_similarity for verifier in novelty))
+        finally:
+            engine.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -167,6 +167,21 @@ class Fix2ConstraintTests(unittest.TestCase):
         self.assertEqual(result.verdict, Verdict.REJECT)
         self.assertIn("FACT_EQUIVALENT", result.signals["reason_codes"])
 
+    def test_equivalent_fact_older_than_the_window_is_rejected(self):
+        calls = []
+
+        def history(branch_id, fact_text, window):
+            calls.append((branch_id, window))
+            return 1.0
+
+        verifier = NoveltyGateVerifier("verifier-novelty", random.Random(3), llm=None)
+        self.assertNotIn("FACT_EQUIVALENT", verifier.evaluate(self._challenge(), self._candidate()).signals["reason_codes"])
+        verifier.fact_history = history
+        result = verifier.evaluate(self._challenge(), self._candidate(), allow_l3=False)
+        self.assertEqual(result.verdict, Verdict.REJECT)
+        self.assertIn("FACT_EQUIVALENT", result.signals["reason_codes"])
+        self.assertEqual(calls, [(self._challenge().branch_id, 1)])
+
     def test_fact_type_outside_enum_is_rejected(self):
         verifier = NoveltyGateVerifier("verifier-novelty", random.Random(4), llm=None)
         challenge = self._challenge()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import sqlite3
+import unittest
+from pathlib import Path
+
+from pocwc.metrics import RuntimeStats, ScoreRollup, compute_metrics, compute_metrics_from_rollup
+from pocwc.orchestrator import SimulationConfig, SimulationEngine
+from pocwc.store import WorldStore
+
+
+def _result(candidate_id: str, score: float, verdict: str, level: str) -> dict:
+    return {
+        "candidate_id": candidate_id,
+        "verifier_id": "verifier-test",
+        "level_max_reached": level,
+        "verdict": verdict,
+        "score": score,
+        "signals": {},
+        "notes": "",
+        "created_at": "2026-01-01T00:00:00+00:00",
+    }
+
+
+class MetricsRollupTests(unittest.TestCase):
+    def test_rollup_tracks_full_recompute_after_run(self) -> None:
+        db = Path("data/test_metrics_rollup_run.db")
+        if db.exists():
+            db.unlink()
+        engine = SimulationEngine(SimulationConfig(db_path=db, steps=8, seed=13))
+        try:
+            engine.run(8)
+            results = engine.store.list_verification_results()
+            rollup = engine.store.get_metrics_rollup()
+            expected = ScoreRollup.from_results(results)
+            self.assertEqual(rollup.count, len(results))
+            self.assertAlmostEqual(rollup.mean, expected.mean, places=9)
+            self.assertAlmostEqual(rollup.m2, expected.m2, places=9)
+            self.assertEqual(rollup.reject_by_level, {k: v for k, v in sorted(expected.reject_by_level.items())})
+            branches = engine.store.list_branches()
+            self.assertEqual(
+                compute_metrics_from_rollup(branches, rollup, engine.runtime),
+                compute_metrics(branches, results, engine.runtime),
+            )
+        finally:
+            engine.close()
+
+    def test_rolled_back_inserts_do_not_touch_rollup(self) -> None:
+        db = Path("data/test_metrics_rollup_rollback.db")
+        if db.exists():
+            db.unlink()
+        store = WorldStore(db)
+        try:
+            store.insert_verification_result(_result("c-1", 0.4, "reject", "L1"))
+            with self.assertRaises(RuntimeError):
+                with store.transaction():
+                    store.insert_verification_result(_result("c-2", 0.9, "reject", "L2"))
+                    raise RuntimeError("abort step")
+            rollup = store.get_metrics_rollup()
+            self.assertEqual(rollup.count, 1)
+            self.assertAlmostEqual(rollup.mean, 0.4)
+            self.assertEqual(rollup.reject_by_level, {"L1": 1})
+        finally:
+            store.close()
+
+    def test_migration_backfills_existing_results(self) -> None:
+        db = Path("data/test_metrics_rollup_backfill.db")
+        if db.exists():
+            db.unlink()
+        store = WorldStore(db)
+        for idx, score in enumerate([0.2, 0.5, 0.8]):
+            store.insert_verification_result(_result(f"c-{idx}", score, "reject" if score < 0.6 else "accept", "L0"))
+        store.close()
+        legacy = sqlite3.connect(db)
+        legacy.executescript(
+            "DROP TRIGGER trg_verification_results_rollup; DROP TABLE metrics_rollup; DROP TABLE metrics_reject_levels; PRAGMA user_version=3;"
+        )
+        legacy.close()
+
+        store = WorldStore(db)
+        try:
+            rollup = store.get_metrics_rollup()
+            self.assertEqual(rollup.count, 3)
+            self.assertAlmostEqual(rollup.mean, 0.5)
+            self.assertEqual(rollup.reject_by_level, {"L0": 2})
+            self.assertEqual(compute_metrics_from_rollup([], rollup, RuntimeStats())["validator_variance"], 0.2449)
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from helpers import fresh_engine
+from pocwc import store as store_module
+from pocwc.orchestrator import SimulationEngine
+
+
+def _snapshot(engine: SimulationEngine) -> list:
+    store = engine.store
+    return [
+        [(s["state_id"], s["artifact_x"], s["height"]) for s in store.list_states()],
+        [(c["challenge_id"], c["directive_type"], c["projection"]) for c in store.list_challenges()],
+        [(r["candidate_id"], r["verifier_id"], r["score"]) for r in store.list_verification_results()],
+        [(e["step"], e["mode"], e["theta"], e["metrics"]) for e in store.list_controller_epochs()],
+        store.get_story_memory("branch-main")["summary"],
+    ]
+
+
+class PipelinedRunTests(unittest.TestCase):
+    def test_pipelined_run_matches_serial_run(self) -> None:
+        results = []
+        for name, depth in (("test_pipeline_serial", 0), ("test_pipeline_depth", 3)):
+            engine = fresh_engine(name, pipeline_depth=depth)
+            events: list[dict] = []
+            threads: set[str] = set()
+
+            def on_event(event: dict) -> None:
+                threads.add(threading.current_thread().name)
+                events.append(event)
+
+            try:
+                metrics = engine.run(60, on_event)
+                results.append((_snapshot(engine), events, metrics))
+            finally:
+                engine.close()
+        self.assertEqual(results[0], results[1])
+        # Pipelined events are finished and delivered on the store's writer thread.
+        self.assertEqual(threads, {"pocwc-write-behind"})
+        self.assertIsNone(engine.store._write_behind)
+
+    def test_forking_rounds_run_ahead_of_queued_writes(self) -> None:
+        execute_batch = store_module._execute_batch
+        barrier = store_module.WriteBehind.barrier
+        stepping = threading.Event()
+        waits: list[str | None] = []
+
+        def slow_batch(conn, pending):  # noqa: ANN001
+            # A slow disk: each queued step takes a while to commit.
+            if threading.current_thread().name == "pocwc-write-behind":
+                time.sleep(0.01)
+            return execute_batch(conn, pending)
+
+        def watched_barrier(writer, scope=None):  # noqa: ANN001
+            if stepping.is_set() and writer._pending_for(scope):
+                waits.append(scope)
+            return barrier(writer, scope)
+
+        results = []
+        for name, depth in (("test_pipeline_forks_serial", 0), ("test_pipeline_forks_depth", 2)):
+            engine = fresh_engine(name, pipeline_depth=depth, branch_concurrency=3)
+            queued: list[int] = []
+            run_round = engine._run_round
+
+            def tracked_round(first_step: int, width: int, engine=engine, run_round=run_round, queued=queued):  # noqa: ANN001
+                writer = engine.store._write_behind
+                queued.append(writer._outstanding if writer is not None else 0)
+                stepping.set()
+                try:
+                    return run_round(first_step, width)
+                finally:
+                    stepping.clear()
+
+            engine._run_round = tracked_round
+            try:
+                with mock.patch.object(store_module, "_execute_batch", slow_batch), mock.patch.object(store_module.WriteBehind, "barrier", watched_barrier):
+                    metrics = engine.run(45)
+                results.append((_snapshot(engine), metrics))
+                self.assertGreater(engine.runtime.forks_created, 0)
+            finally:
+                engine.close()
+        self.assertEqual(results[0], results[1])
+        # Rounds, including the ones that create and then load forks, start while earlier writes are still queued...
+        self.assertGreater(max(queued), 0)
+        # ...and never wait for them.
+        self.assertEqual(waits, [])
+
+    def test_callback_failure_stops_the_run(self) -> None:
+        engine = fresh_engine("test_pipeline_failure", pipeline_depth=2)
+
+        def on_event(event: dict) -> None:
+            if event["step"] == 3:
+                raise RuntimeError("renderer crashed")
+
+        try:
+            with self.assertRaises(RuntimeError):
+                engine.run(30, on_event)
+            # Step 3 committed before its event failed; whatever was queued behind it was dropped.
+            self.assertIsNone(engine.store._write_behind)
+            self.assertEqual(engine.store.count_challenges(), 3)
+            engine.run(2)
+        finally:
+            engine.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+import unittest
+from pathlib import Path
+
+from pocwc.orchestrator import SimulationConfig, SimulationEngine
+from pocwc.profiling import LatencyHistogram, Profiler
+
+
+class LatencyHistogramTests(unittest.TestCase):
+    def test_percentiles_are_within_one_bucket(self) -> None:
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.add(float(ms))
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.percentile(50), 50.0, delta=5.0)
+        self.assertAlmostEqual(histogram.percentile(99), 99.0, delta=10.0)
+        self.assertEqual(histogram.percentile(100), 100.0)
+
+
+class ProfilerTests(unittest.TestCase):
+    def test_statements_are_charged_to_the_innermost_span(self) -> None:
+        profiler = Profiler()
+        profiler.begin_step(1)
+        with profiler.span("outer"):
+            profiler.count_statement("SELECT 1")
+            with profiler.span("inner"):
+                profiler.count_statement("SELECT 2")
+        record = profiler.end_step()
+        self.assertEqual(record["counters"], {"db.statements": 2, "db.statements.outer": 1, "db.statements.inner": 1})
+        self.assertEqual(set(record["spans_ms"]), {"outer", "inner"})
+
+    def test_profiled_run_reports_phases_and_writes_trace(self) -> None:
+        db = Path("data/test_profiling.db")
+        trace = Path("data/test_profiling.profile.jsonl")
+        for path in (db, trace):
+            if path.exists():
+                path.unlink()
+        engine = SimulationEngine(SimulationConfig(db_path=db, steps=5, seed=5, profile=True, profile_trace_path=trace))
+        events: list[dict] = []
+        try:
+            summary = engine.run(5, progress_callback=events.append)
+        finally:
+            engine.close()
+        spans = summary["profile"]["spans"]
+        for name in ("step", "build_challenge", "prover_generate", "candidate_screen", "evaluate_candidate", "metrics"):
+            self.assertIn(name, spans)
+        self.assertEqual(spans["step"]["count"], 5)
+        self.assertGreater(summary["profile"]["counters"]["db.statements"], 0)
+        self.assertEqual([event["profile"]["step"] for event in events], [1, 2, 3, 4, 5])
+        self.assertIn("summary", events[-1]["profile"])
+        lines = [json.loads(line) for line in trace.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([line["step"] for line in lines], [1, 2, 3, 4, 5])
+
+    def test_profiling_is_off_by_default(self) -> None:
+        db = Path("data/test_profiling_off.db")
+        if db.exists():
+            db.unlink()
+        engine = SimulationEngine(SimulationConfig(db_path=db, steps=2, seed=5))
+        events: list[dict] = []
+        try:
+            summary = engine.run(2, progress_callback=events.append)
+        finally:
+            engine.close()
+        self.assertNotIn("profile", summary)
+        self.assertNotIn("profile", events[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
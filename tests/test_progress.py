@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import unittest
+from pathlib import Path
+
+from helpers import fresh_engine
+from pocwc.progress import CallbackSink, FanoutSink, JsonlSink, verbosity_level
+
+
+class ProgressSinkTests(unittest.TestCase):
+    def test_verbosity_levels_nest_and_add_no_store_reads(self) -> None:
+        runs: dict[str, tuple[list[dict], int]] = {}
+        for verbosity in ("minimal", "normal", "full", None):
+            engine = fresh_engine(f"test_progress_{verbosity}", profile=True)
+            events: list[dict] = []
+            try:
+                sink = CallbackSink(events.append, verbosity) if verbosity else None
+                summary = engine.run(12, progress_sink=sink)
+            finally:
+                engine.close()
+            runs[str(verbosity)] = (events, summary["profile"]["counters"]["db.statements"])
+
+        minimal, normal, full = (runs[name][0][-1] for name in ("minimal", "normal", "full"))
+        drop = {"profile"}
+        self.assertLess(set(minimal) - drop, set(normal) - drop)
+        self.assertEqual(set(full) - set(normal), {"candidate_traces"})
+        self.assertNotIn("artifact", minimal)
+        self.assertEqual(len(runs["full"][0]), 12)
+        # Events come from data the step already has: the statement count matches a run without a sink.
+        self.assertEqual({statements for _, statements in runs.values()}, {runs["None"][1]})
+
+    def test_round_events_report_counters_as_of_their_own_step(self) -> None:
+        engine = fresh_engine("test_progress_rounds", branch_concurrency=3)
+        events: list[dict] = []
+        try:
+            summary = engine.run(24, events.append)
+        finally:
+            engine.close()
+        # Each step accepts or rejects exactly once, so per-step totals count up one by one even
+        # though a round's events are only emitted after the whole round.
+        self.assertEqual(sorted(event["accepted"] + event["rejected"] for event in events), list(range(1, 25)))
+        last = max(events, key=lambda event: event["accepted"] + event["rejected"])
+        self.assertEqual((last["accepted"], last["rejected"]), (summary["accepted_candidates"], summary["rejected_candidates"]))
+
+    def test_plain_callback_uses_configured_verbosity(self) -> None:
+        engine = fresh_engine("test_progress_callback", progress_verbosity="normal")
+        events: list[dict] = []
+        try:
+            engine.run(3, events.append)
+            self.assertFalse(engine._trace_candidates)
+            with self.assertRaises(ValueError):
+                engine.run(1, events.append, progress_sink=CallbackSink(events.append))
+        finally:
+            engine.close()
+        self.assertEqual(len(events), 3)
+        self.assertTrue(all("step_similarity" in event and "candidate_traces" not in event for event in events))
+
+    def test_jsonl_and_fanout_sinks(self) -> None:
+        path = Path("data/test_progress_events.jsonl")
+        path.unlink(missing_ok=True)
+        seen: list[dict] = []
+        jsonl = JsonlSink(path)
+        sink = FanoutSink(jsonl, CallbackSink(seen.append, "normal"))
+        self.assertEqual(sink.verbosity, "normal")
+        engine = fresh_engine("test_progress_jsonl")
+        try:
+            engine.run(4, progress_sink=sink)
+        finally:
+            engine.close()
+            jsonl.close()
+        lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([line["step"] for line in lines], [1, 2, 3, 4])
+        self.assertEqual(lines, json.loads(json.dumps(seen)))
+        with self.assertRaises(ValueError):
+            verbosity_level("chatty")
+
+
+if __name__ == "__main__":
+    unittest.main()
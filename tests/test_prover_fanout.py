@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import time
+import unittest
+from dataclasses import replace
+
+from helpers import SlowLLM, fingerprint, fresh_engine
+
+
+class ProverFanOutTests(unittest.TestCase):
+    def test_fan_out_is_reproducible_for_any_worker_count(self) -> None:
+        fingerprints = []
+        for workers in (1, 3):
+            engine = fresh_engine(f"test_fanout_{workers}", prover_concurrency=workers)
+            try:
+                engine.run(12)
+                fingerprints.append(fingerprint(engine))
+            finally:
+                engine.close()
+        self.assertEqual(fingerprints[0], fingerprints[1])
+
+    def test_provers_run_concurrently(self) -> None:
+        engine = fresh_engine("test_fanout_parallel", prover_concurrency=3)
+        try:
+            engine._seed_genesis()
+            engine.provers = [replace(p, llm=SlowLLM(0.2)) for p in engine.provers]
+            challenge = engine._build_challenge(1, engine.branches.get(engine.main_branch_id))
+            started = time.monotonic()
+            candidates = engine._generate_candidates(challenge)
+            elapsed = time.monotonic() - started
+        finally:
+            engine.close()
+        self.assertEqual([c.prover_id for c in candidates], [p.prover_id for p in engine.provers])
+        self.assertLess(elapsed, 0.5)
+
+    def test_timed_out_call_falls_back_offline(self) -> None:
+        engine = fresh_engine("test_fanout_timeout", prover_concurrency=3, prover_timeout_s=0.05)
+        try:
+            engine._seed_genesis()
+            engine.provers = [replace(p, llm=SlowLLM(1.0)) for p in engine.provers]
+            challenge = engine._build_challenge(1, engine.branches.get(engine.main_branch_id))
+            started = time.monotonic()
+            candidates = engine._generate_candidates(challenge)
+            elapsed = time.monotonic() - started
+        finally:
+            engine.close()
+        self.assertLess(elapsed, 0.5)
+        for candidate in candidates:
+            self.assertIn("timed out", candidate.meta_m["llm_error"])
+            self.assertEqual(candidate.meta_m["story_generation_source"], "fallback")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import unittest
+
+from helpers import HashEmbedder
+from pocwc.semantic import (
+    EmbeddingMatrix,
+    cosine_similarity,
+    lexical_jaccard,
+    max_similarity,
+    minhash_signature,
+    numpy_available,
+    resolve_similarity_backend,
+    semantic_similarity,
+    semantic_similarity_many,
+    token_set,
+    unit_rows,
+)
+
+
+class FailingEmbedder:
+    def embed_texts(self, *, texts: list[str]) -> list[list[float]]:
+        raise RuntimeError("embeddings unavailable")
+
+
+CORPUS = [
+    "Mira signs the harbor ledger",
+    "",
+    "The harbor ledger is signed by Mira",
+    "A storm closes the northern pass",
+    "Mira signs the harbor ledger",
+]
+
+
+class SemanticSimilarityManyTests(unittest.TestCase):
+    def test_matches_pairwise_similarity(self) -> None:
+        query = "Mira signs the ledger at the harbor"
+        for adapter in (None, HashEmbedder(), FailingEmbedder()):
+            expected = [semantic_similarity(query, item, adapter) for item in CORPUS]
+            self.assertEqual(semantic_similarity_many(query, CORPUS, adapter, backend="python"), expected)
+            self.assertEqual(max_similarity(query, CORPUS, adapter, backend="python"), max(expected))
+        self.assertEqual(semantic_similarity_many("  ", CORPUS), [0.0] * len(CORPUS))
+        self.assertEqual(max_similarity(query, []), 0.0)
+
+    def test_embeds_distinct_texts_in_one_call(self) -> None:
+        embedder = HashEmbedder()
+        semantic_similarity_many("Mira signs the ledger", CORPUS, embedder)
+        self.assertEqual(embedder.calls, 1)
+        self.assertEqual(embedder.embedded, ["Mira signs the ledger", CORPUS[0], CORPUS[2], CORPUS[3]])
+
+
+class LexicalIndexTests(unittest.TestCase):
+    def test_token_sets_are_cached_and_jaccard_is_exact(self) -> None:
+        self.assertIs(token_set("The Harbor ledger, the harbor"), token_set("The Harbor ledger, the harbor"))
+        self.assertEqual(token_set("The Harbor ledger, the harbor"), {"the", "harbor", "ledger"})
+        for a, b in ((CORPUS[0], CORPUS[2]), (CORPUS[0], CORPUS[3]), (CORPUS[0], CORPUS[1]), ("Ворота 7", "ворота семь")):
+            aa = set(a.lower().replace(",", " ").split())
+            bb = set(b.lower().replace(",", " ").split())
+            expected = len(aa & bb) / len(aa | bb) if aa and bb else 0.0
+            self.assertEqual(lexical_jaccard(a, b), expected)
+
+    def test_minhash_slots_agree_at_the_jaccard_rate(self) -> None:
+        self.assertEqual(minhash_signature(token_set("")), ())
+        self.assertEqual(minhash_signature(token_set(CORPUS[0])), minhash_signature(token_set(CORPUS[4])))
+        words = [f"w{index}" for index in range(40)]
+        for shift in (0, 5, 10, 20, 30):
+            a = " ".join(words[:20])
+            b = " ".join(words[shift : shift + 20])
+            sa, sb = minhash_signature(token_set(a)), minhash_signature(token_set(b))
+            agreement = sum(1 for x, y in zip(sa, sb) if x == y) / len(sa)
+            self.assertAlmostEqual(agreement, lexical_jaccard(a, b), delta=0.2)
+
+
+VECTORS = [[0.5, -1.0, 2.0], [], [0.0, 0.0, 0.0], [1.0, 2.0], [-3.0, 0.25, 1.0], [0.5, -1.0, 2.0]]
+
+
+class EmbeddingMatrixTests(unittest.TestCase):
+    def test_python_backend_matches_pairwise_cosine(self) -> None:
+        query = [1.0, -0.5, 0.75]
+        matrix = EmbeddingMatrix(VECTORS, backend="python")
+        self.assertEqual(matrix.similarities(query), [cosine_similarity(query, vector) for vector in VECTORS])
+        self.assertEqual(matrix.similarities([0.0, 0.0, 0.0]), [0.0] * len(VECTORS))
+        self.assertEqual(EmbeddingMatrix([], backend="python").similarities(query), [])
+
+    def test_backend_resolution(self) -> None:
+        self.assertEqual(resolve_similarity_backend("auto"), "numpy" if numpy_available() else "python")
+        with self.assertRaises(ValueError):
+            resolve_similarity_backend("blas")
+        if not numpy_available():
+            with self.assertRaises(RuntimeError):
+                EmbeddingMatrix(VECTORS, backend="numpy")
+
+    @unittest.skipUnless(numpy_available(), "numpy is not installed")
+    def test_numpy_backend_is_close_to_python(self) -> None:
+        query = [1.0, -0.5, 0.75]
+        # Mixed dimensions keep the per-row path; one shared dimension is stacked into an array.
+        for vectors in (VECTORS, [vector for vector in VECTORS if len(vector) != 2]):
+            expected = [cosine_similarity(query, vector) for vector in vectors]
+            for got, want in zip(EmbeddingMatrix(vectors, backend="numpy").similarities(query), expected, strict=True):
+                self.assertAlmostEqual(got, want, places=5)
+        stacked = [vector for vector in VECTORS if len(vector) == 3]
+        matrix = EmbeddingMatrix.from_unit_rows(unit_rows(stacked))
+        self.assertEqual((len(matrix), matrix.dim), (4, 3))
+        self.assertEqual(matrix.similarities(query), EmbeddingMatrix(stacked, backend="numpy").similarities(query))
+        self.assertEqual(matrix.similarities([1.0, 2.0]), [0.0] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
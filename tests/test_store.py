@@ -0,0 +1,537 @@
+from __future__ import annotations
+
+import copy
+import gc
+import sqlite3
+import threading
+import unittest
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from helpers import fresh_store
+from pocwc.orchestrator import SimulationConfig, SimulationEngine
+from pocwc.store import LazyRow, RetentionPolicy, WorldStore
+
+
+class ConnectionManagerTests(unittest.TestCase):
+    def test_thread_connection_is_reused_with_wal_pragmas(self) -> None:
+        store = fresh_store("test_store_thread_conn")
+        try:
+            with store._conn() as first, store._conn() as second:
+                self.assertIs(first, second)
+                self.assertEqual(first.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                self.assertEqual(first.execute("PRAGMA synchronous").fetchone()[0], 1)
+            store.list_branches()
+            self.assertEqual(store._connections.open_count(), 1)
+        finally:
+            store.close()
+
+    def test_pool_is_bounded_across_threads(self) -> None:
+        store = fresh_store("test_store_pool", pool_size=2)
+        errors: list[BaseException] = []
+
+        def worker() -> None:
+            try:
+                for _ in range(20):
+                    store.list_branches()
+            except BaseException as exc:  # noqa: BLE001
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertLessEqual(store._connections.open_count(), 2)
+        finally:
+            store.close()
+
+    def test_thread_connections_close_when_their_thread_exits(self) -> None:
+        store = fresh_store("test_store_thread_exit")
+        try:
+            store.list_branches()
+            threads = [threading.Thread(target=store.list_branches) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            del threads
+            gc.collect()
+            self.assertEqual(store._connections.open_count(), 1)
+        finally:
+            store.close()
+
+
+def _branch(branch_id: str) -> dict:
+    return {
+        "branch_id": branch_id,
+        "head_state_id": None,
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "status": "active",
+        "semantic_debt_est": 0.5,
+        "uncertainty": 0.5,
+        "closure_pressure": 0.5,
+        "chaos_pressure": 0.5,
+    }
+
+
+class _ExplodingVerifier:
+    verifier_id = "verifier-explodes"
+
+    def evaluate(self, challenge, candidate, allow_l3=False):  # noqa: ANN001
+        raise RuntimeError("verifier crashed mid-step")
+
+
+# Verifiers run on parallel workers under branch rounds; probes must not contend with each other.
+_PROBE_LOCK = threading.Lock()
+
+
+@dataclass
+class _LockProbe:
+    """Wraps a verifier and checks, before each evaluation, that another connection can take the write lock."""
+
+    inner: Any
+    db_path: Path
+    blocked: list[str]
+    rng: Any = None
+
+    @property
+    def verifier_id(self) -> str:
+        return self.inner.verifier_id
+
+    def evaluate(self, challenge, candidate, allow_l3=False):  # noqa: ANN001
+        with _PROBE_LOCK:
+            probe = sqlite3.connect(self.db_path, timeout=0, isolation_level=None)
+            try:
+                probe.execute("BEGIN IMMEDIATE")
+                probe.execute("ROLLBACK")
+            except sqlite3.OperationalError as exc:
+                self.blocked.append(str(exc))
+            finally:
+                probe.close()
+        return self.inner.evaluate(challenge, candidate, allow_l3=allow_l3)
+
+
+class UnitOfWorkTests(unittest.TestCase):
+    def test_reads_inside_transaction_see_buffered_writes(self) -> None:
+        store = fresh_store("test_store_uow_reads")
+        try:
+            with store.transaction() as txn:
+                store.upsert_branch(_branch("branch-a"))
+                store.upsert_branch(_branch("branch-b"))
+                self.assertEqual(txn.pending_count(), 2)
+                self.assertIsNotNone(store.get_branch("branch-a"))
+                self.assertEqual(txn.pending_count(), 0)
+            self.assertEqual(len(store.list_branches()), 2)
+        finally:
+            store.close()
+
+    def test_failed_transaction_leaves_no_rows(self) -> None:
+        store = fresh_store("test_store_uow_rollback")
+        try:
+            with self.assertRaises(RuntimeError):
+                with store.transaction():
+                    store.upsert_branch(_branch("branch-a"))
+                    store.get_branch("branch-a")
+                    raise RuntimeError("boom")
+            self.assertEqual(store.list_branches(), [])
+        finally:
+            store.close()
+
+    def test_reads_of_other_rows_do_not_flush(self) -> None:
+        store = fresh_store("test_store_uow_scoped_reads")
+        try:
+            with store.transaction() as txn:
+                store.upsert_branch(_branch("branch-a"))
+                self.assertIsNone(store.get_branch("branch-b"))
+                self.assertEqual(store.list_states(branch_id="branch-b"), [])
+                self.assertEqual(txn.pending_count(), 1)
+                # Nothing was flushed, so the write lock is still free.
+                self.assertFalse(txn.conn.in_transaction)
+            self.assertIsNotNone(store.get_branch("branch-a"))
+        finally:
+            store.close()
+
+    def test_write_lock_is_free_while_verifiers_run(self) -> None:
+        # pipeline_depth > 1 is left out: its writer commits step N while step N+1 verifies, by design.
+        for name, overrides in (
+            ("test_store_lock_serial", {}),
+            ("test_store_lock_rounds", {"branch_concurrency": 3}),
+            # Each branch's FactIndex loads from branch_facts before the step's transaction opens.
+            ("test_store_lock_fact_index", {"branch_concurrency": 3, "fact_index": True}),
+        ):
+            with self.subTest(name):
+                db = Path(f"data/{name}.db")
+                if db.exists():
+                    db.unlink()
+                engine = SimulationEngine(SimulationConfig(db_path=db, seed=11, llm_provider="none", **overrides))
+                blocked: list[str] = []
+                engine.verifiers = [_LockProbe(verifier, db, blocked) for verifier in engine.verifiers]
+                try:
+                    engine.run(30)
+                    forks = engine.runtime.forks_created
+                finally:
+                    engine.close()
+                self.assertEqual(blocked, [])
+                if overrides:
+                    self.assertGreater(forks, 0)
+
+    def test_simulation_step_commits_once(self) -> None:
+        db = Path("data/test_store_step_commit.db")
+        if db.exists():
+            db.unlink()
+        engine = SimulationEngine(SimulationConfig(db_path=db, steps=3, seed=5))
+        engine._seed_genesis()
+        statements: list[str] = []
+        with engine.store._conn() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            engine.run(3)
+        finally:
+            with engine.store._conn() as conn:
+                conn.set_trace_callback(None)
+            engine.close()
+        self.assertEqual(sum(1 for sql in statements if sql.strip().upper() == "COMMIT"), 3)
+
+    def test_crashed_step_is_not_half_written(self) -> None:
+        db = Path("data/test_store_step_atomic.db")
+        if db.exists():
+            db.unlink()
+        engine = SimulationEngine(SimulationConfig(db_path=db, steps=1, seed=5))
+        engine.verifiers = [_ExplodingVerifier()]
+        try:
+            with self.assertRaises(RuntimeError):
+                engine.run(1)
+            self.assertEqual(engine.store.list_challenges(), [])
+            self.assertEqual(engine.store.list_candidates(), [])
+            self.assertEqual(len(engine.store.list_states()), 1)
+        finally:
+            engine.close()
+
+    def test_crashed_step_restores_engine_state(self) -> None:
+        db = Path("data/test_store_step_restore.db")
+        if db.exists():
+            db.unlink()
+        engine = SimulationEngine(SimulationConfig(db_path=db, steps=3, seed=5))
+        try:
+            engine.run(3)
+            before = (
+                copy.deepcopy(engine.runtime),
+                copy.deepcopy(engine.controller_state),
+                list(engine.debt_history),
+                dict(engine.scene_stagnation_by_branch),
+                engine.rng.getstate(),
+            )
+            verifiers, engine.verifiers = engine.verifiers, [_ExplodingVerifier()]
+            with self.assertRaises(RuntimeError):
+                engine.run(1)
+            after = (
+                engine.runtime,
+                engine.controller_state,
+                engine.debt_history,
+                engine.scene_stagnation_by_branch,
+                engine.rng.getstate(),
+            )
+            self.assertEqual(after, before)
+            # The retried step draws the same challenge as if the crash never happened.
+            engine.verifiers = verifiers
+            engine.run(1)
+            self.assertEqual(engine.runtime.attempted_challenges, before[0].attempted_challenges + 1)
+        finally:
+            engine.close()
+
+
+class WriteBehindTests(unittest.TestCase):
+    def test_queued_transactions_commit_in_order_before_reads(self) -> None:
+        store = fresh_store("test_store_write_behind")
+        seen: list[tuple[str, int]] = []
+        try:
+            store.start_write_behind(2)
+            for index in range(5):
+                with store.transaction():
+                    store.upsert_branch({**_branch("branch-a"), "semantic_debt_est": float(index)})
+                store.defer(lambda: seen.append((threading.current_thread().name, len(store.list_branches()))))
+            # Reads from this thread wait for the queue, so they never see an older write.
+            self.assertEqual(store.get_branch("branch-a")["semantic_debt_est"], 4.0)
+            store.stop_write_behind()
+            self.assertEqual([count for _, count in seen], [1] * 5)
+            self.assertEqual({name for name, _ in seen}, {"pocwc-write-behind"})
+        finally:
+            store.close()
+
+    def test_failed_batch_is_raised_and_drops_later_ones(self) -> None:
+        store = fresh_store("test_store_write_behind_error")
+        try:
+            store.start_write_behind(4)
+            release = threading.Event()
+            # Hold the writer so both batches are queued before the first one fails.
+            store.defer(release.wait)
+            with store.transaction():
+                store._write("INSERT INTO no_such_table(x) VALUES (?)", (1,))
+            with store.transaction():
+                store.upsert_branch(_branch("branch-a"))
+            release.set()
+            with self.assertRaises(sqlite3.OperationalError):
+                store.stop_write_behind()
+            self.assertEqual(store.list_branches(), [])
+        finally:
+            store.close()
+
+
+class KeysetPaginationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        db = Path("data/test_store_keyset.db")
+        if db.exists():
+            db.unlink()
+        cls.engine = SimulationEngine(SimulationConfig(db_path=db, steps=12, seed=9))
+        cls.engine.run(12)
+        cls.store = cls.engine.store
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.engine.close()
+
+    def test_last_n_matches_tail_of_full_listing(self) -> None:
+        challenges = self.store.list_challenges(branch_id="branch-main")
+        self.assertEqual(self.store.list_challenges(branch_id="branch-main", last_n=5), challenges[-5:])
+        states = self.store.list_states(branch_id="branch-main")
+        self.assertEqual(self.store.list_states(branch_id="branch-main", last_n=3), states[-3:])
+        results = self.store.list_verification_results()
+        self.assertEqual(self.store.list_verification_results(last_n=4), results[-4:])
+
+    def test_after_id_pages_cover_full_listing_once(self) -> None:
+        full = self.store.list_challenges()
+        paged: list[dict] = []
+        after_id = None
+        while True:
+            page = self.store.list_challenges(after_id=after_id, limit=5)
+            paged.extend(page)
+            if len(page) < 5:
+                break
+            after_id = page[-1]["challenge_id"]
+        self.assertEqual(paged, full)
+
+    def test_iterators_stream_in_listing_order(self) -> None:
+        self.assertEqual(list(self.store.iter_challenges(batch_size=4)), self.store.list_challenges())
+        self.assertEqual(list(self.store.iter_candidates(batch_size=4)), self.store.list_candidates())
+        self.assertEqual(list(self.store.iter_states("branch-main", batch_size=2)), self.store.list_states(branch_id="branch-main"))
+        self.assertEqual(list(self.store.iter_verification_results(batch_size=7)), self.store.list_verification_results())
+
+    def test_height_bounds_and_counts(self) -> None:
+        states = self.store.list_states(branch_id="branch-main", before_height=2)
+        self.assertTrue(states)
+        self.assertTrue(all(int(s["height"]) < 2 for s in states))
+        self.assertEqual(self.store.count_challenges(), len(self.store.list_challenges()))
+        self.assertEqual(self.store.count_challenges("branch-main"), len(self.store.list_challenges(branch_id="branch-main")))
+
+
+class LazyRowTests(unittest.TestCase):
+    def test_json_fields_decode_once_on_access(self) -> None:
+        row = LazyRow({"height": 3, "meta_m": '{"entities": ["a"]}', "acceptance_summary": ""}, ("meta_m", "acceptance_summary"))
+        self.assertEqual(row["height"], 3)
+        self.assertEqual(row._pending, {"meta_m"})
+        first = row["meta_m"]
+        self.assertEqual(first, {"entities": ["a"]})
+        self.assertIs(row["meta_m"], first)
+        self.assertEqual(row._pending, set())
+        self.assertEqual(row["acceptance_summary"], "")
+        self.assertEqual(dict(row), {"height": 3, "meta_m": {"entities": ["a"]}, "acceptance_summary": ""})
+
+    def test_projection_limits_columns_and_rejects_unknown(self) -> None:
+        db = Path("data/test_store_projection.db")
+        if db.exists():
+            db.unlink()
+        engine = SimulationEngine(SimulationConfig(db_path=db, steps=2, seed=3))
+        try:
+            engine.run(2)
+            rows = engine.store.list_challenges(columns=("challenge_id", "directive_type"))
+            self.assertEqual(len(rows), 2)
+            self.assertEqual(set(rows[0]), {"challenge_id", "directive_type"})
+            full = engine.store.list_challenges()
+            self.assertEqual([r["directive_type"] for r in rows], [r["directive_type"] for r in full])
+            with self.assertRaises(ValueError):
+                engine.store.list_states(columns=("artifact_x; DROP TABLE states",))
+        finally:
+            engine.close()
+
+
+def _challenge(challenge_id: str, policy: dict) -> dict:
+    return {
+        "challenge_id": challenge_id,
+        "branch_id": "branch-a",
+        "parent_state_id": "state-0",
+        "projection": "",
+        "directive_type": "introduce_fact",
+        "difficulty_params": {},
+        "verifier_policy": policy,
+        "created_at": f"2026-01-01T00:00:0{challenge_id[-1]}+00:00",
+    }
+
+
+class PolicyBlobTests(unittest.TestCase):
+    def test_policy_round_trips_and_large_values_are_shared(self) -> None:
+        store = fresh_store("test_store_policy_blobs")
+        shared = [f"fact text number {idx}" for idx in range(40)]
+        try:
+            first = {"theta": 0.5, "recent_fact_texts": shared, "mode": "explore"}
+            second = {"theta": 0.6, "recent_fact_texts": shared, "mode": "explore"}
+            store.insert_challenge(_challenge("challenge-1", first))
+            store.insert_challenge(_challenge("challenge-2", second))
+            self.assertEqual(store.get_challenge("challenge-1")["verifier_policy"], first)
+            self.assertEqual(store.list_challenges(columns=("verifier_policy",))[1]["verifier_policy"], second)
+            with store._conn() as conn:
+                blobs = conn.execute("SELECT COUNT(*) FROM policy_blobs").fetchone()[0]
+                inline = conn.execute("SELECT verifier_policy FROM challenges").fetchall()
+            # One shared fact-text blob plus one small-value blob per distinct theta.
+            self.assertEqual(blobs, 3)
+            self.assertEqual({row[0] for row in inline}, {"{}"})
+        finally:
+            store.close()
+
+    def test_legacy_inline_policies_still_decode(self) -> None:
+        store = fresh_store("test_store_policy_legacy")
+        try:
+            with store._conn() as conn:
+                conn.execute(
+                    "INSERT INTO challenges(challenge_id, branch_id, parent_state_id, projection, directive_type, difficulty_params, verifier_policy, created_at) "
+                    "VALUES('challenge-0', 'branch-a', 'state-0', '', 'introduce_fact', '{}', '{\"theta\": 0.4}', '2026-01-01T00:00:00+00:00')"
+                )
+            self.assertEqual(store.get_challenge("challenge-0")["verifier_policy"], {"theta": 0.4})
+        finally:
+            store.close()
+
+
+class ColumnCompressionTests(unittest.TestCase):
+    def _run(self, name: str, compression: str) -> SimulationEngine:
+        db = Path(f"data/{name}.db")
+        if db.exists():
+            db.unlink()
+        engine = SimulationEngine(SimulationConfig(db_path=db, steps=4, seed=21, storage_compression=compression))
+        engine.run(4)
+        return engine
+
+    @staticmethod
+    def _payloads(store: WorldStore) -> list[tuple]:
+        return [(row["artifact_x"], row["meta_m"]) for row in store.list_states() + store.list_candidates()]
+
+    def test_compressed_run_reads_back_identically(self) -> None:
+        plain = self._run("test_store_plain_columns", "none")
+        packed = self._run("test_store_zlib_columns", "zlib")
+        try:
+            self.assertEqual(self._payloads(packed.store), self._payloads(plain.store))
+            with packed.store._conn() as conn:
+                blobs = conn.execute("SELECT COUNT(*) FROM candidates WHERE typeof(meta_m)='blob'").fetchone()[0]
+            self.assertGreater(blobs, 0)
+        finally:
+            plain.close()
+            packed.close()
+
+    def test_compact_trains_dictionary_and_round_trips(self) -> None:
+        engine = self._run("test_store_compact", "none")
+        store = engine.store
+        try:
+            expected = self._payloads(store)
+            report = store.compact("zlib")
+            self.assertIsNotNone(report["dict_id"])
+            self.assertLess(report["bytes_after"], report["bytes_before"])
+            self.assertEqual(self._payloads(store), expected)
+            # Rows compressed with the dictionary stay readable from a fresh handle.
+            reopened = WorldStore(store.db_path)
+            try:
+                self.assertEqual(self._payloads(reopened), expected)
+            finally:
+                reopened.close()
+            restored = store.compact("none")
+            self.assertEqual(restored["bytes_after"], report["bytes_before"])
+            self.assertEqual(self._payloads(store), expected)
+        finally:
+            engine.close()
+
+
+class RetentionTests(unittest.TestCase):
+    def _paths(self, name: str) -> tuple[Path, Path]:
+        db = Path(f"data/{name}.db")
+        archive = Path(f"data/{name}.archive.db")
+        for path in (db, archive):
+            if path.exists():
+                path.unlink()
+        return db, archive
+
+    def test_engine_retires_old_candidates_into_summaries_and_archive(self) -> None:
+        db, archive = self._paths("test_store_retention")
+        engine = SimulationEngine(
+            SimulationConfig(db_path=db, steps=8, seed=4, retention_keep_steps=3, retention_interval=4, retention_archive_path=archive)
+        )
+        try:
+            engine.run(8)
+            store = engine.store
+            challenges = store.list_challenges()
+            self.assertEqual(len(challenges), 8)
+            for challenge in challenges[:5]:
+                cid = challenge["challenge_id"]
+                self.assertTrue(all(c["status"] == "accept" for c in store.list_candidates(challenge_id=cid)))
+                summary = store.get_candidate_summary(cid)
+                self.assertIsNotNone(summary)
+                self.assertEqual(summary["archived"], 1)
+            for challenge in challenges[5:]:
+                self.assertEqual(len(store.list_candidates(challenge_id=challenge["challenge_id"])), len(engine.provers))
+                self.assertIsNone(store.get_candidate_summary(challenge["challenge_id"]))
+            rollup = store.get_metrics_rollup()
+            with sqlite3.connect(archive) as conn:
+                archived_results = conn.execute("SELECT COUNT(*) FROM verification_results").fetchone()[0]
+                archived_candidates = conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+            self.assertEqual(rollup.count, len(store.list_verification_results()) + archived_results)
+            retired = sum(store.get_candidate_summary(ch["challenge_id"])["rejected_candidates"] for ch in challenges[:5])
+            self.assertEqual(archived_candidates, retired)
+        finally:
+            engine.close()
+
+    def test_keeping_no_steps_is_rejected(self) -> None:
+        db, _ = self._paths("test_store_retention_keep_none")
+        engine = SimulationEngine(SimulationConfig(db_path=db, steps=3, seed=4))
+        try:
+            engine.run(3)
+            candidates = len(engine.store.list_candidates())
+            for keep in (0, -1):
+                with self.assertRaises(ValueError):
+                    engine.store.apply_retention(RetentionPolicy(keep_last_steps=keep))
+            self.assertEqual(len(engine.store.list_candidates()), candidates)
+            self.assertTrue(all(engine.store.get_candidate_summary(ch["challenge_id"]) is None for ch in engine.store.list_challenges()))
+        finally:
+            engine.close()
+
+    def test_retention_runs_alongside_a_live_engine(self) -> None:
+        db, _ = self._paths("test_store_retention_online")
+        engine = SimulationEngine(SimulationConfig(db_path=db, steps=6, seed=8))
+        engine._seed_genesis()
+        errors: list[BaseException] = []
+
+        def drive() -> None:
+            try:
+                engine.run(6)
+            except BaseException as exc:  # noqa: BLE001
+                errors.append(exc)
+
+        worker = threading.Thread(target=drive)
+        janitor = WorldStore(db)
+        try:
+            worker.start()
+            while worker.is_alive():
+                janitor.apply_retention(RetentionPolicy(keep_last_steps=2, batch_size=1))
+            worker.join()
+            janitor.apply_retention(RetentionPolicy(keep_last_steps=2))
+            self.assertEqual(errors, [])
+            challenges = janitor.list_challenges()
+            self.assertEqual(len(challenges), 6)
+            self.assertTrue(all(janitor.get_candidate_summary(ch["challenge_id"]) for ch in challenges[:4]))
+        finally:
+            janitor.close()
+            engine.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import sqlite3
+import unittest
+from pathlib import Path
+from typing import Callable
+
+from pocwc.store import WorldStore
+
+
+class QueryPlanTests(unittest.TestCase):
+    """EXPLAIN QUERY PLAN regressions for the hot WorldStore access paths."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        db = Path("data/test_store_query_plans.db")
+        if db.exists():
+            db.unlink()
+        cls.store = WorldStore(db)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.store.close()
+
+    def _plans(self, call: Callable[[WorldStore], object]) -> list[str]:
+        statements: list[str] = []
+        with self.store._conn() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                call(self.store)
+            finally:
+                conn.set_trace_callback(None)
+            selects = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+            self.assertTrue(selects, "store call issued no SELECT")
+            plans = []
+            for sql in selects:
+                rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+                plans.append("\n".join(str(row[3]) for row in rows))
+        return plans
+
+    def _assert_indexed(self, call: Callable[[WorldStore], object], index: str, *, ordered: bool = True) -> None:
+        for plan in self._plans(call):
+            self.assertIn(index, plan)
+            for line in plan.splitlines():
+                if line.startswith("SCAN ") and "USING" not in line:
+                    self.fail(f"full table scan in plan:\n{plan}")
+            if ordered:
+                self.assertNotIn("TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_schema_version_is_current(self) -> None:
+        self.assertEqual(self.store.schema_version(), WorldStore._MIGRATIONS[-1][0])
+
+    def test_states_by_branch(self) -> None:
+        self._assert_indexed(lambda s: s.list_states(branch_id="branch-main"), "idx_states_branch_height")
+
+    def test_challenges_by_branch(self) -> None:
+        self._assert_indexed(lambda s: s.list_challenges(branch_id="branch-main"), "idx_challenges_branch_created")
+
+    def test_candidates_by_challenge(self) -> None:
+        self._assert_indexed(lambda s: s.list_candidates(challenge_id="challenge-0001"), "idx_candidates_challenge_created")
+
+    def test_verification_results_by_candidate(self) -> None:
+        self._assert_indexed(
+            lambda s: s.list_verification_results(candidate_id="candidate-1"),
+            "idx_verification_results_candidate",
+        )
+
+    def test_branch_facts_by_branch(self) -> None:
+        self._assert_indexed(lambda s: s.list_branch_facts("branch-main", limit=50), "idx_branch_facts_branch")
+
+    def test_active_facts_group_by_uses_covering_index(self) -> None:
+        plans = self._plans(lambda s: s.list_active_facts("branch-main", limit=50))
+        self.assertIn("COVERING INDEX idx_branch_facts_branch_fact", plans[0])
+
+    def test_story_events_by_branch(self) -> None:
+        self._assert_indexed(lambda s: s.list_story_events(branch_id="branch-main"), "idx_story_events_branch_height")
+
+    def test_migrations_upgrade_legacy_database(self) -> None:
+        db = Path("data/test_store_legacy_schema.db")
+        for suffix in ("", "-wal", "-shm"):
+            path = db.with_name(db.name + suffix)
+            if path.exists():
+                path.unlink()
+        legacy = sqlite3.connect(db)
+        legacy.execute(
+            "CREATE TABLE branch_facts (id INTEGER PRIMARY KEY AUTOINCREMENT, branch_id TEXT NOT NULL, state_id TEXT NOT NULL, "
+            "fact_id TEXT NOT NULL, subject TEXT NOT NULL, predicate TEXT NOT NULL, object TEXT NOT NULL, time_hint TEXT NOT NULL, "
+            "location_hint TEXT NOT NULL, evidence_type TEXT NOT NULL, falsifiable INTEGER NOT NULL, fact_text TEXT NOT NULL, "
+            "fact_hash TEXT NOT NULL, created_at TEXT NOT NULL)"
+        )
+        legacy.commit()
+        legacy.close()
+
+        store = WorldStore(db)
+        try:
+            self.assertEqual(store.schema_version(), WorldStore._MIGRATIONS[-1][0])
+            with store._conn() as conn:
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(branch_facts)").fetchall()}
+                indexes = {row[1] for row in conn.execute("PRAGMA index_list(branch_facts)").fetchall()}
+            self.assertIn("introduced_height", columns)
+            self.assertIn("idx_branch_facts_branch_fact", indexes)
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
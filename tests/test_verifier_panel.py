@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import random
+import time
+import unittest
+from dataclasses import dataclass
+
+from pocwc.domain import VerificationLevel, VerificationResult, Verdict
+from helpers import fresh_engine
+from pocwc.orchestrator import SimulationEngine
+
+
+@dataclass(slots=True)
+class FixedVerifier:
+    verifier_id: str
+    rng: random.Random
+    verdict: Verdict = Verdict.REJECT
+    delay: float = 0.0
+    llm: object | None = None
+
+    def evaluate(self, challenge, candidate, allow_l3: bool = False) -> VerificationResult:
+        if self.llm is not None:
+            time.sleep(self.delay)
+        return VerificationResult(
+            candidate_id=candidate.candidate_id,
+            verifier_id=self.verifier_id,
+            level_max_reached=VerificationLevel.L2,
+            verdict=self.verdict,
+            score=round(self.rng.random(), 3),
+            signals={"closure_risk": 0.5, "chaos_risk": 0.5, "fragility_score": 0.5},
+        )
+
+
+def _first_candidate(engine: SimulationEngine):
+    engine._seed_genesis()
+    challenge = engine._build_challenge(1, engine.branches.get(engine.main_branch_id))
+    return challenge, engine.provers[0].generate(challenge, 1)
+
+
+class VerifierPanelTests(unittest.TestCase):
+    def test_panel_results_do_not_depend_on_worker_count(self) -> None:
+        panels = []
+        for workers in (1, 4):
+            engine = fresh_engine(f"test_panel_{workers}", verifier_concurrency=workers)
+            try:
+                challenge, candidate = _first_candidate(engine)
+                panels.append([(r.verifier_id, r.verdict, r.score) for r in engine._run_verifiers(challenge, candidate)])
+            finally:
+                engine.close()
+        self.assertEqual(panels[0], panels[1])
+        self.assertEqual(len(panels[0]), 4)
+
+    def test_reject_quorum_short_circuits_slow_verifiers(self) -> None:
+        engine = fresh_engine("test_panel_quorum", verifier_concurrency=3, profile=True)
+        try:
+            challenge, candidate = _first_candidate(engine)
+            rng = random.Random(0)
+            engine.verifiers = [
+                FixedVerifier("v-1", rng),
+                FixedVerifier("v-2", rng),
+                FixedVerifier("v-slow", rng, Verdict.ACCEPT, delay=1.0, llm=object()),
+            ]
+            started = time.monotonic()
+            results = engine._run_verifiers(challenge, candidate)
+            elapsed = time.monotonic() - started
+            counters = engine.profiler.summary()["counters"]
+        finally:
+            engine.close()
+        self.assertEqual([r.verifier_id for r in results], ["v-1", "v-2"])
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(counters["verifier.short_circuits"], 1)
+
+    def test_sequential_panel_can_apply_the_same_reject_quorum(self) -> None:
+        decisions = []
+        for workers, short_circuit in ((0, False), (0, True), (3, False)):
+            engine = fresh_engine(
+                f"test_panel_quorum_{workers}_{short_circuit}", verifier_concurrency=workers, sequential_panel_short_circuit=short_circuit
+            )
+            try:
+                challenge, candidate = _first_candidate(engine)
+                engine.verifiers = [
+                    FixedVerifier("v-1", random.Random(0)),
+                    FixedVerifier("v-2", random.Random(0), Verdict.ACCEPT),
+                    FixedVerifier("v-3", random.Random(0)),
+                    FixedVerifier("v-4", random.Random(0), Verdict.ACCEPT),
+                ]
+                # Round mode runs the sequential panel on the same per-verifier streams as the concurrent one.
+                results = engine._run_verifiers(challenge, candidate, seeded=True)
+                decisions.append(([(r.verifier_id, r.score) for r in results], engine.aggregator.decide(results)))
+            finally:
+                engine.close()
+        # By default the sequential panel records every verifier.
+        self.assertEqual([verifier_id for verifier_id, _ in decisions[0][0]], ["v-1", "v-2", "v-3", "v-4"])
+        self.assertEqual(decisions[1], decisions[2])
+        self.assertEqual([verifier_id for verifier_id, _ in decisions[1][0]], ["v-1", "v-2", "v-3"])
+        self.assertEqual({decision.verdict for _, decision in decisions}, {Verdict.REJECT})
+
+    def test_deadline_falls_back_to_offline_evaluation(self) -> None:
+        engine = fresh_engine("test_panel_deadline", verifier_concurrency=2, verifier_deadline_s=0.05)
+        try:
+            challenge, candidate = _first_candidate(engine)
+            rng = random.Random(0)
+            engine.verifiers = [
+                FixedVerifier("v-fast", rng, Verdict.ACCEPT),
+                FixedVerifier("v-slow", rng, Verdict.ACCEPT, delay=1.0, llm=object()),
+            ]
+            started = time.monotonic()
+            results = engine._run_verifiers(challenge, candidate)
+            elapsed = time.monotonic() - started
+        finally:
+            engine.close()
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual([r.verifier_id for r in results], ["v-fast", "v-slow"])
+        self.assertIn("deadline", results[1].notes)
+        # The offline re-run draws from the same per-verifier stream.
+        self.assertEqual(results[1].score, round(engine._verifier_rng(candidate, engine.verifiers[1]).random(), 3))
+
+
+if __name__ == "__main__":
+    unittest.main()